@@ -3,9 +3,13 @@ from pypblib import pblib
 from pypblib.pblib import PBConfig, Pb2cnf
 from pysat.solvers import Glucose3
 from utils.helper import VariableFactory
+from sat.encoding.clause_arena import ClauseArena
+from sat.encoding.pb_resources import encode_weighted_at_most
+from sat.algorithm.time_windows import compute_time_windows
+from sat.algorithm.sgs import ScheduleGenerator
 
 # Equation (6): Mã hóa ràng buộc hoạt động phải bắt đầu tại một thời điểm duy nhất (ALK - AtLeastK)
-def encode_unique_start_instant_alk(solver, vf, max_time, task_id, duration):
+def encode_unique_start_instant_alk(solver, vf, max_time, task_id, duration, window=None):
     """
     Mã hóa ràng buộc đảm bảo rằng một hoạt động chỉ có thể bắt đầu tại một thời điểm duy nhất.
     - Tạo một mệnh đề (clause) để đảm bảo rằng ít nhất một thời điểm bắt đầu được chọn.
@@ -17,14 +21,16 @@ def encode_unique_start_instant_alk(solver, vf, max_time, task_id, duration):
     - max_time: Thời gian tối đa có thể bắt đầu hoạt động.
     - task_id: ID của hoạt động.
     - duration: Thời gian thực hiện hoạt động.
+    - window: Cửa sổ thời gian (TimeWindow) của hoạt động, None nếu không giới hạn.
     """
+    start_times = window.start_times if window is not None else range(max_time - duration + 1)
     # Tạo mệnh đề để đảm bảo hoạt động phải bắt đầu tại ít nhất một thời điểm
-    clause = [vf.start(task_id, t) for t in range(max_time - duration + 1)]
+    clause = [vf.start(task_id, t) for t in start_times]
     solver.add_clause(clause)
 
     # Tạo các mệnh đề để đảm bảo hoạt động chỉ bắt đầu tại duy nhất một thời điểm
-    for t1 in range(max_time - duration + 1):
-        for t2 in range(t1 + 1, max_time - duration + 1):
+    for i, t1 in enumerate(start_times):
+        for t2 in start_times[i + 1:]:
             solver.add_clause([-vf.start(task_id, t1), -vf.start(task_id, t2)])
 
 
@@ -32,7 +38,7 @@ def encode_unique_start_instant_alk(solver, vf, max_time, task_id, duration):
 
 
 # Equation (7): Mã hóa ràng buộc giới hạn thời gian bắt đầu
-def encode_start_in_time(solver, vf, max_time, task_id, duration):
+def encode_start_in_time(solver, vf, max_time, task_id, duration, window=None):
     """
     Mã hóa ràng buộc đảm bảo rằng hoạt động không được bắt đầu sau thời điểm kết thúc có thể.
     - Tạo các mệnh đề phủ định để loại bỏ các thời điểm không hợp lệ.
@@ -43,13 +49,15 @@ def encode_start_in_time(solver, vf, max_time, task_id, duration):
     - max_time: Thời gian tối đa.
     - task_id: ID của hoạt động.
     - duration: Thời gian thực hiện hoạt động.
+    - window: Cửa sổ thời gian (TimeWindow) của hoạt động, None nếu không giới hạn.
     """
+    start_times = window.start_times if window is not None else range(max_time)
     # Loại bỏ các thời điểm không hợp lệ (bắt đầu sau thời điểm max_time - duration)
-    for t in range(max_time - duration + 1, max_time):
+    for t in range(max(max_time - duration + 1, start_times.start), start_times.stop):
         solver.add_clause([-vf.start(task_id, t)])
 
 # Equation (8) và (9): Mã hóa ràng buộc liên tục khi hoạt động đang chạy
-def encode_runtime(solver, vf, max_time, task_id, duration):
+def encode_runtime(solver, vf, max_time, task_id, duration, window=None):
     """
     Mã hóa ràng buộc đảm bảo rằng:
     - Nếu hoạt động bắt đầu tại thời điểm t, nó phải chạy liên tục trong khoảng từ t đến t + duration - 1.
@@ -61,10 +69,13 @@ def encode_runtime(solver, vf, max_time, task_id, duration):
     - max_time: Thời gian tối đa.
     - task_id: ID của công việc.
     - duration: Thời gian thực hiện công việc.
+    - window: Cửa sổ thời gian (TimeWindow) của công việc, None nếu không giới hạn.
     """
-    for t in range(max_time):
+    start_times = window.start_times if window is not None else range(max_time)
+    run_times = window.run_times if window is not None else range(max_time)
+    for t in start_times:
         start_var = vf.start(task_id, t)
-        for j in range(max_time):
+        for j in run_times:
             run_var = vf.run(task_id, j)
             # Nếu ngoài khoảng thời gian thực hiện, không thể chạy
             if j < t or j >= t + duration:
@@ -89,7 +100,7 @@ def encode_runtime(solver, vf, max_time, task_id, duration):
     #         solver.add_clause([-start_var, -vf.run(task_id, j)])
 
 # Equation (10): Mã hóa quan hệ "Finish-to-Start"
-def encode_relation_fs(solver, vf, max_time, task1, task2, duration1):
+def encode_relation_fs(solver, vf, max_time, task1, task2, duration1, window1=None, window2=None):
     """
     Mã hóa ràng buộc "Finish-to-Start" giữa hai công việc.
     - Nếu công việc 1 kết thúc tại thời điểm t, công việc 2 không thể bắt đầu trước thời điểm t + duration1.
@@ -101,14 +112,16 @@ def encode_relation_fs(solver, vf, max_time, task1, task2, duration1):
     - task1: ID của công việc 1.
     - task2: ID của công việc 2.
     - duration1: Thời gian thực hiện công việc 1.
+    - window1, window2: Cửa sổ thời gian (TimeWindow) của hai công việc, None nếu không giới hạn.
     """
-    for t in range(max_time):
+    for t in (window1.start_times if window1 is not None else range(max_time)):
         start_var = vf.start(task1, t)
-        for k in range(t + duration1):  # Changed this part
+        starts_before = window2.starts_before(t + duration1) if window2 is not None else range(t + duration1)
+        for k in starts_before:  # Changed this part
             solver.add_clause([-start_var, -vf.start(task2, k)])
 
 # Equation (16): Mã hóa atoms tiêu thụ tài nguyên
-def encode_consumption_atoms(solver, vf, max_time, tasks, resources):
+def encode_consumption_atoms(solver, vf, max_time, tasks, resources, windows=None):
     """
     Mã hóa ràng buộc tiêu thụ tài nguyên của các hoạt động:
     - Nếu một công việc đang chạy tại thời điểm t, nó phải tiêu thụ một lượng tài nguyên nhất định.
@@ -119,9 +132,12 @@ def encode_consumption_atoms(solver, vf, max_time, tasks, resources):
     - max_time: Thời gian tối đa.
     - tasks: Danh sách các hoạt động.
     - resources: Danh sách các tài nguyên.
+    - windows: {task_id: TimeWindow}, None nếu không giới hạn.
     """
     for t in range(max_time):
         for task in tasks:
+            if windows is not None and t not in windows[task["id"]].run_times:
+                continue
             for resource in resources:
                 # Lấy số lượng tài nguyên tiêu thụ
                 consumption = task.get("consumption", {}).get(resource["id"], 0)
@@ -130,7 +146,7 @@ def encode_consumption_atoms(solver, vf, max_time, tasks, resources):
                     solver.add_clause([-vf.run(task["id"], t), vf.consume(task["id"], resource["id"], t, i)])
 
 # Equation (5 and 17): BCC resource constraint
-def encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resources):
+def encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resources, windows=None):
     """
     Mã hóa ràng buộc tài nguyên bằng BCC sử dụng Sequential Counter (NSC) với PBLib.
 
@@ -140,6 +156,7 @@ def encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resource
     - max_time: Thời gian tối đa.
     - tasks: Danh sách các hoạt động.
     - resources: Danh sách các tài nguyên.
+    - windows: {task_id: TimeWindow}, None nếu không giới hạn.
     """
     id_variable = int  # Biến toàn cục để đếm số lượng biến được tạo ra trong quá trình mã hóa
 
@@ -155,6 +172,7 @@ def encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resource
             consumption_vars = [
                 vf.consume(task["id"], resource["id"], t, i)  # Biến tiêu thụ tài nguyên của công việc tại thời điểm t
                 for task in tasks
+                if windows is None or t in windows[task["id"]].run_times
                 for i in range(task.get("consumption", {}).get(resource["id"], 0))  # Lấy số lượng tài nguyên công việc tiêu thụ
             ]
 
@@ -176,35 +194,87 @@ def encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resource
                 for clause in formula:
                     solver.add_clause(clause)
 
-def decode_solution(tasks, model, vf, consumptions):
+# Ràng buộc tài nguyên dạng PB có trọng số, thay cho Equation (16) + (17)
+def encode_resource_constraint_weighted(solver, vf, max_time, tasks, resources, encoding, windows=None):
+    """
+    Mã hóa ràng buộc tài nguyên trực tiếp trên biến run:
+    sum(demand * run(task, t)) <= capacity cho mỗi tài nguyên và thời điểm t,
+    không cần biến consume (xem sat.encoding.pb_resources).
+
+    Parameters:
+    - solver: Bộ giải SAT.
+    - vf: Lớp quản lý các biến (VariableFactory).
+    - max_time: Thời gian tối đa.
+    - tasks: Danh sách các hoạt động (task["consumption"] là lượng tiêu thụ, giá trị âm).
+    - resources: Danh sách các tài nguyên.
+    - encoding: Một trong sat.encoding.pb_resources.PB_ENCODINGS.
+    - windows: {task_id: TimeWindow}, None nếu không giới hạn.
+    """
+    for resource in resources:
+        # Các công việc dùng tài nguyên này và lượng dùng (dương)
+        consumers = [(task["id"], -task.get("consumption", {}).get(resource["id"], 0)) for task in tasks
+                     if task.get("consumption", {}).get(resource["id"], 0) < 0]
+        for t in range(max_time):
+            running = [(task_id, demand) for task_id, demand in consumers
+                       if windows is None or t in windows[task_id].run_times]
+            if not running:
+                continue
+            literals = [vf.run(task_id, t) for task_id, _ in running]
+            # Biến phụ của PBLib bắt đầu sau mọi biến đã tạo
+            vf.var_count = encode_weighted_at_most(solver, [demand for _, demand in running], literals,
+                                                   resource["capacity"], encoding, vf.var_count)
+
+def decode_start_times(tasks, model, vf, max_time=None):
+    """
+    Trả về {task_id: thời điểm bắt đầu} của các công việc có biến start đúng trong model.
+
+    :param max_time: Có max_time thì tra start_{id}_{t} với t < max_time (O(tasks x max_time)),
+                     không có thì duyệt một lượt các biến start trong var_map
+    """
+    def is_true(var):
+        return var is not None and var <= len(model) and model[var - 1] > 0
+
+    task_start_times = {}
+    if max_time is None:
+        task_ids = {str(task['id']): task['id'] for task in tasks}
+        for key, var in vf.var_map.items():
+            if key.startswith("start_") and is_true(var):
+                task_id, time = key[len("start_"):].rsplit("_", 1)
+                if task_id in task_ids:
+                    task_id, time = task_ids[task_id], int(time)
+                    task_start_times[task_id] = min(time, task_start_times.get(task_id, time))
+        return task_start_times
+    for task in tasks:
+        for time in range(max_time):
+            if is_true(vf.var_map.get(f"start_{task['id']}_{time}")):
+                task_start_times[task['id']] = time
+                break
+    return task_start_times
+
+
+def decode_solution(tasks, model, vf, consumptions, max_time=None):
     """
     Decode the SAT solver's model to extract task start times and schedule details.
 
     :param tasks: List of task dictionaries
     :param model: Raw model from the SAT solver
     :param vf: VariableFactory used in encoding
+    :param max_time: Encoding horizon; None reads every start variable of vf
     :return: Decoded schedule information
     """
-    # Create reverse mapping for variables
-    reverse_var_map = {v: k for k, v in vf.var_map.items()}
-
-    # Extract positive variables from the model
-    positive_vars = set(abs(var) for var in model if var > 0)
+    # Đọc thời điểm bắt đầu trực tiếp từ model theo id biến (model[v - 1] là literal của v),
+    # chỉ tra var_map nên không tạo thêm biến nào khi giải mã
+    task_start_times = decode_start_times(tasks, model, vf, max_time)
+    return schedule_from_start_times(tasks, task_start_times, consumptions)
 
-    # Store start times for tasks
-    task_start_times = {}
 
-    # Decode start times
+def schedule_from_start_times(tasks, task_start_times, consumptions):
+    """
+    Lịch chi tiết (thời điểm bắt đầu/kết thúc, tài nguyên tiêu thụ) từ {task_id: thời điểm bắt đầu},
+    dùng chung cho lời giải SAT và lịch heuristic.
+    """
     for task in tasks:
-        task_start_found = False
-        for time in range(len(reverse_var_map)):
-            start_var = vf.start(task['id'], time)
-            if start_var in positive_vars:
-                task_start_times[task['id']] = time
-                task_start_found = True
-                break
-
-        if not task_start_found:
+        if task['id'] not in task_start_times:
             print(f"Warning: No start time found for task {task['id']}")
 
     # Sort tasks by start time
@@ -237,9 +307,40 @@ def decode_solution(tasks, model, vf, consumptions):
 
     return schedule
 
-def solve_rcpsp(max_time, tasks, relations, consumptions, resources):
-    solver = Glucose3()
+def time_windows(max_time, tasks, relations):
+    """
+    Cửa sổ thời gian ES/LS của từng công việc (đường găng tiến/lùi), mọi quan hệ
+    được hiểu là Finish-to-Start như trong encode_relation_fs.
+    """
+    durations = {task["id"]: task["duration"] for task in tasks}
+    precedences = [(relation["task_id_1"], relation["task_id_2"], durations.get(relation["task_id_1"], 0))
+                   for relation in relations]
+    return compute_time_windows(durations, precedences, max_time)
+
+
+def heuristic_schedule(tasks, relations, consumptions, resources):
+    """
+    Lịch khả thi tốt nhất của các luật ưu tiên (SGS nối tiếp/song song, LFT/MTS,
+    cải thiện tiến-lùi); makespan của nó là cận trên dùng làm max_time.
+    Mọi quan hệ được hiểu là Finish-to-Start như trong encode_relation_fs.
+    """
+    durations = {task["id"]: task["duration"] for task in tasks}
+    precedences = [(relation["task_id_1"], relation["task_id_2"], durations.get(relation["task_id_1"], 0))
+                   for relation in relations]
+    demands = {}
+    for consumption in consumptions:
+        key = (consumption["task_id"], consumption["resource_id"])
+        demands[key] = demands.get(key, 0) - consumption["amount"]
+    capacities = {resource["id"]: resource["capacity"] for resource in resources}
+    return ScheduleGenerator(durations, precedences, demands, capacities).best()
+
+
+def solve_rcpsp(max_time, tasks, relations, consumptions, resources, prune_windows=True, resource_encoding=None):
+    arena = ClauseArena()
     vf = VariableFactory()
+    # None giữ nguyên mã hóa trên toàn bộ khoảng [0, max_time)
+    # resource_encoding: None dùng BCC trên biến consume, ngược lại PB có trọng số trên biến run
+    windows = time_windows(max_time, tasks, relations) if prune_windows else None
 
     # Add logging for encoding process
     # print(f"Encoding constraints for {len(tasks)} tasks and {len(resources)} resources...")
@@ -248,16 +349,22 @@ def solve_rcpsp(max_time, tasks, relations, consumptions, resources):
 
     
     for task in tasks:
-        encode_unique_start_instant_alk(solver, vf, max_time, task["id"], task["duration"])
-        encode_start_in_time(solver, vf, max_time, task["id"], task["duration"])
-        encode_runtime(solver, vf, max_time, task["id"], task["duration"])
+        arena.set_family("unique_start_instant")
+        window = windows[task["id"]] if windows is not None else None
+        encode_unique_start_instant_alk(arena, vf, max_time, task["id"], task["duration"], window)
+        arena.set_family("start_in_time")
+        encode_start_in_time(arena, vf, max_time, task["id"], task["duration"], window)
+        arena.set_family("runtime")
+        encode_runtime(arena, vf, max_time, task["id"], task["duration"], window)
 
     # Encoding precedence relations (Finish-to-Start)
+    arena.set_family("relations")
     for relation in relations:
         task_1 = relation["task_id_1"]
         task_2 = relation["task_id_2"]
         task_1_duration = next(t["duration"] for t in tasks if t["id"] == task_1)
-        encode_relation_fs(solver, vf, max_time, task_1, task_2, task_1_duration)
+        encode_relation_fs(arena, vf, max_time, task_1, task_2, task_1_duration,
+                           *((windows[task_1], windows[task_2]) if windows is not None else ()))
 
     # Encoding resource consumption
     for task in tasks:
@@ -268,7 +375,13 @@ def solve_rcpsp(max_time, tasks, relations, consumptions, resources):
         task["consumption"][consumption["resource_id"]] = consumption["amount"]
 
     # Encoding resource constraints
-    encode_resource_constraint_cardinality(solver, vf, max_time, tasks, resources)
+    arena.set_family("resources")
+    if resource_encoding is not None:
+        encode_resource_constraint_weighted(arena, vf, max_time, tasks, resources, resource_encoding, windows)
+    else:
+        encode_resource_constraint_cardinality(arena, vf, max_time, tasks, resources, windows)
+
+    solver = arena.load_into(Glucose3())
 
     # Solve the problem and calculate variables & clauses
     
@@ -286,7 +399,7 @@ def solve_rcpsp(max_time, tasks, relations, consumptions, resources):
 
     if solver.solve():
         status = "SAT"
-        variables, clauses = solver.nof_vars(), solver.nof_clauses()
+        variables, clauses = arena.nof_vars(), arena.nof_clauses()
         model = solver.get_model()
         solver.delete()
         
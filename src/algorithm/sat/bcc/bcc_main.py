@@ -1,6 +1,6 @@
 
 from algorithm.sat.bcc.validation import print_validation_result, validate_input_data, validate_schedule
-from algorithm.sat.bcc.bcc_algo import decode_solution,solve_rcpsp
+from algorithm.sat.bcc.bcc_algo import decode_solution,heuristic_schedule,schedule_from_start_times,solve_rcpsp
 from utils.helper import parse_input,export_schedule_to_xlsx
 import time
 from pathlib import Path
@@ -66,7 +66,7 @@ import json
 
 
 
-def sat_bcc_solve(input_json_path):
+def sat_bcc_solve(input_json_path, heuristic_horizon=False):
     max_time = 600
     json_file=Path(input_json_path)
     if json_file.exists():
@@ -79,6 +79,11 @@ def sat_bcc_solve(input_json_path):
 
         if validate_input_data(tasks, relations, consumptions, resources):
             print("Input data is valid.")
+            # heuristic_horizon: makespan của lịch heuristic làm cận trên cho max_time của dữ liệu
+            heuristic = None
+            if heuristic_horizon:
+                heuristic = heuristic_schedule(tasks, relations, consumptions, resources)
+                max_time = heuristic.makespan if max_time is None else min(max_time, heuristic.makespan)
             start_time_solve=time.time()
             model, vf, variables, clauses, status = solve_rcpsp(
                 max_time, tasks, relations, consumptions, resources
@@ -93,7 +98,20 @@ def sat_bcc_solve(input_json_path):
 
 
             if status == "SAT" :
-                decoded_schedule = decode_solution(tasks, model, vf, consumptions)
+                decoded_schedule = decode_solution(tasks, model, vf, consumptions, max_time)
+                is_valid, validation_errors = validate_schedule(
+                    decoded_schedule,
+                    tasks,
+                    relations,
+                    consumptions,
+                    resources,
+                    max_time
+                )
+                print_validation_result(is_valid, validation_errors)
+            elif heuristic is not None:
+                # Solver không trả về lời giải: lịch heuristic là kết quả
+                status = "HEURISTIC"
+                decoded_schedule = schedule_from_start_times(tasks, heuristic.starts, consumptions)
                 is_valid, validation_errors = validate_schedule(
                     decoded_schedule,
                     tasks,
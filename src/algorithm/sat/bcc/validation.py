@@ -1,6 +1,8 @@
 import logging
 from typing import List, Dict
 
+from sat.validate.checker import ScheduleChecker
+
 def validate_input_data(tasks: List[Dict], relations: List[Dict],
                          consumptions: List[Dict], resources: List[Dict]) -> bool:
     """
@@ -68,114 +70,26 @@ def validate_schedule(schedule, tasks, relations, consumptions, resources, max_t
         max_time (int): Thời gian tối đa
 
     Returns:
-        tuple: (bool, dict) - (is_valid, validation_results)
+        tuple: (bool, dict) - (is_valid, validation_results); mỗi mục có thêm
+        'violations' là các bản ghi Violation (xem sat.validate.checker)
     """
-    validation_results = {
-        'task_coverage': {'passed': True, 'details': []},
-        'time_windows': {'passed': True, 'details': []},
-        'precedence': {'passed': True, 'details': []},
-        'resources': {'passed': True, 'details': []}
-    }
-
-    # 1. Check if all tasks are scheduled exactly once
-    scheduled_task_ids = {task['task_id'] for task in schedule}
-    original_task_ids = {task['id'] for task in tasks}
-
-    if scheduled_task_ids != original_task_ids:
-        validation_results['task_coverage']['passed'] = False
-        missing_tasks = original_task_ids - scheduled_task_ids
-        extra_tasks = scheduled_task_ids - original_task_ids
-        if missing_tasks:
-            validation_results['task_coverage']['details'].append(
-                f"Missing tasks in schedule: {missing_tasks}")
-        if extra_tasks:
-            validation_results['task_coverage']['details'].append(
-                f"Extra tasks in schedule: {extra_tasks}")
-    else:
-        validation_results['task_coverage']['details'].append(
-            "All tasks are scheduled exactly once")
-
-    # 2. Check if all tasks are within the maximum time window
-    for task in schedule:
-        if task['start_time'] < 0:
-            validation_results['time_windows']['passed'] = False
-            validation_results['time_windows']['details'].append(
-                f"Task {task['task_id']} starts before time 0")
-        if task['end_time'] > max_time:
-            validation_results['time_windows']['passed'] = False
-            validation_results['time_windows']['details'].append(
-                f"Task {task['task_id']} ends after max time {max_time}")
-
-        # Verify task duration
-        original_duration = next(t['duration'] for t in tasks if t['id'] == task['task_id'])
-        if task['end_time'] - task['start_time'] != original_duration:
-            validation_results['time_windows']['passed'] = False
-            validation_results['time_windows']['details'].append(
-                f"Task {task['task_id']} duration mismatch: "
-                f"scheduled {task['end_time'] - task['start_time']}, "
-                f"required {original_duration}")
-
-    if validation_results['time_windows']['passed']:
-        validation_results['time_windows']['details'].append(
-            "All tasks are within their allowed time windows and have correct durations")
-
-    # 3. Check precedence relations (Finish-to-Start)
-    task_times = {task['task_id']: (task['start_time'], task['end_time'])
-                 for task in schedule}
-
-    precedence_checked = 0
-    for relation in relations:
-        precedence_checked += 1
-        pred_task = relation['task_id_1']
-        succ_task = relation['task_id_2']
-        if task_times[pred_task][1] > task_times[succ_task][0]:
-            validation_results['precedence']['passed'] = False
-            validation_results['precedence']['details'].append(
-                f"Precedence violation: Task {pred_task} must finish before "
-                f"Task {succ_task} starts")
-
-    if validation_results['precedence']['passed']:
-        validation_results['precedence']['details'].append(
-            f"All {precedence_checked} precedence relations are satisfied")
-
-    # 4. Check resource constraints
-    resource_usage = {res['id']: [0] * max_time for res in resources}
-
-    # Calculate resource usage over time
-    for task in schedule:
-        task_resources = task.get('resources_consumed', [])
-        for res in task_resources:
-            resource_id = res['resource_id']
-            amount = abs(res['amount'])
-            for t in range(task['start_time'], task['end_time']):
-                resource_usage[resource_id][t] += amount
-
-    # Check if resource usage exceeds capacity
-    resources_checked = 0
-    for resource in resources:
-        resources_checked += 1
-        res_id = resource['id']
-        capacity = resource['capacity']
-        max_usage = max(resource_usage[res_id])
-
-        if max_usage > capacity:
-            validation_results['resources']['passed'] = False
-            for t, usage in enumerate(resource_usage[res_id]):
-                if usage > capacity:
-                    validation_results['resources']['details'].append(
-                        f"Resource {res_id} overused at time {t}: "
-                        f"usage {usage} > capacity {capacity}")
-        else:
-            validation_results['resources']['details'].append(
-                f"Resource {res_id} usage is within capacity (max usage: {max_usage}/{capacity})")
-
-    if validation_results['resources']['passed']:
-        validation_results['resources']['details'].insert(
-            0, f"All {resources_checked} resources are within their capacity limits")
+    return schedule_checker(tasks, relations, consumptions, resources, max_time).report(schedule)
 
-    # Overall validation result
-    is_valid = all(result['passed'] for result in validation_results.values())
-    return is_valid, validation_results
+def schedule_checker(tasks, relations, consumptions, resources, max_time):
+    """
+    Dựng ScheduleChecker (mảng NumPy) một lần cho bộ dữ liệu; dùng lại nó để
+    kiểm tra nhiều lịch, ví dụ trong vòng lặp tìm kiếm cục bộ.
+    Mọi quan hệ được hiểu là Finish-to-Start như trong encode_relation_fs.
+    """
+    durations = {task['id']: task['duration'] for task in tasks}
+    precedences = [(relation['task_id_1'], relation['task_id_2'], durations.get(relation['task_id_1'], 0))
+                   for relation in relations]
+    demands = {}
+    for consumption in consumptions:
+        key = (consumption['task_id'], consumption['resource_id'])
+        demands[key] = demands.get(key, 0) + abs(consumption['amount'])
+    capacities = {resource['id']: resource['capacity'] for resource in resources}
+    return ScheduleChecker(list(durations), list(durations.values()), precedences, demands, capacities, max_time)
 
 def print_validation_result(is_valid, validation_results):
     """
@@ -0,0 +1,53 @@
+"""
+Compares the at-most-one encodings of the start instants on a benchmark set.
+
+For every instance and AMO encoding it reports the clauses of the
+unique_start_instant family, the total variables/clauses and the run time
+of RcpspAlogithm (encode + solve).
+
+Usage (from src/):
+    python -m benchmarks.amo_encodings ../assets/bm bdd_bdd [limit]
+"""
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+from sat.algorithm.rcpsp import RcpspAlogithm
+from sat.data.project import Project
+from sat.encoding.amo import AMO_ENCODINGS
+from sat.encoding.encoding_options import EncodingOptions
+
+
+def run(path: Path, type_encoder: str, amo):
+    project = Project(str(path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = RcpspAlogithm(project, options=EncodingOptions(amo=amo)).calculate(type_encoder)
+    unique_start = result.get('families', {}).get('unique_start_instant', {}).get('clauses', 0)
+    return result['status'], unique_start, result['vars'], result['clauses'], result['time']
+
+
+def main(directory: str, type_encoder: str = "bdd_bdd", limit: int = None):
+    files = sorted(Path(directory).glob("*.json"))[:limit]
+    encodings = [None] + list(AMO_ENCODINGS)
+    totals = {amo: [0, 0, 0, 0.0] for amo in encodings}
+    print(f"{'instance':<14}{'amo':<11}{'status':<9}{'amo cls':>10}{'vars':>10}{'clauses':>11}{'time':>9}")
+    for path in files:
+        for amo in encodings:
+            status, unique_start, variables, clauses, elapsed = run(path, type_encoder, amo)
+            name = amo or f"{type_encoder} default"
+            print(f"{path.stem:<14}{name:<11}{status:<9}{unique_start:>10}{variables:>10}{clauses:>11}{elapsed:>9.2f}")
+            total = totals[amo]
+            total[0] += unique_start
+            total[1] += variables
+            total[2] += clauses
+            total[3] += elapsed
+    print("\ntotals")
+    for amo, (unique_start, variables, clauses, elapsed) in totals.items():
+        print(f"{amo or 'default':<11}{unique_start:>12}{variables:>12}{clauses:>12}{elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1],
+         sys.argv[2] if len(sys.argv) > 2 else "bdd_bdd",
+         int(sys.argv[3]) if len(sys.argv) > 3 else None)
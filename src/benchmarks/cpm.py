@@ -0,0 +1,70 @@
+"""
+Forward pass: recursive Relation.embed_forwards (sat_based_2014) vs the
+array-based CriticalPath engine behind sat_2025 FowardAlgorithm.embed_forwards.
+
+Both run FowardAlgorithm on the same projects. The "differ" column counts
+activities whose early start dates disagree: the recursive pass follows
+relations depth-first and an FF relation can move a date backwards, so it
+may stop below the longest path (and even at negative dates).
+
+The j120 graphs are shallow, so the recursion is cheap there; the layered
+graphs (every activity of a layer precedes every activity of the next one)
+show the exponential number of paths it walks.
+
+Usage (from src/):
+    python -m benchmarks.cpm ../assets/input_test/j120.sm.tgz [limit]
+"""
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+from sat_2025.sat_solve import convert_json_to_base
+from sat_2025.scheduler.algorithm import FowardAlgorithm
+from sat_2025.scheduler.mapping import Mapper
+from sat_based_2014.scheduler.algorithm import FowardAlgorithm as LegacyFowardAlgorithm
+from sat_based_2014.scheduler.mapping import Mapper as LegacyMapper
+
+
+def measure(mapper, algorithm, text_data: str):
+    project = mapper.get_mapper().load_data(text_data)
+    begin = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        algorithm(project).calculate()
+    elapsed = time.perf_counter() - begin
+    return elapsed, {activity.get_id(): activity.get_early_start_date() for activity in project.get_activities()}
+
+
+def layered(width: int, depth: int) -> str:
+    lines = ["project;0;0;layered"]
+    lines += [f"task;{i};{1 + i % 3};t{i}" for i in range(width * depth)]
+    for layer in range(depth - 1):
+        for first in range(layer * width, (layer + 1) * width):
+            for second in range((layer + 1) * width, (layer + 2) * width):
+                lines.append(f"aob;{first};{second};es")
+    return "\n".join(lines)
+
+
+def main(directory: str, limit: int = None):
+    files = sorted(Path(directory).glob("*.json"))[:limit]
+    instances = [(path.stem, convert_json_to_base(str(path))[0]) for path in files]
+    totals = {name for name, _ in instances}
+    instances += [(f"layered 3x{depth}", layered(3, depth)) for depth in (6, 9, 12)]
+    legacy_total = engine_total = 0.0
+    print(f"{'instance':<14}{'recursive':>12}{'cpm':>10}{'speedup':>10}{'differ':>8}")
+    for name, text_data in instances:
+        legacy_time, legacy_dates = measure(LegacyMapper, LegacyFowardAlgorithm, text_data)
+        engine_time, engine_dates = measure(Mapper, FowardAlgorithm, text_data)
+        differ = sum(legacy_dates[activity_id] != time for activity_id, time in engine_dates.items())
+        if name in totals:
+            legacy_total += legacy_time
+            engine_total += engine_time
+        print(f"{name:<14}{legacy_time:>12.4f}{engine_time:>10.4f}{legacy_time / engine_time:>9.1f}x{differ:>8}")
+    if engine_total:
+        print(f"\n{directory} total")
+        print(f"{'':<14}{legacy_total:>12.4f}{engine_total:>10.4f}{legacy_total / engine_total:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
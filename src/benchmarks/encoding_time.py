@@ -0,0 +1,80 @@
+"""
+Encoding time per instance for one encoder (no solving).
+
+Each instance is encoded with the default EncodingOptions at the horizon
+RcpspAlogithm uses (the priority-rule makespan, see sat.algorithm.sgs).
+The encode time is split into the time spent inside pypblib and the
+Python glue around it (see sat.encoding.pb_service). With --profile the
+cProfile functions with the largest cumulative time over the whole run
+are printed as well.
+
+Usage (from src/):
+    python -m benchmarks.encoding_time ../assets/input_test/j120.sm.tgz card_card [limit] [--profile]
+"""
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+
+from sat.algorithm.sgs import heuristic_schedule
+from sat.data.project import Project
+from sat.encoding.clause_arena import ClauseArena
+from sat.encoding.encoding_options import EncodingOptions
+from sat.encoding.pb_service import PbEncodingService
+from sat.encoding.variable_factory import VariableFactory
+from sat.encoding.se_bdd_bdd import SatEncoderBddBdd
+from sat.encoding.se_bdd_card import SatEncoderBddCard
+from sat.encoding.se_bdd_nsc import SatEncoderBddNsc
+from sat.encoding.se_card_bdd import SatEncoderCardBdd
+from sat.encoding.se_card_card import SatEncoderCardCard
+from sat.encoding.se_card_nsc import SatEncoderCardNsc
+
+ENCODERS = {
+    "bdd_bdd": SatEncoderBddBdd,
+    "bdd_card": SatEncoderBddCard,
+    "bdd_nsc": SatEncoderBddNsc,
+    "card_bdd": SatEncoderCardBdd,
+    "card_card": SatEncoderCardCard,
+    "card_nsc": SatEncoderCardNsc,
+}
+
+
+def encode(path: Path, type_encoder: str):
+    project = Project(str(path))
+    options = EncodingOptions(horizon=heuristic_schedule(project).makespan)
+    arena = ClauseArena()
+    service = PbEncodingService.get_pb_service()
+    service.reset_statistics()
+    begin = time.perf_counter()
+    ENCODERS[type_encoder].get_sat_encoder().handle(arena, project, options)
+    elapsed = time.perf_counter() - begin
+    VariableFactory.get_variable_factory().reset()
+    return options.horizon, arena.nof_clauses(), elapsed, service.pblib_time
+
+
+def main(directory: str, type_encoder: str = "card_card", limit: int = None, profile: bool = False):
+    files = sorted(Path(directory).glob("*.json"))[:limit]
+    profiler = cProfile.Profile() if profile else None
+    total = pblib_total = 0.0
+    print(f"{'instance':<14}{'horizon':>8}{'clauses':>11}{'encode':>10}{'pblib':>10}{'glue':>10}")
+    for path in files:
+        if profiler is not None:
+            profiler.enable()
+        horizon, clauses, elapsed, pblib_time = encode(path, type_encoder)
+        if profiler is not None:
+            profiler.disable()
+        total += elapsed
+        pblib_total += pblib_time
+        print(f"{path.stem:<14}{horizon:>8}{clauses:>11}{elapsed:>10.3f}{pblib_time:>10.3f}{elapsed - pblib_time:>10.3f}")
+    print(f"{'total':<14}{'':>19}{total:>10.3f}{pblib_total:>10.3f}{total - pblib_total:>10.3f}")
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    arguments = [argument for argument in sys.argv[1:] if argument != "--profile"]
+    main(arguments[0],
+         arguments[1] if len(arguments) > 1 else "card_card",
+         int(arguments[2]) if len(arguments) > 2 else None,
+         "--profile" in sys.argv)
@@ -0,0 +1,61 @@
+"""
+Eager against lazy (CEGAR) resource constraints per instance.
+
+Every instance is solved by RcpspAlogithm three times: with the resource
+constraints encoded upfront, and with EncodingOptions.lazy_resources in the
+"constraint" and "conflict" modes (see sat.algorithm.lazy_resources). For
+each run the makespan, the clauses of the final formula and the wall time are
+printed; the lazy runs add their SAT calls (iterations) and the clauses saved
+against the eager formula.
+
+Usage (from src/):
+    python -m benchmarks.lazy_resources ../assets/bm card_card [limit] [strategy]
+"""
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+from sat.algorithm.rcpsp import RcpspAlogithm
+from sat.data.project import Project
+from sat.encoding.encoding_options import EncodingOptions
+
+MODES = (None, "constraint", "conflict")
+
+
+def solve(project: Project, type_encoder: str, lazy: str, strategy: str) -> dict:
+    algorithm = RcpspAlogithm(project, dense_variables=True, heuristic_horizon=True,
+                              options=EncodingOptions(lazy_resources=lazy), strategy=strategy)
+    # the schedules printed by the algorithm are not part of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        return algorithm.calculate(type_encoder)
+
+
+def main(directory: str, type_encoder: str = "card_card", limit: int = None, strategy: str = "bisection"):
+    files = sorted(Path(directory).glob("*.json"))[:limit]
+    totals = {lazy: {'clauses': 0, 'time': 0.0, 'iterations': 0} for lazy in MODES}
+    print(f"{'instance':<14}{'mode':<12}{'makespan':>9}{'clauses':>10}{'saved':>8}{'iters':>7}{'time':>9}")
+    for path in files:
+        project = Project(str(path))
+        eager = None
+        for lazy in MODES:
+            result = solve(project, type_encoder, lazy, strategy)
+            eager = eager or result
+            iterations = result.get('lazy', {}).get('iterations', len(result.get('steps', [])) or 1)
+            saved = 1 - result['clauses'] / eager['clauses'] if eager['clauses'] else 0.0
+            totals[lazy]['clauses'] += result['clauses']
+            totals[lazy]['time'] += result['time']
+            totals[lazy]['iterations'] += iterations
+            print(f"{path.stem:<14}{lazy or 'eager':<12}{str(result.get('makespan', result['status'])):>9}"
+                  f"{result['clauses']:>10}{saved:>8.1%}{iterations:>7}{result['time']:>9.3f}")
+    for lazy in MODES:
+        saved = 1 - totals[lazy]['clauses'] / totals[None]['clauses'] if totals[None]['clauses'] else 0.0
+        print(f"{'total':<14}{lazy or 'eager':<12}{'':>9}{totals[lazy]['clauses']:>10}{saved:>8.1%}"
+              f"{totals[lazy]['iterations']:>7}{totals[lazy]['time']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1],
+         sys.argv[2] if len(sys.argv) > 2 else "card_card",
+         int(sys.argv[3]) if len(sys.argv) > 3 else None,
+         sys.argv[4] if len(sys.argv) > 4 else "bisection")
@@ -0,0 +1,191 @@
+"""
+Parallel benchmark driver: runs every (instance, encoder, solver) job of a
+benchmark set on a process pool and prints a summary table.
+
+Each job is one RcpspAlogithm.calculate in its own process, killed after
+--timeout seconds (or --memory-limit MiB of memory it owns, see
+sat.algorithm.process_limits). Results are appended to a JSONL file as jobs
+finish, so an interrupted run resumes where it stopped: jobs already in the
+file with the same strategy, timeout and memory limit are skipped. When the run completes the file is rewritten in job order
+(instance, encoder, solver), whatever the order in which the workers
+finished.
+
+Usage (from src/):
+    python -m benchmarks.runner ../assets/input_test/j30.sm.tgz \\
+        --encoders bdd_bdd bdd_card card_bdd card_card bdd_nsc card_nsc powerset \\
+        --solvers glucose3 --workers 8 --timeout 300 --output j30.jsonl
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from sat.algorithm.rcpsp import RcpspAlogithm
+from sat.data.project import Project
+from utils.result_store import write_xlsx
+
+ENCODERS = ("bdd_bdd", "bdd_card", "card_bdd", "card_card", "bdd_nsc", "card_nsc", "powerset")
+
+# fields of a calculate() result kept in the results file
+FIELDS = ("status", "time", "vars", "clauses", "horizon", "makespan", "lower_bound", "optimal", "peak_rss")
+
+
+class Job(NamedTuple):
+    instance: str
+    encoder: str
+    solver: str
+    strategy: Optional[str] = None
+    timeout: Optional[float] = None
+    memory_limit: Optional[int] = None
+
+    def key(self):
+        return self.instance, self.encoder, self.solver, self.strategy, self.timeout, self.memory_limit
+
+    def record(self) -> Dict:
+        """The fields of the job, as stored with its result."""
+        return self._asdict()
+
+
+def record_key(record: Dict):
+    # same order as Job.key; rows written without a setting never match a job that has one
+    return tuple(record.get(field) for field in Job._fields)
+
+
+def run_job(job: Job) -> Dict:
+    """Runs one job in a pool worker; never raises, failures become status "error"."""
+    record = job.record()
+    begin = time.time()
+    try:
+        project = Project(job.instance)
+        record["problem"] = f"{len(project.activities)}-{len(project.resources)}-{len(project.relations)}"
+        algorithm = RcpspAlogithm(project, heuristic_horizon=True, strategy=job.strategy, time_limit=job.timeout,
+                                  memory_limit=job.memory_limit, solver=job.solver)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = algorithm.calculate(job.encoder)
+        record.update({field: result[field] for field in FIELDS if field in result})
+    except Exception:
+        record.update({"status": "error", "time": round(time.time() - begin, 3),
+                       "error": traceback.format_exc()})
+    return record
+
+
+def make_jobs(directory: str, encoders: List[str], solvers: List[str], limit: int = None, strategy: str = None,
+              timeout: float = None, memory_limit: int = None) -> List[Job]:
+    files = sorted(Path(directory).glob("*.json"))[:limit]
+    return [Job(str(path), encoder, solver, strategy, timeout, memory_limit)
+            for path in files for encoder in encoders for solver in solvers]
+
+
+def load_results(path: Path) -> Dict:
+    # a line cut short by a kill is dropped, its job runs again
+    results = {}
+    if not path.exists():
+        return results
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[record_key(record)] = record
+    return results
+
+
+def run(jobs: List[Job], output: Path, workers: int = None) -> List[Dict]:
+    """
+    Runs the jobs missing from output on `workers` processes (all cores by
+    default) and returns every result in job order.
+    """
+    results = load_results(output)
+    pending = [job for job in jobs if job.key() not in results]
+    print(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already in {output}, {len(pending)} to run")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a", encoding="utf-8") as file, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(), max_tasks_per_child=1) as pool:
+        # one job per worker: the encoders are singletons, a fresh process starts them clean
+        futures = {pool.submit(run_job, job): job for job in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                # the worker itself died (e.g. killed by the OS)
+                record = dict(job.record(), status="error", error=repr(e))
+            results[job.key()] = record
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            print(f"[{done}/{len(pending)}] {Path(job.instance).stem} {job.encoder} {job.solver}: "
+                  f"{record['status']} {record.get('time', 0):.2f}s")
+
+    ordered = [results[job.key()] for job in jobs]
+    keys = {job.key() for job in jobs}
+    # results of other jobs found in the file are kept after them
+    rest = [record for key, record in results.items() if key not in keys]
+    temporary = output.with_name(output.name + ".tmp")
+    with temporary.open("w", encoding="utf-8") as file:
+        for record in ordered + rest:
+            file.write(json.dumps(record) + "\n")
+    os.replace(temporary, output)
+    return ordered
+
+
+def summary(results: List[Dict]) -> str:
+    """One row per (encoder, solver): status counts, total time, mean vars/clauses of finished encodings."""
+    groups = {}
+    for record in results:
+        groups.setdefault((record["encoder"], record["solver"]), []).append(record)
+    statuses = ["sat", "heuristic", "unsat", "unknown", "timeout", "memout", "error"]
+    lines = [f"{'encoder':<11}{'solver':<12}" + "".join(f"{status:>9}" for status in statuses)
+             + f"{'time':>11}{'vars':>12}{'clauses':>12}"]
+    for (encoder, solver), records in groups.items():
+        counts = [sum(record["status"] == status for record in records) for status in statuses]
+        elapsed = sum(record.get("time", 0) for record in records)
+        encoded = [record for record in records if record.get("vars")]
+        variables = sum(record["vars"] for record in encoded) / max(len(encoded), 1)
+        clauses = sum(record["clauses"] for record in encoded) / max(len(encoded), 1)
+        lines.append(f"{encoder:<11}{solver:<12}" + "".join(f"{count:>9}" for count in counts)
+                     + f"{elapsed:>11.2f}{variables:>12.0f}{clauses:>12.0f}")
+    return "\n".join(lines)
+
+
+def export_xlsx(results: List[Dict], output_file: str):
+    """Writes the results with the Id/File Name/Problem/Type/... columns of utils.helper.export_schedule_to_xlsx."""
+    write_xlsx(({"id": index, "file_name": Path(record["instance"]).stem, "problem_field": record.get("problem"),
+                 "ago_type": f"{record['encoder']}/{record['solver']}", "status": record["status"],
+                 "time_solve": record.get("time"), "variables": record.get("vars"), "clauses": record.get("clauses")}
+                for index, record in enumerate(results, 1)), output_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="folder of instance .json files")
+    parser.add_argument("--encoders", nargs="+", default=list(ENCODERS), choices=ENCODERS)
+    parser.add_argument("--solvers", nargs="+", default=["glucose3"], help="PySAT solver names")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds per job")
+    parser.add_argument("--memory-limit", type=int, default=None, help="MiB of memory (USS) per job")
+    parser.add_argument("--strategy", default=None, help="minimise the makespan (see sat.algorithm.optimizer)")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N instances")
+    parser.add_argument("--output", default="benchmark.jsonl", help="results file, reused to resume")
+    parser.add_argument("--xlsx", default=None, help="also export the results to this workbook")
+    args = parser.parse_args(argv)
+
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+    jobs = make_jobs(args.directory, args.encoders, args.solvers, args.limit, args.strategy, args.timeout,
+                     memory_limit)
+    results = run(jobs, Path(args.output), args.workers)
+    print()
+    print(summary(results))
+    if args.xlsx:
+        export_xlsx(results, args.xlsx)
+
+
+if __name__ == "__main__":
+    main()
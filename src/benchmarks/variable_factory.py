@@ -0,0 +1,52 @@
+"""
+Micro-benchmark: keyed VariableFactory vs the dense layout.
+
+Replays the id requests the encoders make (start/run for every activity and
+time, aux per time, consume per unit of demand) on a real instance.
+
+Usage (from src/):
+    python -m benchmarks.variable_factory ../assets/input_test/j120.sm.tgz/j1201_10.json
+"""
+import sys
+import time
+
+from sat.data.project import Project
+from sat.encoding.variable_factory import VariableFactory
+
+
+def replay(vr: VariableFactory, project: Project, rounds: int):
+    activity_ids = [activity.id for activity in project.activities]
+    consumptions = [(c.activity_id, c.resource_id, -c.amount) for c in project.consumptions if c.amount < 0]
+    for _ in range(rounds):
+        for t in range(project.max_time):
+            for activity_id in activity_ids:
+                vr.start(activity_id, t)
+                vr.run(activity_id, t)
+            vr.aux(t)
+            for activity_id, resource_id, units in consumptions:
+                for i in range(units):
+                    vr.consume(activity_id, resource_id, t, i)
+
+
+def measure(project: Project, dense: bool, rounds: int):
+    vr = VariableFactory()
+    if dense:
+        demands = {(c.activity_id, c.resource_id): -c.amount for c in project.consumptions}
+        vr.use_dense_layout([activity.id for activity in project.activities], project.max_time, demands)
+    begin = time.perf_counter()
+    replay(vr, project, rounds)
+    return time.perf_counter() - begin, vr.var_count - 1
+
+
+def main(path: str, rounds: int = 3):
+    project = Project(path)
+    print(f"{path}: {len(project.activities)} activities, horizon {project.max_time}, {rounds} rounds")
+    keyed_time, keyed_vars = measure(project, False, rounds)
+    dense_time, dense_vars = measure(project, True, rounds)
+    print(f"keyed : {keyed_time:8.3f}s  {keyed_vars} vars")
+    print(f"dense : {dense_time:8.3f}s  {dense_vars} vars")
+    print(f"speedup: {keyed_time / dense_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -1,5 +1,5 @@
 
-from utils.helper import export_schedule_to_xlsx
+from utils.result_store import open_result_store
 from pathlib import Path
 from algorithm.sat.bcc.bcc_main import sat_bcc_solve
 from sat_based_2014.bcc_2014 import sat_bcc_solve_2014
@@ -13,27 +13,24 @@ from sat_2025.sat_solve import sat_solve_2025
 # print(res)
 
 
-def sat_bcc_test(input_path,xlsx_output_path):
+def sat_bcc_test(input_path,xlsx_output_path,results_path=None):
+    # Rows stream to results_path (.csv/.jsonl/.sqlite) as they come; the XLSX is written once at the end
     xlsx_path = Path(xlsx_output_path)
     directory_path = Path(input_path)
+    results_path = Path(results_path or xlsx_path.with_suffix(".csv"))
     if xlsx_path.exists():
         xlsx_path.unlink()
+    if results_path.exists():
+        results_path.unlink()
     if not directory_path.exists() or not directory_path.is_dir():
         print(f"Error: Directory {input_path} does not exist or is not a folder.\n")
         return None
-    for index, file_path in enumerate(directory_path.rglob("*.json")):
-        # print(file_path)
-        # result_n_bcc=sat_bcc_solve(file_path)
-        # result_old_bcc=sat_bcc_solve_2014(file_path)
-        result_bcc_2025=sat_solve_2025(file_path)
-        # result_n_bcc['problem_field']=f"{index+1}-{result_n_bcc['problem_field']}"
-        # result_old_bcc['problem_field']=f"{index+1}-{result_old_bcc['problem_field']}"
-        result_bcc_2025['problem_field']=f"{index+1}-{result_bcc_2025['problem_field']}"
-
-
-        # export_schedule_to_xlsx(**result_n_bcc,output_file=xlsx_output_path)
-        # export_schedule_to_xlsx(**result_old_bcc,output_file=xlsx_output_path)
-        export_schedule_to_xlsx(**result_bcc_2025,output_file=xlsx_output_path)
+    with open_result_store(results_path) as store:
+        for index, file_path in enumerate(directory_path.rglob("*.json")):
+            result_bcc_2025=sat_solve_2025(file_path)
+            result_bcc_2025['problem_field']=f"{index+1}-{result_bcc_2025['problem_field']}"
+            store.append(id=index+1,**result_bcc_2025)
+        store.export_xlsx(xlsx_output_path)
 
 
 # sat_bcc_test("assets/input/j30.sm.tgz","bcc.xlsx")    
@@ -1,10 +1,22 @@
 from sat.data.project  import Project
 from  sat.algorithm.rcpsp import RcpspAlogithm
+from sat.encoding.cnf_cache import CnfCache
 from pathlib import Path
-from utils.helper import export_schedule_to_xlsx
+from utils.result_store import open_result_store
 
 
 directory_path=Path("assets/test")
+cnf_cache=CnfCache(".cnf_cache")
+results_path=Path("bcc.csv")
+time_limit=900
+memory_limit=8*1024*1024*1024
+xlsx_path=Path("bcc.xlsx")
+# every run starts a fresh results file instead of appending to the last one
+if xlsx_path.exists():
+    xlsx_path.unlink()
+if results_path.exists():
+    results_path.unlink()
+store=open_result_store(results_path)
 
 arr_ago_type=["bdd_bdd","bdd_card","card_bdd","card_card","bdd_nsc","card_nsc"]
 arr_ago_type=["powerset"]
@@ -18,10 +30,10 @@ if directory_path.exists():
             file_name=file_path.stem
             problem_field=f"{len(p.activities)}-{len(p.resources)}-{len(p.relations)}"
             print(problem_field)
-            rcpsp = RcpspAlogithm(p)    
+            rcpsp = RcpspAlogithm(p, cache=cnf_cache, time_limit=time_limit, memory_limit=memory_limit)
             result=rcpsp.calculate(ago_type)
             print(file_name,result)
-            export_schedule_to_xlsx(
+            store.append(
                 id=id,
                 file_name=file_name,
                 problem_field= problem_field,
@@ -29,8 +41,9 @@ if directory_path.exists():
                 status= result['status'],
                 time_solve= result['time'],
                 variables= result['vars'],
-                clauses= result['clauses'],
-                output_file="bcc.xlsx")
+                clauses= result['clauses'])
+store.export_xlsx(xlsx_path)
+store.close()
 
 
 
@@ -0,0 +1,158 @@
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from sat.algorithm.cpm import CriticalPath
+from sat.data.project import Project
+from sat.data.project_arrays import ProjectArrays
+
+
+class LowerBounds(NamedTuple):
+    """
+    Makespan lower bounds; every schedule is at least best long.
+
+    Attributes:
+    ----------
+    critical_path : int
+        LB0, longest path of the precedence graph.
+    energy : int
+        LB1, max over resources of ceil(sum duration x demand / capacity).
+    disjunctive : int
+        Total duration of a set of activities no two of which can overlap.
+    energetic : int
+        Smallest horizon passing energetic reasoning on the CPM windows.
+    """
+    critical_path: int
+    energy: int
+    disjunctive: int
+    energetic: int
+
+    @property
+    def best(self) -> int:
+        return max(self)
+
+
+def critical_path_bound(durations: Dict[int, int], precedences: Iterable[Tuple[int, int, int]]) -> int:
+    engine = CriticalPath(list(durations), list(durations.values()), precedences)
+    engine.forward()
+    return engine.makespan
+
+
+def energy_bound(durations: Dict[int, int], demands: Dict[Tuple[int, int], int], capacities: Dict[int, int]) -> int:
+    energy = {}
+    for (activity_id, resource_id), units in demands.items():
+        if units > 0 and activity_id in durations:
+            energy[resource_id] = energy.get(resource_id, 0) + durations[activity_id] * units
+    # ceil(energy / capacity); a resource with no capacity cannot host any demand
+    return max((-(-work // capacities[resource_id]) for resource_id, work in energy.items()
+                if capacities.get(resource_id, 0) > 0), default=0)
+
+
+def disjunctive_bound(durations: Dict[int, int], precedences: Iterable[Tuple[int, int, int]],
+                      demands: Dict[Tuple[int, int], int], capacities: Dict[int, int]) -> int:
+    """
+    Greedy heaviest clique of the incompatibility graph: two activities are
+    incompatible when together they exceed a capacity or an arc keeps them
+    apart (lag >= duration of the first). Each activity seeds one clique.
+    """
+    activity_ids = [activity_id for activity_id, duration in durations.items() if duration > 0]
+    index = {activity_id: i for i, activity_id in enumerate(activity_ids)}
+    resource_ids = list(capacities)
+    usage = np.zeros((len(activity_ids), len(resource_ids)), dtype=np.int64)
+    for (activity_id, resource_id), units in demands.items():
+        if activity_id in index and resource_id in capacities:
+            usage[index[activity_id], resource_ids.index(resource_id)] += max(units, 0)
+    capacity = np.asarray([capacities[resource_id] for resource_id in resource_ids], dtype=np.int64)
+
+    incompatible = (usage[:, None, :] + usage[None, :, :] > capacity).any(axis=2)
+    for first, second, lag in precedences:
+        if first in index and second in index and lag >= durations[first]:
+            incompatible[index[first], index[second]] = incompatible[index[second], index[first]] = True
+    np.fill_diagonal(incompatible, False)
+
+    weights = np.asarray([durations[activity_id] for activity_id in activity_ids], dtype=np.int64)
+    order = np.argsort(-weights, kind="stable")
+    best = 0
+    for seed in range(len(activity_ids)):
+        candidates = incompatible[seed].copy()
+        total = weights[seed]
+        for i in order:
+            if candidates[i]:
+                total += weights[i]
+                candidates &= incompatible[i]
+        best = max(best, int(total))
+    return best
+
+
+def energetic_bound(durations: Dict[int, int], precedences: Iterable[Tuple[int, int, int]],
+                    demands: Dict[Tuple[int, int], int], capacities: Dict[int, int],
+                    lower_bound: int = 0, upper_bound: Optional[int] = None) -> int:
+    """
+    Smallest horizon T in [lower_bound, upper_bound] for which no interval
+    [a, b) between an earliest start and a latest finish needs more energy
+    than the resources offer. The work an activity must do inside [a, b)
+    is min(b - a, ES + d - a, b - LS, d), clipped at 0.
+    """
+    precedences = list(precedences)
+    activity_ids = list(durations)
+    engine = CriticalPath(activity_ids, list(durations.values()), precedences)
+    earliest = engine.forward()
+    lower_bound = max(lower_bound, engine.makespan)
+    if upper_bound is None:
+        upper_bound = max(lower_bound, sum(durations.values()))
+
+    index = {activity_id: i for i, activity_id in enumerate(activity_ids)}
+    resource_ids = list(capacities)
+    usage = np.zeros((len(activity_ids), len(resource_ids)), dtype=np.int64)
+    for (activity_id, resource_id), units in demands.items():
+        if activity_id in index and resource_id in capacities:
+            usage[index[activity_id], resource_ids.index(resource_id)] += max(units, 0)
+    capacity = np.asarray([capacities[resource_id] for resource_id in resource_ids], dtype=np.int64)
+    loaded = usage.any(axis=1)
+    if not loaded.any():
+        return lower_bound
+    duration = engine.durations[loaded]
+    earliest = earliest[loaded]
+    usage = usage[loaded]
+
+    for horizon in range(lower_bound, upper_bound):
+        latest = engine.backward(horizon)[loaded]
+        begins = np.unique(earliest)
+        ends = np.unique(latest + duration)
+        length = ends[None, :] - begins[:, None]
+        # mandatory work per (begin, end, activity)
+        work = np.minimum(np.minimum(length[:, :, None], duration),
+                          np.minimum((earliest + duration)[None, None, :] - begins[:, None, None],
+                                     ends[None, :, None] - latest[None, None, :]))
+        work = np.maximum(work, 0)
+        energy = work @ usage
+        if not (energy > np.maximum(length, 0)[:, :, None] * capacity).any():
+            return horizon
+    return upper_bound
+
+
+def lower_bounds(durations: Dict[int, int], precedences: Iterable[Tuple[int, int, int]],
+                 demands: Dict[Tuple[int, int], int], capacities: Dict[int, int],
+                 upper_bound: Optional[int] = None) -> LowerBounds:
+    """
+    Every bound for one instance; the energetic search starts from the best
+    of the others and stops at upper_bound (a known feasible makespan).
+    """
+    precedences = list(precedences)
+    critical_path = critical_path_bound(durations, precedences)
+    energy = energy_bound(durations, demands, capacities)
+    disjunctive = disjunctive_bound(durations, precedences, demands, capacities)
+    start = max(critical_path, energy, disjunctive)
+    if upper_bound is not None and start >= upper_bound:
+        return LowerBounds(critical_path, energy, disjunctive, start)
+    energetic = energetic_bound(durations, precedences, demands, capacities, start, upper_bound)
+    return LowerBounds(critical_path, energy, disjunctive, energetic)
+
+
+def project_lower_bounds(project: Union[Project, ProjectArrays], upper_bound: Optional[int] = None) -> LowerBounds:
+    """
+    Lower bounds of a project (see lower_bounds).
+    """
+    arrays = project.arrays
+    return lower_bounds(arrays.durations_by_id(), arrays.precedences(), arrays.demands_by_id(),
+                        arrays.capacities_by_id(), upper_bound)
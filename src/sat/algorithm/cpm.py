@@ -0,0 +1,112 @@
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+
+
+class CriticalPath:
+    """
+    Array-based critical-path engine (forward and backward pass).
+
+    Precedences are arcs (activity_id_1, activity_id_2, lag) meaning
+    start(2) >= start(1) + lag, so all four relation types reduce to a lag
+    (see sat.data.relation_type.relation_lag). The graph is split into
+    topological levels once; each pass then relaxes one level of arcs at a
+    time with vectorised max/min updates, visiting every arc exactly once.
+
+    Results are NumPy arrays indexed like activity_ids:
+
+        earliest_start, earliest_finish   after forward()
+        latest_start, latest_finish       after backward()
+    """
+
+    def __init__(self, activity_ids: Sequence[int], durations: Sequence[int],
+                 precedences: Iterable[Tuple[int, int, int]]):
+        """
+        :param activity_ids: Activity ids; position i of every result array belongs to activity_ids[i].
+        :param durations: Duration of each activity, aligned with activity_ids.
+        :param precedences: (activity_id_1, activity_id_2, lag) arcs; arcs to unknown ids are ignored.
+        """
+        self.activity_ids = list(activity_ids)
+        self.index = {activity_id: i for i, activity_id in enumerate(self.activity_ids)}
+        self.durations = np.asarray(durations, dtype=np.int64)
+
+        arcs = [(self.index[first], self.index[second], lag) for first, second, lag in precedences
+                if first in self.index and second in self.index]
+        arcs = np.asarray(arcs, dtype=np.int64).reshape(-1, 3)
+        self.sources, self.targets, self.lags = arcs[:, 0], arcs[:, 1], arcs[:, 2]
+
+        self.levels = self._levels()
+        # arcs grouped by the level of their source, in level order
+        order = np.argsort(self.levels[self.sources], kind="stable")
+        self.sources, self.targets, self.lags = self.sources[order], self.targets[order], self.lags[order]
+        self.level_bounds = np.searchsorted(self.levels[self.sources], np.arange(self.levels.max(initial=0) + 2))
+
+        self.earliest_start = None
+        self.latest_start = None
+
+    def _levels(self) -> np.ndarray:
+        # Kahn's algorithm one level at a time: level = longest arc count from a source
+        count = len(self.activity_ids)
+        in_degree = np.bincount(self.targets, minlength=count)
+        levels = np.full(count, -1, dtype=np.int64)
+        frontier = np.flatnonzero(in_degree == 0)
+        level = 0
+        while len(frontier):
+            levels[frontier] = level
+            leaving = np.isin(self.sources, frontier)
+            np.subtract.at(in_degree, self.targets[leaving], 1)
+            candidates = np.unique(self.targets[leaving])
+            frontier = candidates[in_degree[candidates] == 0]
+            level += 1
+        if (levels < 0).any():
+            raise ValueError("Precedence graph has a cycle")
+        return levels
+
+    def _level_arcs(self, level: int):
+        begin, end = self.level_bounds[level], self.level_bounds[level + 1]
+        return self.sources[begin:end], self.targets[begin:end], self.lags[begin:end]
+
+    def forward(self, release=0) -> np.ndarray:
+        """
+        Earliest start of every activity.
+
+        :param release: Lower bound on every start, a scalar or one value per activity.
+        """
+        earliest = np.zeros(len(self.activity_ids), dtype=np.int64)
+        earliest += np.asarray(release, dtype=np.int64)
+        for level in range(len(self.level_bounds) - 1):
+            sources, targets, lags = self._level_arcs(level)
+            np.maximum.at(earliest, targets, earliest[sources] + lags)
+        self.earliest_start = earliest
+        return earliest
+
+    def backward(self, horizon: int, deadline=None) -> np.ndarray:
+        """
+        Latest start of every activity such that all of them finish by horizon.
+
+        :param deadline: Optional upper bound on every start, a scalar or one value per activity.
+        """
+        latest = horizon - self.durations
+        if deadline is not None:
+            latest = np.minimum(latest, deadline)
+        for level in range(len(self.level_bounds) - 2, -1, -1):
+            sources, targets, lags = self._level_arcs(level)
+            np.minimum.at(latest, sources, latest[targets] - lags)
+        self.latest_start = latest
+        return latest
+
+    @property
+    def earliest_finish(self) -> np.ndarray:
+        return self.earliest_start + self.durations
+
+    @property
+    def latest_finish(self) -> np.ndarray:
+        return self.latest_start + self.durations
+
+    @property
+    def makespan(self) -> int:
+        """Length of the critical path (LB0), from the last forward pass."""
+        return int(self.earliest_finish.max(initial=0))
+
+    def slack(self) -> np.ndarray:
+        return self.latest_start - self.earliest_start
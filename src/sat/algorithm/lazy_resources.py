@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sat.algorithm.solve_control import SolveController
+from sat.encoding.clause_arena import ClauseArena
+from sat.encoding.pb_resources import encode_weighted_at_most
+from sat.validate.checker import ScheduleChecker
+
+# What is added for an overloaded (resource, instant) of a model:
+#   constraint  the full weighted PB constraint of that resource and instant
+#               (sat.encoding.pb_resources), so it is never overloaded again
+#   conflict    one clause per instant forbidding a minimal set of the activities
+#               running there from running together (a minimal forbidden set)
+LAZY_MODES = ("constraint", "conflict")
+
+
+class LazyResources:
+    """
+    Counterexample-guided (CEGAR) resource constraints: the formula holds
+    the precedence and timing constraints only, and resource constraints are
+    added where a model breaks them.
+
+    solve() takes the place of SolveController.solve: it solves, reads the
+    start instants of the model, builds its resource profiles (see
+    ScheduleChecker.profiles) and, while some (resource, instant) is
+    overloaded, adds the constraints excluding it and solves again. Added
+    clauses are implied by the full formula, so the solver keeps its learned
+    clauses, and a MakespanOptimizer given this object as its controller
+    refines every bound it tries. Every clause added is also written to the
+    arena, under the family "lazy_resources".
+
+    Every refinement excludes the model it was built from and there are
+    finitely many constraints to add, so the loop ends with a schedule that
+    respects the capacities, or unsat.
+    """
+
+    def __init__(self, durations: Dict[int, int], demands: Dict[Tuple[int, int], int], capacities: Dict[int, int],
+                 windows: dict, horizon: int, variables, first_free: int, mode: str = "constraint",
+                 encoding: str = None, controller: SolveController = None, arena: ClauseArena = None):
+        """
+        :param durations: {activity_id: duration}.
+        :param demands: {(activity_id, resource_id): units}; units <= 0 are ignored.
+        :param capacities: {resource_id: capacity}.
+        :param windows: {activity_id: TimeWindow} the formula was encoded with.
+        :param horizon: Encoding horizon.
+        :param variables: Variable factory of the encoding (run() and start_times()).
+        :param first_free: First variable id free for auxiliary variables.
+        :param mode: One of LAZY_MODES.
+        :param encoding: PB encoding of the "constraint" mode (sat.encoding.pb_resources.PB_ENCODINGS),
+                         None for "best".
+        :param controller: Budgets of the solver calls; None solves without limits.
+        :param arena: Receives a copy of the added clauses; None keeps them in a new one.
+        """
+        if mode not in LAZY_MODES:
+            raise ValueError(f"Unknown lazy resource mode: {mode}")
+        self.durations = durations
+        self.windows = windows
+        self.horizon = horizon
+        self.variables = variables
+        self.next_var = first_free
+        self.mode = mode
+        self.encoding = encoding or "best"
+        self.controller = controller
+        self.arena = arena if arena is not None else ClauseArena()
+
+        self.activity_ids = list(durations)
+        self.checker = ScheduleChecker(self.activity_ids, [durations[activity_id] for activity_id in self.activity_ids],
+                                       [], demands, capacities, horizon)
+        # (activity_id, units) of every consumer of each resource row of the checker
+        self.consumers = [[] for _ in self.checker.resource_ids]
+        for i, r, units in zip(self.checker.demand_activities.tolist(), self.checker.demand_resources.tolist(),
+                               self.checker.demand_units.tolist()):
+            self.consumers[r].append((self.activity_ids[i], units))
+        self.refined = set()
+        self.conflicts = set()
+
+        self.iterations = 0
+        self.refinements = 0
+        self.points = 0
+        self.clauses = 0
+
+    def solve(self, solver, assumptions: List[int] = ()) -> Optional[bool]:
+        """Solves until a model fits the capacities; True, False (unsat) or None (budget ran out)."""
+        while True:
+            self.iterations += 1
+            if self.controller is not None:
+                sat = self.controller.solve(solver, assumptions)
+            else:
+                sat = solver.solve(assumptions=list(assumptions))
+            if not sat or not self.refine(solver, solver.get_model()):
+                return sat
+
+    def refine(self, solver, model) -> int:
+        """
+        Adds the constraints excluding every overloaded (resource, instant) of
+        model to solver; returns how many clauses that added (0: model is a schedule).
+
+        :raises RuntimeError: if model overloads a resource although every
+                              constraint excluding it was added already.
+        """
+        start_times = self.variables.start_times(model, self.activity_ids, self.horizon)
+        starts = np.asarray([start_times.get(activity_id, 0) for activity_id in self.activity_ids], dtype=np.int64)
+        scheduled = np.asarray([activity_id in start_times for activity_id in self.activity_ids], dtype=bool)
+        usage = self.checker.profiles(starts, scheduled=scheduled)[:, :self.horizon]
+        overloaded = np.argwhere(usage > self.checker.capacities[:, None]).tolist()
+        if not overloaded:
+            return 0
+
+        begin = self.arena.nof_clauses()
+        self.arena.set_family("lazy_resources")
+        for r, t in overloaded:
+            if self.mode == "constraint":
+                self._add_constraint(r, t)
+            else:
+                self._add_conflict(r, t, start_times)
+        added = self.arena.nof_clauses() - begin
+        if added == 0:
+            # solving again would return the same model
+            raise RuntimeError(f"{len(overloaded)} overloaded (resource, instant) points of a model "
+                               f"are already excluded by the added constraints")
+        solver.append_formula(self.arena.clauses(begin))
+        self.refinements += 1
+        self.points += len(overloaded)
+        self.clauses += added
+        return added
+
+    def statistics(self) -> dict:
+        """SAT calls, refinement rounds, overloaded points met and clauses added."""
+        return {'iterations': self.iterations, 'refinements': self.refinements,
+                'points': self.points, 'clauses': self.clauses}
+
+    def _add_constraint(self, r: int, t: int):
+        # sum demand(a) * run(a, t) <= capacity over every activity that can run at t
+        if (r, t) in self.refined:
+            return
+        self.refined.add((r, t))
+        running = [(activity_id, units) for activity_id, units in self.consumers[r]
+                   if t in self.windows[activity_id].run_times]
+        literals = [self.variables.run(activity_id, t) for activity_id, _ in running]
+        self.next_var = encode_weighted_at_most(self.arena, [units for _, units in running], literals,
+                                                int(self.checker.capacities[r]), self.encoding, self.next_var)
+
+    def _add_conflict(self, r: int, t: int, start_times: Dict[int, int]):
+        # largest demands first until the capacity is exceeded: dropping any of
+        # them fits again, so the set is minimal
+        running = sorted(((units, activity_id) for activity_id, units in self.consumers[r]
+                          if activity_id in start_times
+                          and start_times[activity_id] <= t < start_times[activity_id] + self.durations[activity_id]),
+                         reverse=True)
+        conflict, total = [], 0
+        for units, activity_id in running:
+            conflict.append(activity_id)
+            total += units
+            if total > self.checker.capacities[r]:
+                break
+        key = frozenset(conflict)
+        if key in self.conflicts:
+            return
+        self.conflicts.add(key)
+        # the set may not run together at any instant all of its windows allow
+        first = max(self.windows[activity_id].earliest_start for activity_id in conflict)
+        last = min(self.windows[activity_id].run_end for activity_id in conflict)
+        for time in range(first, last):
+            self.arena.add_clause([-self.variables.run(activity_id, time) for activity_id in conflict])
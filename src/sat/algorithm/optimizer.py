@@ -0,0 +1,144 @@
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from sat.algorithm.solve_control import SolveController
+
+STRATEGIES = ("bisection", "linear_ub", "linear_lb", "hybrid")
+
+
+class OptimizationStep(NamedTuple):
+    """
+    One SAT call of the optimizer.
+
+    Attributes:
+    ----------
+    horizon : int
+        Makespan asked for (every activity finishes by horizon).
+    sat : Optional[bool]
+        Whether a schedule that short exists; None when the budget ran out.
+    makespan : Optional[int]
+        Makespan of the model found, None when unsat.
+    time : float
+        Seconds spent in the solver.
+    """
+    horizon: int
+    sat: Optional[bool]
+    makespan: Optional[int]
+    time: float
+
+
+class OptimizationResult(NamedTuple):
+    """
+    Outcome of MakespanOptimizer.minimize.
+
+    Attributes:
+    ----------
+    makespan : Optional[int]
+        Best makespan found, None when even the encoding horizon is unsat.
+    model : Optional[List[int]]
+        Solver model of that schedule.
+    lower_bound : int
+        Largest makespan proven infeasible, plus one.
+    steps : List[OptimizationStep]
+        Every SAT call in order.
+    interrupted : bool
+        The search stopped on a call that ran out of budget.
+    """
+    makespan: Optional[int]
+    model: Optional[List[int]]
+    lower_bound: int
+    steps: List[OptimizationStep]
+    interrupted: bool
+
+    @property
+    def optimal(self) -> bool:
+        return self.makespan is not None and self.makespan <= self.lower_bound
+
+
+class MakespanOptimizer:
+    """
+    Incremental makespan minimisation on one solver holding the formula for
+    the encoding horizon. Every bound is tried through assumptions on the
+    workload literals aux(t) (no activity runs at t >= horizon) and the start
+    literals of zero-duration activities, so clauses learned in one call are
+    kept for the next. With a SolveController the
+    calls stop within its budget, and the search ends at the first call that
+    does not finish, keeping the best schedule found so far.
+
+    Strategies (see STRATEGIES):
+
+        bisection   halve the gap between the proven bounds
+        linear_ub   from the horizon downwards, one below each model's makespan, until unsat
+        linear_lb   from the lower bound upwards until sat
+        hybrid      bisection until the gap is at most hybrid_gap, then linear_ub
+    """
+
+    def __init__(self, solver, assumptions: Callable[[int], List[int]], makespan_of: Callable[[List[int]], int],
+                 strategy: str = "bisection", hybrid_gap: int = 4, controller: SolveController = None):
+        """
+        :param solver: PySAT solver with the whole formula loaded.
+        :param assumptions: Literals forcing every activity to finish by the given horizon.
+        :param makespan_of: Makespan of a solver model.
+        :param strategy: One of STRATEGIES.
+        :param hybrid_gap: Gap at which the hybrid strategy switches to linear_ub.
+        :param controller: Budgets for the solver calls; None solves without limits.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown optimization strategy: {strategy}")
+        self.solver = solver
+        self.assumptions = assumptions
+        self.makespan_of = makespan_of
+        self.strategy = strategy
+        self.hybrid_gap = hybrid_gap
+        self.controller = controller
+        self.interrupted = False
+        self.steps = []
+        self.best = None
+        self.model = None
+        self.infeasible = 0
+
+    def minimize(self, lower_bound: int, horizon: int) -> OptimizationResult:
+        """
+        :param lower_bound: No schedule is shorter than this.
+        :param horizon: Encoding horizon; the formula itself allows makespans up to it.
+        """
+        self.steps = []
+        self.best = None
+        self.model = None
+        self.interrupted = False
+        # infeasible < makespan <= self.best
+        self.infeasible = lower_bound - 1
+
+        if self.strategy == "linear_lb":
+            for current in range(lower_bound, horizon + 1):
+                if self._solve(current, horizon) is not False:
+                    break
+        else:
+            if self._solve(horizon, horizon):
+                if self.strategy in ("bisection", "hybrid"):
+                    gap = 1 if self.strategy == "bisection" else self.hybrid_gap
+                    while self.best - self.infeasible > gap and not self.interrupted:
+                        self._solve((self.infeasible + self.best) // 2, horizon)
+                while self.best - self.infeasible > 1 and not self.interrupted and self._solve(self.best - 1, horizon):
+                    pass
+        return OptimizationResult(self.best, self.model, self.infeasible + 1, self.steps, self.interrupted)
+
+    def _solve(self, current: int, horizon: int) -> Optional[bool]:
+        begin = time.time()
+        assumptions = self.assumptions(current) if current < horizon else []
+        if self.controller is not None:
+            sat = self.controller.solve(self.solver, assumptions)
+        else:
+            sat = self.solver.solve(assumptions=assumptions)
+        makespan = None
+        if sat:
+            model = self.solver.get_model()
+            makespan = self.makespan_of(model)
+            if self.best is None or makespan < self.best:
+                self.best, self.model = makespan, model
+        elif sat is False:
+            self.infeasible = max(self.infeasible, current)
+        else:
+            self.interrupted = True
+        self.steps.append(OptimizationStep(current, sat, makespan, round(time.time() - begin, 3)))
+        return sat
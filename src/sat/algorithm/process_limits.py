@@ -0,0 +1,164 @@
+import multiprocessing
+import pickle
+import queue as queue_module
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import psutil
+
+
+class LimitedRun(NamedTuple):
+    """
+    Outcome of run_limited.
+
+    Attributes:
+    ----------
+    status : str
+        "done", "timeout" (wall-clock limit), "memout" (memory limit) or "error".
+    result : Any
+        Return value of the function when done, the traceback text on error.
+    statistics : Dict
+        Last statistics reported by the child before it ended or was killed.
+    elapsed : float
+        Wall-clock seconds of the child.
+    peak_rss : int
+        Largest memory seen, in bytes: the unique set size (USS) of the child
+        and its own children, i.e. the pages they do not share with the parent.
+    """
+    status: str
+    result: Any
+    statistics: Dict
+    elapsed: float
+    peak_rss: int
+
+
+def _context():
+    # fork shares the encoders' singletons and the project without pickling them
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+def _child(queue, func, args, kwargs, statistics, interval):
+    if statistics is not None:
+        def report():
+            while True:
+                try:
+                    queue.put(("statistics", statistics()))
+                except Exception:
+                    pass
+                time.sleep(interval)
+        threading.Thread(target=report, daemon=True).start()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException:
+        queue.put(("error", traceback.format_exc()))
+        return
+    if statistics is not None:
+        queue.put(("statistics", statistics()))
+    queue.put(("done", result))
+
+
+def _rss(process: psutil.Process) -> int:
+    # a forked child maps the parent's pages copy-on-write: its RSS counts the
+    # parent's memory too, USS only the pages the child owns
+    try:
+        processes = [process] + process.children(recursive=True)
+    except psutil.Error:
+        return 0
+    total = 0
+    for child in processes:
+        try:
+            total += child.memory_full_info().uss
+        except psutil.AccessDenied:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def run_limited(func: Callable, args=(), kwargs=None, time_limit: Optional[float] = None,
+                memory_limit: Optional[int] = None, statistics: Optional[Callable[[], Dict]] = None,
+                interval: float = 0.5) -> LimitedRun:
+    """
+    Runs func(*args, **kwargs) in a child process and kills it (and everything
+    it started) once it exceeds time_limit seconds or memory_limit bytes of
+    memory it owns (USS, see LimitedRun.peak_rss).
+    Nothing the child started outlives the call.
+
+    :param statistics: Called in the child every interval seconds; the last
+                       value reaches the parent even when the child is killed.
+    :param interval: Seconds between statistics reports and limit checks.
+    """
+    context = _context()
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue, func, args, kwargs or {}, statistics, interval),
+                              daemon=True)
+    begin = time.time()
+    process.start()
+    monitor = psutil.Process(process.pid)
+
+    status, result, last_statistics, peak_rss = None, None, {}, 0
+    while status is None:
+        # limits are checked on every pass: the statistics reports arrive every
+        # interval, so a get() timeout alone would never run the checks
+        timeout = interval
+        if time_limit is not None:
+            timeout = max(0.0, min(interval, begin + time_limit - time.time()))
+        try:
+            kind, value = queue.get(timeout=timeout)
+        except queue_module.Empty:
+            pass
+        except Exception:
+            # a message the parent cannot read, e.g. an unpicklable result or a child dying mid-write
+            status, result = "error", traceback.format_exc()
+            break
+        else:
+            if kind == "statistics":
+                last_statistics = value
+            else:
+                status, result = kind, value
+                break
+        peak_rss = max(peak_rss, _rss(monitor))
+        if time_limit is not None and time.time() - begin > time_limit:
+            status = "timeout"
+        elif memory_limit is not None and peak_rss > memory_limit:
+            status = "memout"
+        elif not process.is_alive() and queue.empty():
+            status, result = "error", f"child exited with code {process.exitcode}"
+    elapsed = time.time() - begin
+    peak_rss = max(peak_rss, _rss(monitor))
+
+    if status in ("timeout", "memout"):
+        _kill(monitor)
+        # statistics sent between the last poll and the kill
+        while True:
+            try:
+                kind, value = queue.get_nowait()
+            except queue_module.Empty:
+                break
+            except (EOFError, pickle.UnpicklingError):
+                # a report cut off by the kill; the status stays timeout/memout
+                break
+            if kind == "statistics":
+                last_statistics = value
+    process.join(timeout=5)
+    if process.is_alive():
+        _kill(monitor)
+        process.join()
+    queue.close()
+    return LimitedRun(status, result, last_statistics, round(elapsed, 3), peak_rss)
+
+
+def _kill(process: psutil.Process):
+    try:
+        processes = process.children(recursive=True) + [process]
+    except psutil.Error:
+        return
+    for child in processes:
+        try:
+            child.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(processes, timeout=5)
@@ -1,7 +1,18 @@
-from pysat.solvers import Glucose3
+from pysat.solvers import Solver
 from sat.data.project import Project
 from sat.encoding.sat_decoder import SatDecoder
 from sat.encoding.variable_factory import VariableFactory
+from sat.encoding.clause_arena import ClauseArena
+from sat.encoding.cnf_cache import CnfCache
+from sat.encoding.encoding_options import EncodingOptions
+from sat.algorithm.time_windows import project_time_windows
+from sat.algorithm.sgs import heuristic_schedule
+from sat.algorithm.bounds import project_lower_bounds
+from sat.algorithm.optimizer import MakespanOptimizer
+from sat.algorithm.process_limits import run_limited
+from sat.algorithm.lazy_resources import LazyResources
+from sat.algorithm.solve_control import SolveBudget, SolveController
+from sat.encoding.dimacs import read_dimacs, read_encoding_horizon, read_variable_state, write_dimacs
 
 from sat.encoding.se_bdd_bdd import SatEncoderBddBdd
 from sat.encoding.se_bdd_nsc import SatEncoderBddNsc
@@ -11,42 +22,71 @@ from sat.encoding.se_card_card import SatEncoderCardCard
 from sat.encoding.se_card_nsc import SatEncoderCardNsc
 from sat.encoding.se_powerset import SatEncoderPowerset
 from  sat.validate import  validate_project
-import threading
 import time
 
-class TimeLimitExpired(Exception):
-    pass
-
-def timeout(func, args=(), kwargs={}, timeout_duration=1, default=None):
-    class InterruptableThread(threading.Thread):
-        def __init__(self):
-            threading.Thread.__init__(self)
-            self.result = None
-
-        def run(self):
-            try:
-                self.result = func(*args, **kwargs)
-            except Exception as e:
-                self.result = default
-
-    it = InterruptableThread()
-    it.start()
-    it.join(timeout_duration)
-    if it.is_alive():  # Note: changed isAlive() to is_alive() for newer Python versions
-        raise TimeLimitExpired()
-    else:
-        return it.result
-
 class RcpspAlogithm:
-    def __init__(self, project:Project):
+    def __init__(self, project:Project, dense_variables:bool=False, cache:CnfCache=None,
+                 options:EncodingOptions=None, heuristic_horizon:bool=False, strategy:str=None,
+                 time_limit:float=None, memory_limit:int=None, budget:SolveBudget=None,
+                 solver:str="glucose3"):
+        # strategy None only checks feasibility at the horizon, otherwise one of
+        # sat.algorithm.optimizer.STRATEGIES minimises the makespan
+        # heuristic_horizon: encode up to the makespan of a priority-rule schedule instead of
+        # project.max_time (smaller formula, different cache keys); off unless asked for
+        # time_limit (seconds) / memory_limit (bytes the child owns, USS): encode + solve run in a child
+        # process that is killed past either limit; both None (the default) runs in this process
+        # budget: conflict/propagation/time limits of the SAT calls, status 'unknown' past them
+        # solver: PySAT solver name (glucose3, cadical153, minisat22, ...)
         self.project = project
+        self.solver = solver
+        self.strategy = strategy
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.controller = SolveController(budget)
+        self.options = options or EncodingOptions()
+        self.heuristic_horizon = heuristic_horizon
+        self.heuristic = None
+        self.dense_variables = dense_variables
+        self.cache = cache
         self.cnf = self._init_solver()
+        self.arena = ClauseArena()
         self.decoder= SatDecoder.get_sat_decoder()
         self.vr=VariableFactory.get_variable_factory()
+        self.lazy = None
 
 
-    def calculate(self,type_encoder:str):
-        
+    def calculate(self,type_encoder:str,dimacs_path:str=None):
+        if self.heuristic_horizon:
+            self._use_heuristic_horizon()
+        if self.time_limit is None and self.memory_limit is None:
+            # in-process: nothing measures the peak, the key is kept so every result has the same fields
+            result = self._calculate(type_encoder, dimacs_path)
+            result['peak_rss'] = None
+            return result
+
+        run = run_limited(self._calculate, args=(type_encoder, dimacs_path),
+                          time_limit=self.time_limit, memory_limit=self.memory_limit,
+                          statistics=self._statistics)
+        if run.status == "done":
+            result = run.result
+        else:
+            # killed or crashed: report how far the encoding got
+            result = {
+                'vars': run.statistics.get('vars', 0),
+                'clauses': run.statistics.get('clauses', 0),
+                'status': run.status,
+                'time': run.elapsed,
+                'families': run.statistics.get('families', {}),
+            }
+            if run.status == "error":
+                print(run.result)
+            else:
+                self._use_heuristic_schedule(result)
+            result['horizon'] = self.horizon
+        result['peak_rss'] = run.peak_rss
+        return result
+
+    def _calculate(self,type_encoder:str,dimacs_path:str=None):
         if type_encoder == "bdd_bdd":
             sat_encoder = SatEncoderBddBdd.get_sat_encoder()
         elif type_encoder == "bdd_nsc":
@@ -63,32 +103,90 @@ class RcpspAlogithm:
             sat_encoder=SatEncoderPowerset.get_sat_encoder()
         
         start_time = time.time()
-        try:
-            timeout(
-                sat_encoder.handle,
-                args=(self.cnf, self.project),
-                timeout_duration=900
-            )
-            result = self.solve_problem()
-            end_time = time.time()
-            result['time'] = round(end_time - start_time, 3)
-        except TimeLimitExpired:
-            result = {
-                'vars': self.cnf.nof_vars(),
-                'clauses': self.cnf.nof_clauses(),
-                'status': 'timeout',
-                'time': 900,
-            }
+        self._encode(sat_encoder, type_encoder)
+        if dimacs_path is not None:
+            self.export_dimacs(dimacs_path)
+        self.arena.load_into(self.cnf)
+        result = self.solve_problem()
+        end_time = time.time()
+        result['time'] = round(end_time - start_time, 3)
+        result['horizon'] = self.horizon
         self._reset()
         return result
 
+    def _statistics(self):
+        # Sent from the child process while it runs (see run_limited); the variable
+        # counter stands in for arena.nof_vars, whose buffer view would stop the
+        # encoder from appending
+        return {
+            'vars': self.vr.var_count - 1,
+            'clauses': self.arena.nof_clauses(),
+            'families': self.arena.statistics(),
+        }
+
     
+    def _encode(self, sat_encoder, type_encoder:str):
+        # Reuses a cached encoding of (instance, encoder, horizon) when one exists
+        key = None
+        if self.cache is not None:
+            key = CnfCache.key(self.project.data_path, type_encoder, self.horizon,
+                               self.dense_variables, self.options.model_dump_json())
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.arena, variable_state, horizon = cached
+                self.vr.load_state(variable_state)
+                self._use_encoding_horizon(horizon)
+                return
+        if self.dense_variables:
+            self._use_dense_variables()
+        sat_encoder.handle(self.arena, self.project, self.options)
+        if key is not None:
+            self.cache.put(key, self.arena, self.vr.state(), self.horizon)
+
+    @property
+    def horizon(self) -> int:
+        return self.options.horizon or self.project.max_time
+
+    def _use_heuristic_horizon(self):
+        # A feasible priority-rule schedule bounds the makespan, so it is a valid horizon
+        if self.heuristic is None:
+            self.heuristic = heuristic_schedule(self.project)
+        if self.options.horizon is None and 0 < self.heuristic.makespan < self.project.max_time:
+            self.options = self.options.model_copy(update={"horizon": self.heuristic.makespan})
+
+    def _use_encoding_horizon(self, horizon):
+        # aux(t) and the windows only exist below the horizon of the stored formula
+        if horizon is not None and horizon != self.horizon:
+            self.options = self.options.model_copy(update={"horizon": horizon})
+
+    def export_dimacs(self, path:str):
+        # Writes the encoded formula as DIMACS (.gz compresses) plus the variable map sidecar
+        write_dimacs(self.arena, path, self.vr.state(), self.horizon)
+
+    def solve_dimacs(self, path:str):
+        # Solves and decodes a formula written by export_dimacs without re-encoding
+        start_time = time.time()
+        self.arena = read_dimacs(path)
+        self.vr.load_state(read_variable_state(path))
+        # decode and optimise against the horizon the formula was encoded with
+        self._use_encoding_horizon(read_encoding_horizon(path))
+        self.arena.load_into(self.cnf)
+        result = self.solve_problem()
+        result['time'] = round(time.time() - start_time, 3)
+        self._reset()
+        return result
+
     def solve_problem(self):
-        status="unsat"
-        if self.cnf.solve():
+        self.controller.start()
+        self.lazy = self._lazy_resources()
+        if self.strategy is not None:
+            return self.optimize_problem()
+        sat = self._solver_controller().solve(self.cnf)
+        status="unsat" if sat is False else "unknown"
+        if sat:
             status="sat"
             try:
-                schedule = self.decoder.handle(self.cnf, self.project)
+                schedule = self.decoder.handle(self.cnf, self.project, max_time=self.horizon)
                 # is_valid, validation_results =validate_project(schedule,self.project)
                 # print("is_valid",is_valid)
                 print("schedule",schedule)
@@ -97,22 +195,119 @@ class RcpspAlogithm:
                 print(e)
             
         result = {
-            'vars': self.cnf.nof_vars(),
-            'clauses': self.cnf.nof_clauses(),
+            'vars': self.arena.nof_vars(),
+            'clauses': self.arena.nof_clauses(),
+            'status': status,
+            'families': self.arena.statistics(),
+        }
+        if sat is None and self._use_heuristic_schedule(result):
+            result['status'] = "heuristic"
+        if self.lazy is not None:
+            result['lazy'] = self.lazy.statistics()
+        return result
+
+
+    def optimize_problem(self):
+        # Minimises the makespan on the loaded solver, reusing it for every bound
+        lower_bound = project_lower_bounds(self.project, upper_bound=self.horizon).best
+        optimizer = MakespanOptimizer(self.cnf, self._assumptions, self._makespan_of, self.strategy,
+                                      controller=self._solver_controller())
+        outcome = optimizer.minimize(lower_bound, self.horizon)
+        status="unknown" if outcome.interrupted else "unsat"
+        if outcome.makespan is not None:
+            status="sat"
+            try:
+                schedule = self.decoder.handle(self.cnf, self.project, outcome.model, self.horizon)
+                print("schedule",schedule)
+                end = max((row['end_time'] for row in schedule), default=0)
+                if end != outcome.makespan:
+                    raise ValueError(f"decoded schedule ends at {end}, not at makespan {outcome.makespan}")
+            except Exception as e:
+                status="error"
+                print(e)
+
+        result = {
+            'vars': self.arena.nof_vars(),
+            'clauses': self.arena.nof_clauses(),
             'status': status,
+            'makespan': outcome.makespan,
+            'lower_bound': outcome.lower_bound,
+            'optimal': outcome.optimal,
+            'interrupted': outcome.interrupted,
+            'steps': [step._asdict() for step in outcome.steps],
+            'families': self.arena.statistics(),
         }
+        if outcome.makespan is None and outcome.interrupted and self._use_heuristic_schedule(result):
+            result['status'] = "heuristic"
+        if self.lazy is not None:
+            result['lazy'] = self.lazy.statistics()
         return result
 
+    def _use_heuristic_schedule(self, result) -> bool:
+        # the solver gave no schedule within its limits: the heuristic one is the fallback answer
+        if self.heuristic is None:
+            return False
+        print("schedule", self.decoder.schedule(self.project, self.heuristic.starts))
+        result['makespan'] = self.heuristic.makespan
+        result['starts'] = dict(self.heuristic.starts)
+        return True
+
+    def _lazy_resources(self):
+        # options.lazy_resources: the encoders left the resource constraints out,
+        # they are added while solving where a model overloads a resource
+        if self.options.lazy_resources is None:
+            return None
+        arrays = self.project.arrays
+        windows = project_time_windows(self.project, self.horizon, self.options.time_windows)
+        return LazyResources(arrays.durations_by_id(), arrays.demands_by_id(), arrays.capacities_by_id(),
+                             windows, self.horizon, self.vr, self.vr.var_count, self.options.lazy_resources,
+                             self.options.resource_encoding, self.controller, self.arena)
+
+    def _solver_controller(self):
+        # the lazy loop runs its SAT calls through the controller and its budget
+        return self.lazy if self.lazy is not None else self.controller
+
+    def _assumptions(self, horizon:int):
+        # no activity runs at or after horizon; zero-duration activities never run,
+        # so they are kept from starting after it
+        assumptions = [-self.vr.aux(t) for t in range(horizon, self.horizon)]
+        for activity_id in self._zero_duration_ids():
+            for t in range(horizon + 1, self.horizon):
+                var = self.vr.find_start(activity_id, t)
+                if var is not None:
+                    assumptions.append(-var)
+        return assumptions
+
+    def _makespan_of(self, model):
+        # aux(t) holds exactly while some activity runs, and never again once false;
+        # a zero-duration activity ends where it starts
+        makespan = sum(1 for t in range(self.horizon) if model[self.vr.aux(t) - 1] > 0)
+        starts = self.vr.start_times(model, self._zero_duration_ids(), self.horizon)
+        return max([makespan, *starts.values()])
+
+    def _zero_duration_ids(self):
+        arrays = self.project.arrays
+        return arrays.activity_ids[arrays.durations == 0].tolist()
             
+    def _use_dense_variables(self):
+        windows = project_time_windows(self.project, self.horizon, self.options.time_windows)
+        # the weighted and lazy resource encodings have no consume variables to lay out
+        demands = ({} if self.options.resource_encoding is not None or self.options.lazy_resources is not None
+                   else self.project.arrays.demands_by_id())
+        self.vr.use_dense_layout(self.project.arrays.activity_ids.tolist(), self.horizon, demands,
+                                 started=self.options.time_encoding == "order", windows=windows)
+
     def _init_solver(self):
-        cnf = Glucose3()
-        cnf.conf_budget(3600 * 1000)
+        # budgets are set per call by the SolveController
+        cnf = Solver(name=self.solver)
         # cnf.get_model()
         return cnf
     
     def _reset(self):
         self.cnf=self._init_solver()
+        self.arena = ClauseArena()
         self.vr.reset()
+        self.lazy = None
 
 
 
@@ -0,0 +1,268 @@
+from heapq import heappop, heappush
+from typing import Dict, Iterable, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from sat.algorithm.cpm import CriticalPath
+from sat.data.project import Project
+from sat.data.project_arrays import ProjectArrays
+
+SCHEMES = ("serial", "parallel")
+PRIORITY_RULES = ("lft", "mts")
+
+
+class Schedule(NamedTuple):
+    """
+    Feasible schedule found by a schedule generation scheme.
+
+    Attributes:
+    ----------
+    starts : Dict[int, int]
+        {activity_id: start instant}.
+    makespan : int
+        Latest finish instant; a valid encoding horizon.
+    """
+    starts: Dict[int, int]
+    makespan: int
+
+
+class ScheduleGenerator:
+    """
+    Priority-rule schedule generation schemes (serial and parallel SGS) with
+    forward-backward improvement, giving a feasible makespan to use as the
+    encoding horizon / upper bound.
+
+    Precedences are arcs (activity_id_1, activity_id_2, lag) meaning
+    start(2) >= start(1) + lag, as in CriticalPath. Resources are renewable:
+    at every instant the demands of the running activities must fit the
+    capacity.
+
+    Priority rules (smaller key is scheduled first):
+
+        lft   latest finish time from the backward critical-path pass
+        mts   most total successors (transitive)
+    """
+
+    def __init__(self, durations: Dict[int, int], precedences: Iterable[Tuple[int, int, int]],
+                 demands: Dict[Tuple[int, int], int], capacities: Dict[int, int]):
+        """
+        :param durations: {activity_id: duration}.
+        :param precedences: (activity_id_1, activity_id_2, lag) arcs; arcs to unknown ids are ignored.
+        :param demands: {(activity_id, resource_id): units used while the activity runs}.
+        :param capacities: {resource_id: capacity}.
+        :raises ValueError: if an activity needs more than a resource's capacity.
+        """
+        self.durations = dict(durations)
+        self.activity_ids = list(self.durations)
+        self.precedences = [(first, second, lag) for first, second, lag in precedences
+                            if first in self.durations and second in self.durations]
+        self.capacities = dict(capacities)
+        self.demands = dict(demands)
+
+        resource_index = {resource_id: i for i, resource_id in enumerate(self.capacities)}
+        self.capacity = np.asarray(list(self.capacities.values()), dtype=np.int64)
+        self.usage = {activity_id: np.zeros(len(resource_index), dtype=np.int64) for activity_id in self.activity_ids}
+        for (activity_id, resource_id), units in self.demands.items():
+            if activity_id in self.usage and resource_id in resource_index and units > 0:
+                self.usage[activity_id][resource_index[resource_id]] += units
+        for activity_id, usage in self.usage.items():
+            if (usage > self.capacity).any():
+                raise ValueError(f"Activity {activity_id} needs more than the capacity of a resource")
+
+        self.predecessors = {activity_id: [] for activity_id in self.activity_ids}
+        self.successors = {activity_id: [] for activity_id in self.activity_ids}
+        for first, second, lag in self.precedences:
+            self.predecessors[second].append((first, lag))
+            self.successors[first].append(second)
+
+        # every start stays below the sum of durations, since no lag exceeds the predecessor's duration
+        self.horizon = sum(max(duration, 0) for duration in self.durations.values())
+        self.engine = CriticalPath(self.activity_ids, list(self.durations.values()), self.precedences)
+        self.engine.backward(self.horizon)
+        self._reversed = None
+
+    def priorities(self, rule: str) -> Dict[int, tuple]:
+        """
+        Priority key of every activity for a rule of PRIORITY_RULES.
+        """
+        if rule == "lft":
+            latest_finish = self.engine.latest_finish.tolist()
+            return {activity_id: (latest_finish[i], activity_id) for i, activity_id in enumerate(self.activity_ids)}
+        if rule == "mts":
+            successors = self.total_successors()
+            return {activity_id: (-successors[activity_id], activity_id) for activity_id in self.activity_ids}
+        raise ValueError(f"Unknown priority rule: {rule}")
+
+    def total_successors(self) -> Dict[int, int]:
+        # bitsets of transitive successors, filled in reverse topological order
+        index = {activity_id: i for i, activity_id in enumerate(self.activity_ids)}
+        reach = {}
+        for i in np.argsort(-self.engine.levels, kind="stable").tolist():
+            activity_id = self.activity_ids[i]
+            mask = 0
+            for successor in self.successors[activity_id]:
+                mask |= reach[successor] | (1 << index[successor])
+            reach[activity_id] = mask
+        return {activity_id: bin(mask).count("1") for activity_id, mask in reach.items()}
+
+    def generate(self, scheme: str = "serial", rule: str = "lft", improve: bool = False) -> Schedule:
+        """
+        One schedule from a scheme of SCHEMES and a rule of PRIORITY_RULES.
+
+        :param improve: Apply forward-backward improvement to the result.
+        """
+        priorities = self.priorities(rule)
+        if scheme == "serial":
+            schedule = self.serial(priorities)
+        elif scheme == "parallel":
+            schedule = self.parallel(priorities)
+        else:
+            raise ValueError(f"Unknown schedule generation scheme: {scheme}")
+        return self.improve(schedule) if improve else schedule
+
+    def best(self, improve: bool = True) -> Schedule:
+        """
+        Shortest schedule over every scheme and priority rule.
+        """
+        return min((self.generate(scheme, rule, improve) for scheme in SCHEMES for rule in PRIORITY_RULES),
+                   key=lambda schedule: schedule.makespan)
+
+    def serial(self, priorities: Dict[int, tuple]) -> Schedule:
+        """
+        Serial SGS: takes the eligible activity with the smallest priority key
+        and starts it at the first precedence- and resource-feasible instant.
+        """
+        profile = self._new_profile()
+        starts = {}
+        waiting = {activity_id: len(predecessors) for activity_id, predecessors in self.predecessors.items()}
+        eligible = [(priorities[activity_id], activity_id) for activity_id, count in waiting.items() if count == 0]
+        eligible.sort()
+        while eligible:
+            _, activity_id = heappop(eligible)
+            start, profile = self._first_fit(profile, activity_id, self._earliest(activity_id, starts))
+            self._place(profile, activity_id, start)
+            starts[activity_id] = start
+            for successor in self.successors[activity_id]:
+                waiting[successor] -= 1
+                if waiting[successor] == 0:
+                    heappush(eligible, (priorities[successor], successor))
+        return self._schedule(starts)
+
+    def parallel(self, priorities: Dict[int, tuple]) -> Schedule:
+        """
+        Parallel SGS: walks the decision instants in time order and starts, by
+        priority, every eligible activity that fits at the current instant.
+        """
+        profile = self._new_profile()
+        starts = {}
+        waiting = {activity_id: len(predecessors) for activity_id, predecessors in self.predecessors.items()}
+        eligible = {activity_id for activity_id, count in waiting.items() if count == 0}
+        time = 0
+        while eligible:
+            placed = True
+            while placed:
+                placed = False
+                for activity_id in sorted(eligible, key=priorities.__getitem__):
+                    if self._earliest(activity_id, starts) > time:
+                        continue
+                    start, profile = self._first_fit(profile, activity_id, time)
+                    if start != time:
+                        continue
+                    self._place(profile, activity_id, start)
+                    starts[activity_id] = start
+                    eligible.discard(activity_id)
+                    for successor in self.successors[activity_id]:
+                        waiting[successor] -= 1
+                        if waiting[successor] == 0:
+                            eligible.add(successor)
+                    placed = True
+                    break
+            # next decision instant: a running activity finishes or an eligible one is released
+            instants = [start + self.durations[activity_id] for activity_id, start in starts.items()]
+            instants += [self._earliest(activity_id, starts) for activity_id in eligible]
+            instants = [instant for instant in instants if instant > time]
+            if eligible and not instants:
+                raise RuntimeError("Parallel SGS is stuck")
+            time = min(instants, default=time)
+        return self._schedule(starts)
+
+    def improve(self, schedule: Schedule, iterations: int = 10) -> Schedule:
+        """
+        Forward-backward improvement (justification): alternately right-justifies
+        the schedule on the reversed project and left-justifies it again, keeping
+        the shortest schedule seen.
+        """
+        best = schedule
+        for _ in range(iterations):
+            # backward: reversed time, latest finishing activity first
+            backward = self.reversed().serial({activity_id: (best.makespan - start - self.durations[activity_id], activity_id)
+                                               for activity_id, start in best.starts.items()})
+            starts = {activity_id: backward.makespan - start - self.durations[activity_id]
+                      for activity_id, start in backward.starts.items()}
+            forward = self.serial({activity_id: (start, activity_id) for activity_id, start in starts.items()})
+            candidate = min(self._schedule(starts), forward, key=lambda schedule: schedule.makespan)
+            if candidate.makespan >= best.makespan:
+                break
+            best = candidate
+        return best
+
+    def reversed(self) -> "ScheduleGenerator":
+        """
+        The same project with every arc turned around, on which a forward
+        schedule read backwards (start = makespan - finish) is a schedule
+        of this project.
+        """
+        if self._reversed is None:
+            # start(2) >= start(1) + lag  <=>  rstart(1) >= rstart(2) + lag + d2 - d1
+            arcs = [(second, first, lag + self.durations[second] - self.durations[first])
+                    for first, second, lag in self.precedences]
+            self._reversed = ScheduleGenerator(self.durations, arcs, self.demands, self.capacities)
+        return self._reversed
+
+    def _earliest(self, activity_id: int, starts: Dict[int, int]) -> int:
+        return max((starts[first] + lag for first, lag in self.predecessors[activity_id]), default=0)
+
+    def _new_profile(self) -> np.ndarray:
+        return np.zeros((len(self.capacity), self.horizon + 1), dtype=np.int64)
+
+    def _first_fit(self, profile: np.ndarray, activity_id: int, earliest: int):
+        # first start >= earliest where the demand fits during the whole duration
+        duration = self.durations[activity_id]
+        usage = self.usage[activity_id]
+        time = max(earliest, 0)
+        if duration <= 0 or not usage.any():
+            return time, profile
+        while True:
+            if time + duration > profile.shape[1]:
+                profile = np.pad(profile, ((0, 0), (0, time + duration - profile.shape[1])))
+            overload = (profile[:, time:time + duration] + usage[:, None] > self.capacity[:, None]).any(axis=0)
+            if not overload.any():
+                return time, profile
+            time += int(np.flatnonzero(overload)[-1]) + 1
+
+    def _place(self, profile: np.ndarray, activity_id: int, start: int):
+        duration = self.durations[activity_id]
+        if duration > 0:
+            profile[:, start:start + duration] += self.usage[activity_id][:, None]
+
+    def _schedule(self, starts: Dict[int, int]) -> Schedule:
+        if len(starts) < len(self.activity_ids):
+            raise ValueError("Precedence graph has a cycle")
+        makespan = max((start + self.durations[activity_id] for activity_id, start in starts.items()), default=0)
+        return Schedule({activity_id: starts[activity_id] for activity_id in self.activity_ids}, makespan)
+
+
+def project_schedule_generator(project: Union[Project, ProjectArrays]) -> ScheduleGenerator:
+    """
+    ScheduleGenerator over the activities, relations and resources of a project.
+    """
+    arrays = project.arrays
+    return ScheduleGenerator(arrays.durations_by_id(), arrays.precedences(), arrays.demands_by_id(),
+                             arrays.capacities_by_id())
+
+
+def heuristic_schedule(project: Union[Project, ProjectArrays], improve: bool = True) -> Schedule:
+    """
+    Best priority-rule schedule of a project (see ScheduleGenerator.best).
+    """
+    return project_schedule_generator(project).best(improve)
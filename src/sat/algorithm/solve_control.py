@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class SolveBudget(BaseModel):
+    """
+    Limits on the SAT calls of one instance; None means unlimited.
+
+    Attributes:
+    ----------
+    time_limit : Optional[float]
+        Wall-clock seconds for all calls together; a timer interrupts the solver.
+    conflicts : Optional[int]
+        Conflicts allowed per call (solver conf_budget).
+    propagations : Optional[int]
+        Propagations allowed per call (solver prop_budget).
+    """
+    time_limit: Optional[float] = None
+    conflicts: Optional[int] = None
+    propagations: Optional[int] = None
+
+
+class SolveController:
+    """
+    Runs solver calls through solve_limited so they stop within a SolveBudget.
+    solve() returns True (sat), False (unsat) or None (unknown: a budget ran
+    out or the timer interrupted the call).
+
+    The time limit counts from the first call (or from start()), so a sequence
+    of calls such as a bisection shares it.
+    """
+
+    def __init__(self, budget: SolveBudget = None):
+        self.budget = budget or SolveBudget()
+        self.deadline = None
+
+    def start(self):
+        """Starts the wall-clock budget now."""
+        if self.budget.time_limit is not None:
+            self.deadline = time.time() + self.budget.time_limit
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left of the time limit, None without one."""
+        if self.budget.time_limit is None:
+            return None
+        if self.deadline is None:
+            self.start()
+        return max(0.0, self.deadline - time.time())
+
+    def solve(self, solver, assumptions: List[int] = ()) -> Optional[bool]:
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            return None
+        if self.budget.conflicts is not None:
+            solver.conf_budget(self.budget.conflicts)
+        if self.budget.propagations is not None:
+            solver.prop_budget(self.budget.propagations)
+
+        timer = None
+        if remaining is not None:
+            timer = threading.Timer(remaining, solver.interrupt)
+            timer.daemon = True
+            timer.start()
+        try:
+            return solver.solve_limited(assumptions=list(assumptions), expect_interrupt=timer is not None)
+        finally:
+            if timer is not None:
+                timer.cancel()
+                solver.clear_interrupt()
@@ -0,0 +1,74 @@
+from typing import Dict, Iterable, NamedTuple, Tuple, Union
+
+from sat.algorithm.cpm import CriticalPath
+from sat.data.project import Project
+from sat.data.project_arrays import ProjectArrays
+
+
+class TimeWindow(NamedTuple):
+    """
+    Feasible instants of one activity for a given horizon.
+
+    Attributes:
+    ----------
+    earliest_start : int
+        ES from the forward critical-path pass.
+    latest_start : int
+        LS from the backward pass; the window is empty when ES > LS.
+    run_end : int
+        First instant after the last one the activity can run at.
+    """
+    earliest_start: int
+    latest_start: int
+    run_end: int
+
+    @property
+    def start_times(self) -> range:
+        return range(self.earliest_start, self.latest_start + 1)
+
+    @property
+    def run_times(self) -> range:
+        return range(self.earliest_start, self.run_end)
+
+    def starts_before(self, time: int) -> range:
+        """Start instants of the window earlier than time."""
+        return range(self.earliest_start, min(time, self.latest_start + 1))
+
+
+def full_time_windows(durations: Dict[int, int], horizon: int) -> Dict[int, TimeWindow]:
+    """Windows covering the whole horizon, i.e. no pruning."""
+    return {activity_id: TimeWindow(0, horizon - 1, horizon) for activity_id in durations}
+
+
+def compute_time_windows(durations: Dict[int, int],
+                         precedences: Iterable[Tuple[int, int, int]],
+                         horizon: int) -> Dict[int, TimeWindow]:
+    """
+    Forward/backward critical-path pass on the precedence graph (see CriticalPath).
+
+    :param durations: {activity_id: duration}.
+    :param precedences: (activity_id_1, activity_id_2, lag) meaning
+                        start(2) >= start(1) + lag.
+    :param horizon: Every activity must finish by this instant.
+    :return: {activity_id: TimeWindow}.
+    """
+    engine = CriticalPath(list(durations), list(durations.values()), precedences)
+    earliest = engine.forward().tolist()
+    # start instants stay inside 0..horizon-1, also for zero-duration activities
+    latest = engine.backward(horizon, deadline=horizon - 1).tolist()
+
+    windows = {}
+    for activity_id, first, last, duration in zip(engine.activity_ids, earliest, latest, durations.values()):
+        # an empty start window (horizon below the critical path) leaves no run instant either
+        windows[activity_id] = TimeWindow(first, last, last + duration if first <= last else first)
+    return windows
+
+
+def project_time_windows(project: Union[Project, ProjectArrays], horizon: int, prune: bool = True) -> Dict[int, TimeWindow]:
+    """
+    Time windows of every activity of a project; full windows when prune is False.
+    """
+    durations = project.arrays.durations_by_id()
+    if not prune:
+        return full_time_windows(durations, horizon)
+    return compute_time_windows(durations, project.arrays.precedences(), horizon)
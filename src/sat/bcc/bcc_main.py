@@ -93,7 +93,7 @@ def sat_bcc_solve(input_json_path):
 
 
             if status == "SAT" :
-                decoded_schedule = decode_solution(tasks, model, vf, consumptions)
+                decoded_schedule = decode_solution(tasks, model, vf, consumptions, max_time)
                 is_valid, validation_errors = validate_schedule(
                     decoded_schedule,
                     tasks,
@@ -1,9 +1,10 @@
-from typing import  List
+from typing import  Dict, List, Optional, Tuple
 from sat.data.relation import Relation
 from sat.data.activity import Activity
 from sat.data.resource import Resource
 from sat.data.consumption import Consumption
 from sat.data.relation_type import RelationType
+from sat.data.project_arrays import ProjectArrays, relation_type_of
 from pathlib import Path
 import json
 
@@ -15,9 +16,12 @@ class Project:
     max_time: int=0
 
     def __init__(self, data_path: str):
+        self.data_path = data_path
+        self._arrays = None
         data = self._read_json(data_path)
         if data is  None:
             print("File not found")
+            self._build_indexes()
             return
         self.relations = [] 
         self.activities = []
@@ -29,6 +33,49 @@ class Project:
         self._map_activities(data["activities"])
         self._map_relations(data["relations"])
         self._map_consumptions(data["consumptions"])
+        self._build_indexes()
+
+    def _build_indexes(self):
+        # Built once at load time so the encoders' per-relation and per-(t, activity)
+        # loops look activities, resources and consumptions up in O(1).
+        # Consume variables are keyed by (activity, resource), so duplicate
+        # consumptions of a pair are merged into one with the summed amount.
+        merged: Dict[Tuple[int, int], Consumption] = {}
+        for consumption in self.consumptions:
+            key = (consumption.activity_id, consumption.resource_id)
+            if key in merged:
+                consumption = Consumption(activity_id=consumption.activity_id, resource_id=consumption.resource_id,
+                                          amount=merged[key].amount + consumption.amount)
+            merged[key] = consumption
+        self.consumptions = list(merged.values())
+        self.activity_index: Dict[int, Activity] = {activity.id: activity for activity in self.activities}
+        self.resource_index: Dict[int, Resource] = {resource.id: resource for resource in self.resources}
+        self.activity_consumptions: Dict[int, List[Consumption]] = {activity.id: [] for activity in self.activities}
+        self.resource_consumptions: Dict[int, List[Consumption]] = {resource.id: [] for resource in self.resources}
+        for consumption in self.consumptions:
+            self.activity_consumptions.setdefault(consumption.activity_id, []).append(consumption)
+            self.resource_consumptions.setdefault(consumption.resource_id, []).append(consumption)
+
+    @property
+    def arrays(self) -> ProjectArrays:
+        # columnar view for CPM, bounds, validation and the encoders' relation loops, built on first use
+        if self._arrays is None:
+            self._arrays = ProjectArrays.from_project(self)
+        return self._arrays
+
+    def get_activity(self, activity_id: int) -> Optional[Activity]:
+        return self.activity_index.get(activity_id)
+
+    def get_resource(self, resource_id: int) -> Optional[Resource]:
+        return self.resource_index.get(resource_id)
+
+    def consumptions_of(self, activity_id: int) -> List[Consumption]:
+        """Consumptions of one activity, in file order."""
+        return self.activity_consumptions.get(activity_id, [])
+
+    def consumers_of(self, resource_id: int) -> List[Consumption]:
+        """Consumptions of one resource, in file order."""
+        return self.resource_consumptions.get(resource_id, [])
 
     def _map_resources(self, resources_raw: list):
         for item in resources_raw:
@@ -42,19 +89,10 @@ class Project:
         for item in relations_raw:
             self.relations.append(Relation(activity_id_1=item["task_id_1"],
                                            activity_id_2=item["task_id_2"],
-                                           relation_type=item["relation_type"]))
+                                           relation_type=self._get_relation_type(item["relation_type"])))
     
     def _get_relation_type(self ,relation_type: str):
-        if relation_type in ["fs", "ea","es"]:
-            return RelationType.FS
-        elif relation_type in  ["ss","aa"]:
-            return RelationType.SS
-        elif relation_type in ["ae","se","sf"]:
-            return RelationType.SF
-        elif relation_type in ["ff","ee"]:
-            return RelationType.FF
-        else:
-            return None
+        return relation_type_of(relation_type)
     
     def _map_consumptions(self, consumptions_raw: list):
         for item in consumptions_raw:
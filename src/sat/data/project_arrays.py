@@ -0,0 +1,173 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from sat.data.relation_type import RelationType, relation_lag
+
+# relation names of the project files -> relation type
+RELATION_NAMES = {
+    "fs": RelationType.FS, "ea": RelationType.FS, "es": RelationType.FS,
+    "ss": RelationType.SS, "aa": RelationType.SS,
+    "ae": RelationType.SF, "se": RelationType.SF, "sf": RelationType.SF,
+    "ff": RelationType.FF, "ee": RelationType.FF,
+}
+
+# type code of a relation: position in RELATION_TYPES, NO_RELATION_TYPE for an unknown name
+RELATION_TYPES = (RelationType.FS, RelationType.SS, RelationType.SF, RelationType.FF)
+RELATION_CODES = {relation_type: code for code, relation_type in enumerate(RELATION_TYPES)}
+NO_RELATION_TYPE = -1
+
+
+def relation_type_of(name: str) -> Optional[RelationType]:
+    return RELATION_NAMES.get(name)
+
+
+class ProjectArrays:
+    """
+    Columnar view of a project: one NumPy array per field instead of one
+    pydantic object per row.
+
+    Activities and resources are rows in file order (activity_ids[i],
+    resource_ids[r]); `index` / `resource_index` map an id to its row.
+
+    Attributes:
+    ----------
+    durations : np.ndarray
+        Duration of each activity row.
+    capacities : np.ndarray
+        Capacity of each resource row.
+    relation_ids : np.ndarray
+        (relations, 2) activity ids of each relation, in file order.
+    relation_rows : np.ndarray
+        The same relations as activity rows; -1 for an id with no activity.
+    relation_types : np.ndarray
+        Type code of each relation (see RELATION_TYPES, NO_RELATION_TYPE).
+    demands : np.ndarray
+        (activities, resources) units each activity takes from each resource
+        while running, i.e. minus the consumption amount.
+    max_time : int
+        Horizon of the project file.
+    """
+
+    def __init__(self, activity_ids, durations, resource_ids, capacities,
+                 relation_ids, relation_types, demands, max_time: int):
+        self.activity_ids = np.asarray(activity_ids, dtype=np.int64)
+        self.durations = np.asarray(durations, dtype=np.int64)
+        self.resource_ids = np.asarray(resource_ids, dtype=np.int64)
+        self.capacities = np.asarray(capacities, dtype=np.int64)
+        self.relation_ids = np.asarray(relation_ids, dtype=np.int64).reshape(-1, 2)
+        self.relation_types = np.asarray(relation_types, dtype=np.int8)
+        self.demands = np.asarray(demands, dtype=np.int64).reshape(len(self.activity_ids), len(self.resource_ids))
+        self.max_time = max_time
+
+        self.index = {activity_id: i for i, activity_id in enumerate(self.activity_ids.tolist())}
+        self.resource_index = {resource_id: r for r, resource_id in enumerate(self.resource_ids.tolist())}
+        self.relation_rows = np.asarray([self.index.get(activity_id, -1) for activity_id in self.relation_ids.ravel().tolist()],
+                                        dtype=np.int64).reshape(-1, 2)
+
+    @classmethod
+    def from_data(cls, data: dict) -> "ProjectArrays":
+        """
+        Builds the arrays straight from the parsed project JSON; duplicate
+        consumptions of an (activity, resource) pair add up, as in Project.
+        """
+        activities = data["activities"]
+        resources = data["resources"]
+        relations = data["relations"]
+        activity_ids = [item["id"] for item in activities]
+        resource_ids = [item["id"] for item in resources]
+        index = {activity_id: i for i, activity_id in enumerate(activity_ids)}
+        resource_index = {resource_id: r for r, resource_id in enumerate(resource_ids)}
+
+        demands = np.zeros((len(activity_ids), len(resource_ids)), dtype=np.int64)
+        for item in data["consumptions"]:
+            i = index.get(item["task_id"])
+            r = resource_index.get(item["resource_id"])
+            if i is not None and r is not None:
+                demands[i, r] -= item["amount"]
+
+        relation_types = [RELATION_CODES.get(relation_type_of(item["relation_type"]), NO_RELATION_TYPE)
+                          for item in relations]
+        return cls(activity_ids, [item["duration"] for item in activities],
+                   resource_ids, [item["capacity"] for item in resources],
+                   [(item["task_id_1"], item["task_id_2"]) for item in relations], relation_types,
+                   demands, data.get("max_time"))
+
+    @classmethod
+    def load(cls, data_path: str) -> "ProjectArrays":
+        """Reads a project file into arrays only, without the pydantic models of Project."""
+        return cls.from_data(json.loads(Path(data_path).read_text(encoding="utf-8")))
+
+    @classmethod
+    def from_project(cls, project) -> "ProjectArrays":
+        """
+        Builds the arrays from the rows of a sat.data.project.Project, whose
+        consumptions hold one entry per (activity, resource).
+        """
+        activity_ids = [activity.id for activity in project.activities]
+        resource_ids = [resource.id for resource in project.resources]
+        index = {activity_id: i for i, activity_id in enumerate(activity_ids)}
+        resource_index = {resource_id: r for r, resource_id in enumerate(resource_ids)}
+
+        demands = np.zeros((len(activity_ids), len(resource_ids)), dtype=np.int64)
+        for consumption in project.consumptions:
+            i = index.get(consumption.activity_id)
+            r = resource_index.get(consumption.resource_id)
+            if i is not None and r is not None:
+                demands[i, r] = -consumption.amount
+
+        relation_types = [RELATION_CODES.get(relation.relation_type, NO_RELATION_TYPE) for relation in project.relations]
+        return cls(activity_ids, [activity.duration for activity in project.activities],
+                   resource_ids, [resource.capacity for resource in project.resources],
+                   [(relation.activity_id_1, relation.activity_id_2) for relation in project.relations], relation_types,
+                   demands, project.max_time)
+
+    @property
+    def arrays(self) -> "ProjectArrays":
+        # the same attribute as Project.arrays, so the project_* helpers of CPM, SGS,
+        # bounds and validation take a loaded ProjectArrays in place of a Project
+        return self
+
+    def lags(self) -> np.ndarray:
+        """
+        Minimal distance start(2) - start(1) of every relation, relation_lag
+        over whole columns (0 for an unknown type or activity).
+        """
+        # row -1 (unknown activity) picks the trailing 0
+        durations = np.append(self.durations, 0)
+        duration_1 = durations[self.relation_rows[:, 0]]
+        duration_2 = durations[self.relation_rows[:, 1]]
+        codes = self.relation_types
+        return np.select([codes == RELATION_CODES[relation_type] for relation_type in RELATION_TYPES],
+                         [relation_lag(relation_type, duration_1, duration_2) for relation_type in RELATION_TYPES],
+                         0).astype(np.int64)
+
+    def precedences(self) -> List[Tuple[int, int, int]]:
+        """(activity_id_1, activity_id_2, lag) arcs of every relation, as CriticalPath takes them."""
+        return [(first, second, lag) for (first, second), lag in zip(self.relation_ids.tolist(), self.lags().tolist())]
+
+    def relations(self) -> Iterator[Tuple[int, int, Optional[RelationType], Optional[int], Optional[int]]]:
+        """
+        (activity_id_1, activity_id_2, relation_type, duration_1, duration_2) of
+        every relation in file order; a duration is None when its activity is unknown.
+        """
+        durations = self.durations.tolist()
+        for (first, second), (row_1, row_2), code in zip(self.relation_ids.tolist(), self.relation_rows.tolist(),
+                                                         self.relation_types.tolist()):
+            yield (first, second, RELATION_TYPES[code] if code >= 0 else None,
+                   durations[row_1] if row_1 >= 0 else None, durations[row_2] if row_2 >= 0 else None)
+
+    def durations_by_id(self) -> Dict[int, int]:
+        return dict(zip(self.activity_ids.tolist(), self.durations.tolist()))
+
+    def capacities_by_id(self) -> Dict[int, int]:
+        return dict(zip(self.resource_ids.tolist(), self.capacities.tolist()))
+
+    def demands_by_id(self) -> Dict[Tuple[int, int], int]:
+        """{(activity_id, resource_id): units} of the non-zero entries of demands."""
+        rows, columns = np.nonzero(self.demands)
+        return {(activity_id, resource_id): units for activity_id, resource_id, units in
+                zip(self.activity_ids[rows].tolist(), self.resource_ids[columns].tolist(),
+                    self.demands[rows, columns].tolist())}
@@ -1,5 +1,9 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from sat.data.relation_type import RelationType
+
 
 class Relation(BaseModel):
     """
@@ -11,9 +15,10 @@ class Relation(BaseModel):
         Unique identifier for the first activity in the relation.
     activity_id_2 : int
         Unique identifier for the second activity in the relation.
-    relation_type : str
-        Type of the relation, describing how the activities are related.
+    relation_type : Optional[RelationType]
+        Type of the relation, describing how the activities are related
+        (None for a type the project file does not define).
     """
     activity_id_1: int
     activity_id_2: int
-    relation_type: str
\ No newline at end of file
+    relation_type: Optional[RelationType]
\ No newline at end of file
@@ -5,3 +5,21 @@ class RelationType(Enum):
     SS = "ss"
     SF = "sf"
     FF = "ff"
+
+
+def relation_lag(relation_type: RelationType, duration_1, duration_2):
+    """
+    Minimal distance start(2) - start(1) implied by a relation. The SF lag is
+    the textbook one (finish(2) >= start(1)); it is never tighter than the
+    encoders' SF clauses, so pruning with it keeps every encoded schedule.
+    The durations may also be NumPy arrays (one lag per relation).
+    """
+    if relation_type == RelationType.FS:
+        return duration_1
+    if relation_type == RelationType.SS:
+        return 0
+    if relation_type == RelationType.FF:
+        return duration_1 - duration_2
+    if relation_type == RelationType.SF:
+        return -duration_2
+    return 0
@@ -0,0 +1,113 @@
+from math import ceil, sqrt
+
+import numpy as np
+
+from sat.encoding.clause_batch import add_clause_matrix, pairwise_at_most_one
+
+# Selectable at-most-one encodings, for n literals:
+#   pairwise   n(n-1)/2 clauses, no auxiliary variable
+#   ladder     sequential counter (Sinz 2005): 3n-4 clauses, n-1 variables
+#   commander  Klieber & Kwon 2007 with groups of 3, applied recursively
+#   product    Chen 2010 two-dimensional product, applied recursively
+#   bimander   Nguyen & Mai 2015, groups of 2 plus a binary group index
+AMO_ENCODINGS = ("pairwise", "ladder", "commander", "product", "bimander")
+
+# below this size every recursive encoding falls back to pairwise
+PAIRWISE_LIMIT = 6
+COMMANDER_GROUP = 3
+BIMANDER_GROUP = 2
+
+
+def encode_at_most_one(cnf, literals, encoding: str, next_var: int) -> int:
+    """
+    Adds "at most one of literals is true" to cnf.
+
+    :param cnf: Solver or ClauseArena receiving the clauses.
+    :param literals: The literals.
+    :param encoding: One of AMO_ENCODINGS.
+    :param next_var: First free variable id for auxiliary variables.
+    :return: The next free variable id after the encoding.
+    """
+    literals = list(literals)
+    if encoding == "pairwise" or len(literals) <= 1:
+        add_clause_matrix(cnf, pairwise_at_most_one(literals))
+        return next_var
+    if encoding == "ladder":
+        return _ladder(cnf, literals, next_var)
+    if encoding == "commander":
+        return _commander(cnf, literals, next_var)
+    if encoding == "product":
+        return _product(cnf, literals, next_var)
+    if encoding == "bimander":
+        return _bimander(cnf, literals, next_var)
+    raise ValueError(f"Unknown at-most-one encoding: {encoding}")
+
+
+def encode_exactly_one(cnf, literals, encoding: str, next_var: int) -> int:
+    """
+    Adds "exactly one of literals is true": one at-least-one clause plus
+    encode_at_most_one. Returns the next free variable id.
+    """
+    literals = list(literals)
+    cnf.add_clause(literals)
+    return encode_at_most_one(cnf, literals, encoding, next_var)
+
+
+def _ladder(cnf, literals, next_var):
+    # s_i <-> one of x_1..x_i is true (only the -> direction is needed)
+    n = len(literals)
+    x = np.asarray(literals, dtype=np.int32)
+    s = np.arange(next_var, next_var + n - 1, dtype=np.int32)
+    add_clause_matrix(cnf, np.stack((-x[:-1], s), axis=1))          # x_i -> s_i
+    add_clause_matrix(cnf, np.stack((-s[:-1], s[1:]), axis=1))       # s_{i-1} -> s_i
+    add_clause_matrix(cnf, np.stack((-x[1:], -s), axis=1))           # x_i -> -s_{i-1}
+    return next_var + n - 1
+
+
+def _commander(cnf, literals, next_var):
+    if len(literals) <= PAIRWISE_LIMIT:
+        add_clause_matrix(cnf, pairwise_at_most_one(literals))
+        return next_var
+    commanders = []
+    for begin in range(0, len(literals), COMMANDER_GROUP):
+        group = literals[begin:begin + COMMANDER_GROUP]
+        commander = next_var
+        next_var += 1
+        commanders.append(commander)
+        add_clause_matrix(cnf, pairwise_at_most_one(group))
+        for literal in group:
+            cnf.add_clause([-literal, commander])
+        # a commander is only true when its group is used
+        cnf.add_clause([-commander] + group)
+    return _commander(cnf, commanders, next_var)
+
+
+def _product(cnf, literals, next_var):
+    n = len(literals)
+    if n <= PAIRWISE_LIMIT:
+        add_clause_matrix(cnf, pairwise_at_most_one(literals))
+        return next_var
+    rows = ceil(sqrt(n))
+    columns = ceil(n / rows)
+    row_vars = list(range(next_var, next_var + rows))
+    column_vars = list(range(next_var + rows, next_var + rows + columns))
+    next_var += rows + columns
+    for k, literal in enumerate(literals):
+        row, column = divmod(k, columns)
+        cnf.add_clause([-literal, row_vars[row]])
+        cnf.add_clause([-literal, column_vars[column]])
+    next_var = _product(cnf, row_vars, next_var)
+    return _product(cnf, column_vars, next_var)
+
+
+def _bimander(cnf, literals, next_var):
+    groups = [literals[begin:begin + BIMANDER_GROUP] for begin in range(0, len(literals), BIMANDER_GROUP)]
+    bit_count = max(1, (len(groups) - 1).bit_length())
+    bits = list(range(next_var, next_var + bit_count))
+    for index, group in enumerate(groups):
+        add_clause_matrix(cnf, pairwise_at_most_one(group))
+        for j, bit in enumerate(bits):
+            sign = 1 if (index >> j) & 1 else -1
+            for literal in group:
+                cnf.add_clause([-literal, sign * bit])
+    return next_var + bit_count
@@ -1,13 +1,14 @@
 
 from sat.encoding.variable_factory import VariableFactory
 from pypblib import pblib
-from pypblib.pblib import PBConfig, Pb2cnf
+from sat.encoding.pb_service import PbEncodingService
 
 
 class BCCEncoder:
     _encoder = None
     def __init__(self):
         self.vr=VariableFactory.get_variable_factory()
+        self.pb_service=PbEncodingService.get_pb_service()
 
     @classmethod
     def get_bcc_encoder(cls):
@@ -16,12 +17,8 @@ class BCCEncoder:
         return cls._encoder
     
     def gen_less_than_constraint_pblib_amk_card(self,cnf, bound, inputs, resource_id, time):
-        pb_config=PBConfig()
-        pb_config.set_PB_Encoder(pblib.AMK_CARD)
-        pb2cnf = Pb2cnf(pb_config)
-
-        cnf_formula=[]
         weights = [1] * len(inputs)
-        max_var=pb2cnf.encode_both(weights,inputs,bound,bound,cnf_formula,self.vr.var_count)
-        for clause in cnf_formula:
-                cnf.add_clause(clause)
\ No newline at end of file
+        max_var=self.pb_service.both(weights,inputs,bound,bound,self.vr.var_count,pb_encoder=pblib.AMK_CARD)
+        # auxiliary ids of PBLib are taken, the next variables start after them
+        self.vr.var_count=max(self.vr.var_count,max_var+1)
+        self.pb_service.flush(cnf)
@@ -0,0 +1,158 @@
+import gc
+from array import array
+
+import numpy as np
+
+
+class ClauseArena:
+    """
+    Flat clause buffer shared by the encoders.
+
+    All literals live in one int32 array and clause i spans
+    literals[offsets[i]:offsets[i + 1]]. The arena exposes the part of the
+    PySAT solver interface the encoders use (add_clause, append_formula,
+    nof_vars, nof_clauses), so it can be passed anywhere a solver was, and
+    the finished formula can be loaded into any number of solvers.
+
+    Encoders mark which constraint family they are writing with
+    set_family(); statistics() reports clause and literal counts per family.
+    """
+
+    DEFAULT_FAMILY = "default"
+
+    def __init__(self):
+        self.literals = array('i')
+        self.offsets = array('q', [0])
+        # (family name, index of its first clause), in writing order
+        self.family_marks = [(self.DEFAULT_FAMILY, 0)]
+        self._max_var = 0
+        self._max_var_checked = 0
+
+    @classmethod
+    def from_arrays(cls, literals, offsets):
+        """Builds an arena from a literal array and its clause offsets (offsets[0] == 0)."""
+        arena = cls()
+        arena.literals.frombytes(np.ascontiguousarray(literals, dtype=np.int32).tobytes())
+        arena.offsets = array('q', np.ascontiguousarray(offsets, dtype=np.int64).tobytes())
+        return arena
+
+    def set_family(self, name: str):
+        """Attributes the clauses added from now on to the given family."""
+        self.family_marks.append((name, self.nof_clauses()))
+
+    def add_clause(self, clause, no_return=True):
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def append_formula(self, formula, no_return=True):
+        literals, offsets = self.literals, self.offsets
+        for clause in formula:
+            literals.extend(clause)
+            offsets.append(len(literals))
+
+    def add_matrix(self, clauses: np.ndarray):
+        """Appends a (clauses x width) int32 matrix of equally long clauses."""
+        count, width = clauses.shape
+        if count == 0:
+            return
+        end = self.offsets[-1]
+        self.literals.frombytes(np.ascontiguousarray(clauses, dtype=np.int32).tobytes())
+        ends = end + width * np.arange(1, count + 1, dtype=np.int64)
+        self.offsets.frombytes(ends.tobytes())
+
+    def add_flat(self, literals: np.ndarray, lengths: np.ndarray):
+        """Appends clauses given as their concatenated literals and the length of each clause."""
+        if len(lengths) == 0:
+            return
+        end = self.offsets[-1]
+        self.literals.frombytes(np.ascontiguousarray(literals, dtype=np.int32).tobytes())
+        self.offsets.frombytes((end + np.cumsum(lengths, dtype=np.int64)).tobytes())
+
+    def nof_clauses(self) -> int:
+        return len(self.offsets) - 1
+
+    def nof_literals(self) -> int:
+        return len(self.literals)
+
+    def nof_vars(self) -> int:
+        """Highest variable id used by any clause."""
+        if self._max_var_checked < len(self.literals):
+            tail = np.frombuffer(self.literals, dtype=np.int32)[self._max_var_checked:]
+            self._max_var = max(self._max_var, int(np.abs(tail).max()))
+            self._max_var_checked = len(self.literals)
+        return self._max_var
+
+    def clauses(self, first: int = 0) -> list:
+        """Returns the formula, from clause first on, as a list of clauses (lists of ints)."""
+        offsets = self.offsets[first:].tolist()
+        literals = np.frombuffer(self.literals, dtype=np.int32)[offsets[0]:].tolist()
+        if first:
+            # offsets relative to the tail of the literals
+            offsets = [offset - offsets[0] for offset in offsets]
+        # millions of small lists would otherwise trigger a cyclic GC pass
+        # every few hundred allocations; none of them can form a cycle
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [literals[begin:end] for begin, end in zip(offsets, offsets[1:])]
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def __iter__(self):
+        return iter(self.clauses())
+
+    def load_into(self, solver):
+        """Adds the whole formula to a PySAT solver with one append_formula call."""
+        solver.append_formula(self.clauses())
+        return solver
+
+    def statistics(self) -> dict:
+        """Returns {family: {'clauses': n, 'literals': n}} in writing order."""
+        stats = {}
+        marks = self.family_marks + [(None, self.nof_clauses())]
+        for (name, begin), (_, end) in zip(marks, marks[1:]):
+            if begin == end:
+                continue
+            family = stats.setdefault(name, {'clauses': 0, 'literals': 0})
+            family['clauses'] += end - begin
+            family['literals'] += int(self.offsets[end] - self.offsets[begin])
+        return stats
+
+
+class MappedClauseArena(ClauseArena):
+    """
+    Arena reading its clauses in place from read-only arrays, such as the
+    memory-mapped files of a CnfCache entry. Nothing is copied until a clause
+    is added (e.g. lazy resource constraints); the first addition moves the
+    formula into the growable buffers of ClauseArena.
+    """
+
+    def __init__(self, literals: np.ndarray, offsets: np.ndarray):
+        super().__init__()
+        self.literals = literals
+        self.offsets = offsets
+        self.mapped = True
+
+    def _materialize(self):
+        if self.mapped:
+            literals, offsets = self.literals, self.offsets
+            self.literals = array('i', np.ascontiguousarray(literals, dtype=np.int32).tobytes())
+            self.offsets = array('q', np.ascontiguousarray(offsets, dtype=np.int64).tobytes())
+            self.mapped = False
+
+    def add_clause(self, clause, no_return=True):
+        self._materialize()
+        super().add_clause(clause, no_return)
+
+    def append_formula(self, formula, no_return=True):
+        self._materialize()
+        super().append_formula(formula, no_return)
+
+    def add_matrix(self, clauses: np.ndarray):
+        self._materialize()
+        super().add_matrix(clauses)
+
+    def add_flat(self, literals: np.ndarray, lengths: np.ndarray):
+        self._materialize()
+        super().add_flat(literals, lengths)
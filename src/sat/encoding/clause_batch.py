@@ -0,0 +1,50 @@
+import numpy as np
+
+from sat.encoding.clause_arena import ClauseArena
+
+
+def runtime_clauses(starts, runs, duration: int) -> np.ndarray:
+    """
+    Builds every runtime clause of one activity as an int32 matrix.
+
+    For each start instant t and each time j:
+        [-start(t),  run(j)]  if t <= j < t + duration
+        [-start(t), -run(j)]  otherwise
+
+    :param starts: start variables, starts[i] is the variable for instant i.
+    :param runs: run variables over the same instants.
+    :param duration: Duration of the activity.
+    :return: (len(starts) * len(runs), 2) clause matrix.
+    """
+    starts = np.asarray(starts, dtype=np.int32)
+    runs = np.asarray(runs, dtype=np.int32)
+    instants = np.arange(len(starts))[:, None]
+    times = np.arange(len(runs))[None, :]
+    running = (times >= instants) & (times < instants + duration)
+
+    clauses = np.empty((len(starts), len(runs), 2), dtype=np.int32)
+    clauses[:, :, 0] = -starts[:, None]
+    clauses[:, :, 1] = np.where(running, runs[None, :], -runs[None, :])
+    return clauses.reshape(-1, 2)
+
+
+def pairwise_at_most_one(literals) -> np.ndarray:
+    """
+    Builds the pairwise at-most-one clauses [-x_i, -x_j] (i < j) as an int32 matrix.
+    """
+    literals = np.asarray(literals, dtype=np.int32)
+    first, second = np.triu_indices(len(literals), k=1)
+    return np.stack((-literals[first], -literals[second]), axis=1)
+
+
+def add_clause_matrix(solver, clauses: np.ndarray):
+    """
+    Hands a whole clause matrix to the solver in one call: copied as raw
+    bytes into a ClauseArena, or through append_formula for a live solver.
+    """
+    if not len(clauses):
+        return
+    if isinstance(solver, ClauseArena):
+        solver.add_matrix(clauses)
+    else:
+        solver.append_formula(clauses.tolist())
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from sat.encoding.clause_arena import ClauseArena, MappedClauseArena
+
+# part of every key: bump it whenever the entry layout or an encoder's output
+# changes, so entries written by older code are never served
+CACHE_VERSION = 2
+
+
+class CnfCache:
+    """
+    Content-addressed on-disk cache of encoded formulas.
+
+    An entry is keyed by the hash of CACHE_VERSION, the project JSON, the
+    encoder name, the horizon and any extra encoding options. It is stored as
+    a directory with
+
+        literals.npy  int32 literal array
+        offsets.npy   int64 clause offsets
+        meta.json     constraint families, variable factory state and encoding horizon
+
+    Both arrays are memory-mapped on load and read in place by the returned
+    MappedClauseArena.
+
+    The total size is bounded; the least recently used entries are evicted
+    first (recency is the mtime of meta.json, refreshed on every hit).
+    """
+
+    def __init__(self, directory: str = ".cnf_cache", max_bytes: int = 4 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(project_path, encoder: str, max_time: int, *options) -> str:
+        digest = hashlib.sha256(f"v{CACHE_VERSION}|".encode("utf-8"))
+        digest.update(Path(project_path).read_bytes())
+        digest.update(f"|{encoder}|{max_time}|{'|'.join(map(str, options))}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Returns (arena, variable_state, horizon) for a cached key, or None on a miss;
+        horizon is None for an entry stored without one.
+        """
+        entry = self.directory / key
+        meta_path = entry / "meta.json"
+        if not meta_path.is_file():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        literals = np.load(entry / "literals.npy", mmap_mode="r")
+        offsets = np.load(entry / "offsets.npy", mmap_mode="r")
+        arena = MappedClauseArena(literals, offsets)
+        arena.family_marks = [tuple(mark) for mark in meta["families"]]
+        os.utime(meta_path)
+        return arena, meta["variable_state"], meta.get("horizon")
+
+    def put(self, key: str, arena: ClauseArena, variable_state: dict, horizon: int = None):
+        entry = self.directory / key
+        entry.mkdir(parents=True, exist_ok=True)
+        np.save(entry / "literals.npy", np.frombuffer(arena.literals, dtype=np.int32))
+        np.save(entry / "offsets.npy", np.frombuffer(arena.offsets, dtype=np.int64))
+        # meta.json is written last: an entry without it is incomplete and ignored
+        meta = {"families": arena.family_marks, "variable_state": variable_state, "horizon": horizon}
+        (entry / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._evict()
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        entries = []
+        for entry in self.directory.iterdir():
+            meta_path = entry / "meta.json"
+            if not meta_path.is_file():
+                continue
+            size = sum(file.stat().st_size for file in entry.iterdir())
+            entries.append((meta_path.stat().st_mtime, entry, size))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda item: item[0])
+        total = sum(size for _, _, size in entries)
+        # the newest entry is always kept, even if it alone exceeds the bound
+        for _, entry, size in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -0,0 +1,106 @@
+import gzip
+import json
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from sat.encoding.clause_arena import ClauseArena
+
+# clauses formatted per write() call when streaming a formula out
+CHUNK_CLAUSES = 1 << 16
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        # level 1 keeps streaming close to plain-text speed; level 9 is several times slower
+        return gzip.open(path, mode + "t", compresslevel=1, encoding="ascii")
+    return open(path, mode, encoding="ascii")
+
+
+def variable_map_path(path) -> Path:
+    """Sidecar file holding the variable factory state of a DIMACS file."""
+    path = Path(path)
+    return path.with_name(path.name + ".vars.json")
+
+
+def write_dimacs(arena: ClauseArena, path, variable_state: dict = None, horizon: int = None):
+    """
+    Streams an encoded formula to a DIMACS file (gzip-compressed when the
+    name ends in .gz). Constraint families are kept as "c family" comments.
+
+    :param arena: The encoded formula.
+    :param path: Output file.
+    :param variable_state: Optional variable factory state, written to the
+                           sidecar file so the run can be decoded later.
+    :param horizon: Optional encoding horizon, kept in the sidecar file too
+                    (see read_encoding_horizon).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    literals = np.frombuffer(arena.literals, dtype=np.int32)
+    offsets = arena.offsets
+    clause_count = arena.nof_clauses()
+
+    with _open(path, "w") as out:
+        for name, first_clause in arena.family_marks:
+            out.write(f"c family {name} {first_clause}\n")
+        out.write(f"p cnf {arena.nof_vars()} {clause_count}\n")
+        for begin in range(0, clause_count, CHUNK_CLAUSES):
+            end = min(begin + CHUNK_CLAUSES, clause_count)
+            base = offsets[begin]
+            chunk = literals[base:offsets[end]].tolist()
+            lines = [" ".join(map(str, chunk[offsets[i] - base:offsets[i + 1] - base]))
+                     for i in range(begin, end)]
+            out.write(" 0\n".join(lines))
+            out.write(" 0\n")
+
+    if variable_state is not None or horizon is not None:
+        sidecar = dict(variable_state or {})
+        if horizon is not None:
+            sidecar["horizon"] = horizon
+        variable_map_path(path).write_text(json.dumps(sidecar), encoding="utf-8")
+
+
+def read_dimacs(path) -> ClauseArena:
+    """
+    Streams a DIMACS file (plain or .gz) back into a ClauseArena, restoring
+    the constraint families written by write_dimacs.
+    """
+    path = Path(path)
+    arena = ClauseArena()
+    families = []
+    clause = []
+    with _open(path, "r") as source:
+        for line in source:
+            if line.startswith("c"):
+                parts = line.split()
+                if len(parts) == 4 and parts[1] == "family":
+                    families.append((parts[2], int(parts[3])))
+                continue
+            if line.startswith("p") or not line.strip():
+                continue
+            for literal in map(int, line.split()):
+                if literal == 0:
+                    arena.add_clause(clause)
+                    clause = []
+                else:
+                    clause.append(literal)
+    if clause:
+        arena.add_clause(clause)
+    if families:
+        arena.family_marks = families
+    return arena
+
+
+def read_variable_state(path) -> dict:
+    """Reads the variable factory state stored next to a DIMACS file."""
+    return json.loads(variable_map_path(path).read_text(encoding="utf-8"))
+
+
+def read_encoding_horizon(path) -> Optional[int]:
+    """Encoding horizon stored next to a DIMACS file, None when it was not recorded."""
+    sidecar = variable_map_path(path)
+    if not sidecar.is_file():
+        return None
+    return json.loads(sidecar.read_text(encoding="utf-8")).get("horizon")
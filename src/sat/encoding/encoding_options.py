@@ -0,0 +1,38 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class EncodingOptions(BaseModel):
+    """
+    Switches shared by the sat encoders, passed to handle().
+
+    Attributes:
+    ----------
+    amo : Optional[str]
+        At-most-one encoding of the start instants (see sat.encoding.amo.AMO_ENCODINGS).
+        None keeps each encoder's own encoding.
+    time_encoding : str
+        "direct" keeps one start literal per instant with quadratic runtime
+        clauses, "order" adds a started-by ladder (see sat.encoding.order_encoding).
+    time_windows : bool
+        Only create start/run/consume variables inside each activity's
+        critical-path window (see sat.algorithm.time_windows).
+    horizon : Optional[int]
+        Encoding horizon T; None uses project.max_time. RcpspAlogithm sets it
+        to the makespan of a heuristic schedule (see sat.algorithm.sgs).
+    resource_encoding : Optional[str]
+        Weighted PB encoding of the resource constraints, posted on the run
+        variables (see sat.encoding.pb_resources.PB_ENCODINGS). None keeps
+        each encoder's cardinality constraint over unary consume variables.
+    lazy_resources : Optional[str]
+        Leave the resource constraints out of the encoding and add them while
+        solving, only where a model overloads a resource
+        (see sat.algorithm.lazy_resources.LAZY_MODES). None encodes them upfront.
+    """
+    amo: Optional[str] = None
+    time_encoding: str = "direct"
+    time_windows: bool = True
+    horizon: Optional[int] = None
+    resource_encoding: Optional[str] = None
+    lazy_resources: Optional[str] = None
@@ -0,0 +1,147 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from sat.algorithm.cpm import CriticalPath
+
+# Resource constraints as minimal forbidden sets: a set of activities that
+# can all run at the same instant, exceeds the capacity of some resource
+# together, and fits every capacity once any one of them is removed. For each
+# such set F and every instant t all of F's time windows allow
+#     OR(-run(a, t) for a in F)
+# Every other overloading set contains a minimal one, so these clauses are
+# exactly the resource constraints. Sets are Python int bitsets over the
+# activity rows; two activities that the time windows or a precedence path
+# keep apart never share a set.
+
+
+def separated_pairs(activity_ids, durations, precedences: Iterable[Tuple[int, int, int]]) -> np.ndarray:
+    """
+    (n, n) boolean matrix, True where a path of arcs (activity_id_1,
+    activity_id_2, lag) forces one activity to start after the other finishes:
+    longest distance start(j) - start(i) >= duration(i).
+    """
+    activity_ids = list(activity_ids)
+    durations = np.asarray(durations, dtype=np.int64)
+    count = len(activity_ids)
+    critical_path = CriticalPath(activity_ids, durations, precedences)
+    # one forward pass per source; unreachable activities stay far below zero
+    unreachable = -(int(durations.sum()) + 1) * (count + 1)
+    distances = np.empty((count, count), dtype=np.int64)
+    for source in range(count):
+        release = np.full(count, unreachable, dtype=np.int64)
+        release[source] = 0
+        distances[source] = critical_path.forward(release)
+    after = distances >= durations[:, None]
+    np.fill_diagonal(after, False)
+    return after | after.T
+
+
+def minimal_forbidden_sets(demands: np.ndarray, capacities: np.ndarray, overlap: List[int]) -> Iterator[List[int]]:
+    """
+    Every minimal forbidden set once, as ascending activity rows.
+
+    A minimal set exceeding resource r only holds activities taking r (any
+    other member could be dropped and r would still be exceeded), so the
+    search runs per resource over its consumers, extending feasible sets of
+    activities that can all run together and cutting a branch as soon as the
+    remaining consumers of r cannot push it over the capacity.
+
+    :param demands: (activities, resources) units each activity takes while running.
+    :param capacities: Capacity of each resource.
+    :param overlap: Bitset of the activities each activity can run together with.
+    """
+    demands = np.asarray(demands, dtype=np.int64)
+    count, resources = demands.shape
+    capacities = [int(capacity) for capacity in capacities]
+    rows = demands.tolist()
+    found = set()
+
+    def exceeds(sums):
+        return any(total > capacity for total, capacity in zip(sums, capacities))
+
+    def minimal(sums, smallest):
+        # removing the smallest demand of each resource must fit that resource
+        return all(total - least <= capacity for total, least, capacity in zip(sums, smallest, capacities))
+
+    for r in range(resources):
+        column = demands[:, r]
+        consumers = sum(1 << j for j in np.flatnonzero(column > 0).tolist())
+        # demand on r of the consumers after each row
+        after = (column.sum() - np.cumsum(column)).tolist()
+        # depth-first: (members, demand per resource, smallest member demand per resource, candidate bitset)
+        stack = [([], [0] * resources, [None] * resources, consumers)]
+        while stack:
+            members, sums, smallest, candidates = stack.pop()
+            while candidates:
+                low = candidates & -candidates
+                candidates ^= low
+                j = low.bit_length() - 1
+                row = rows[j]
+                extended = [total + units for total, units in zip(sums, row)]
+                if extended[r] + after[j] <= capacities[r]:
+                    # not even every later consumer exceeds r
+                    break
+                least = [units if least is None else min(least, units) for least, units in zip(smallest, row)]
+                if exceeds(extended):
+                    # supersets of a forbidden set are never minimal
+                    mask = sum(1 << i for i in members) | low
+                    if mask not in found and minimal(extended, least):
+                        found.add(mask)
+                        yield members + [j]
+                    continue
+                later = candidates & overlap[j]
+                if later:
+                    stack.append((members + [j], extended, least, later))
+
+
+def encode_forbidden_sets(cnf, run, windows: dict, durations: Dict[int, int],
+                          precedences: Iterable[Tuple[int, int, int]], demands: Dict[Tuple[int, int], int],
+                          capacities: Dict[int, int]) -> int:
+    """
+    Adds the clauses of every minimal forbidden set to cnf.
+
+    :param run: run(activity_id, t) -> variable id, the encoding's run variable.
+    :param windows: {activity_id: TimeWindow} of the encoding.
+    :param durations: {activity_id: duration}.
+    :param precedences: (activity_id_1, activity_id_2, lag) arcs.
+    :param demands: {(activity_id, resource_id): units}; units <= 0 are ignored.
+    :param capacities: {resource_id: capacity}.
+    :return: The number of minimal forbidden sets.
+    """
+    resource_ids = list(capacities)
+    resource_index = {resource_id: r for r, resource_id in enumerate(resource_ids)}
+    activity_ids = list(durations)
+    # only activities that take some resource and can run at all, in activity order
+    taking = {activity_id for (activity_id, resource_id), units in demands.items()
+              if units > 0 and resource_id in resource_index}
+    consumers = [activity_id for activity_id in activity_ids
+                 if activity_id in taking and len(windows[activity_id].run_times) > 0]
+    index = {activity_id: i for i, activity_id in enumerate(consumers)}
+    usage = np.zeros((len(consumers), len(resource_ids)), dtype=np.int64)
+    for (activity_id, resource_id), units in demands.items():
+        if units > 0 and activity_id in index and resource_id in resource_index:
+            usage[index[activity_id], resource_index[resource_id]] += units
+
+    earliest = np.asarray([windows[activity_id].earliest_start for activity_id in consumers], dtype=np.int64)
+    run_end = np.asarray([windows[activity_id].run_end for activity_id in consumers], dtype=np.int64)
+    together = (earliest[:, None] < run_end[None, :]) & (earliest[None, :] < run_end[:, None])
+    # paths may run through activities that take no resource
+    position = {activity_id: i for i, activity_id in enumerate(activity_ids)}
+    rows = [position[activity_id] for activity_id in consumers]
+    separated = separated_pairs(activity_ids, [durations[activity_id] for activity_id in activity_ids], precedences)
+    together &= ~separated[np.ix_(rows, rows)]
+    np.fill_diagonal(together, False)
+    overlap = [int(sum(1 << j for j in np.flatnonzero(row).tolist())) for row in together]
+
+    count = 0
+    capacity = np.asarray([capacities[resource_id] for resource_id in resource_ids], dtype=np.int64)
+    for forbidden in minimal_forbidden_sets(usage, capacity, overlap):
+        members = [consumers[i] for i in forbidden]
+        # windows meeting pairwise share a common instant
+        first = max(windows[activity_id].earliest_start for activity_id in members)
+        last = min(windows[activity_id].run_end for activity_id in members)
+        for time in range(first, last):
+            cnf.add_clause([-run(activity_id, time) for activity_id in members])
+        count += 1
+    return count
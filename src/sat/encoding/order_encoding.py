@@ -0,0 +1,69 @@
+import numpy as np
+
+from sat.encoding.clause_batch import add_clause_matrix
+
+# Order ("ladder") encoding of start times.
+#
+# started(t) means "the activity has started at or before t". Over the
+# horizon the started literals form a ladder 0..0 1..1, and
+#     start(t) <-> started(t) and not started(t - 1)
+#     run(t)   <-> started(t) and not started(t - duration)
+# so both families cost O(T) clauses per activity instead of O(T^2).
+# The ladder also makes exactly one start instant true, so no separate
+# at-least-one / at-most-one constraint is needed.
+
+
+def encode_started_ladder(cnf, starts, started):
+    """
+    Adds the ladder over started and ties every start(t) to its step.
+
+    :param starts: start variables of consecutive instants.
+    :param started: started-by variables over the same instants.
+    """
+    if not len(starts):
+        # empty time window: the activity cannot start at all
+        cnf.add_clause([])
+        return
+    s = np.asarray(starts, dtype=np.int32)
+    y = np.asarray(started, dtype=np.int32)
+    # started(t - 1) -> started(t), and the activity has started by the end
+    add_clause_matrix(cnf, np.stack((-y[:-1], y[1:]), axis=1))
+    cnf.add_clause([int(y[-1])])
+    # first instant: start <-> started
+    add_clause_matrix(cnf, np.array([[-s[0], y[0]], [s[0], -y[0]]], dtype=np.int32))
+    # start(t) <-> started(t) and not started(t - 1)
+    add_clause_matrix(cnf, np.stack((-s[1:], y[1:]), axis=1))
+    add_clause_matrix(cnf, np.stack((-s[1:], -y[:-1]), axis=1))
+    add_clause_matrix(cnf, np.stack((s[1:], -y[1:], y[:-1]), axis=1))
+
+
+def encode_runtime_from_ladder(cnf, started, runs, duration: int):
+    """
+    Defines run(t) as the difference of two ladder literals:
+    run(t) <-> started(t) and not started(t - duration).
+
+    started and runs both begin at the first instant of the window; runs may
+    extend past the last started literal, where the ladder stays true.
+
+    :param started: started-by variables of consecutive instants.
+    :param runs: run variables from the same first instant.
+    :param duration: Duration of the activity.
+    """
+    r = np.asarray(runs, dtype=np.int32)
+    if not len(r):
+        return
+    if duration <= 0:
+        add_clause_matrix(cnf, -r[:, None])
+        return
+    y = np.asarray(started, dtype=np.int32)
+    # started(t), clipped to the last ladder step
+    now = y[np.minimum(np.arange(len(r)), len(y) - 1)]
+    head = min(duration, len(r))
+    # t < duration: run(t) <-> started(t)
+    add_clause_matrix(cnf, np.stack((-r[:head], now[:head]), axis=1))
+    add_clause_matrix(cnf, np.stack((r[:head], -now[:head]), axis=1))
+    # t >= duration: run(t) <-> started(t) and not started(t - duration)
+    before = y[:len(r) - head]
+    add_clause_matrix(cnf, np.stack((-r[head:], now[head:]), axis=1))
+    add_clause_matrix(cnf, np.stack((-r[head:], -before), axis=1))
+    add_clause_matrix(cnf, np.stack((r[head:], -now[head:], before), axis=1))
@@ -0,0 +1,77 @@
+from pypblib import pblib
+
+from sat.encoding.pb_service import PbEncodingService
+
+# Weighted pseudo-Boolean encodings (PBLib) of one resource constraint
+#     sum demand(a) * run(a, t) <= capacity(r)
+# posted directly on the run literals, so no consume(a, r, t, i) variables:
+#   best              PBLib picks per constraint
+#   bdd               reduced ordered BDD (Eén & Sörensson 2006)
+#   swc               sequential weight counter (Hölldobler et al. 2012)
+#   sorting_networks  Eén & Sörensson 2006 sorters on the binary weights
+#   adder             adder network on the binary weights (Warners 1998)
+#   binary_merge      binary merge (Manthey et al. 2014)
+PB_ENCODINGS = {
+    "best": pblib.PB_BEST,
+    "bdd": pblib.PB_BDD,
+    "swc": pblib.PB_SWC,
+    "sorting_networks": pblib.PB_SORTINGNETWORKS,
+    "adder": pblib.PB_ADDER,
+    "binary_merge": pblib.PB_BINARY_MERGE,
+}
+
+
+def encode_weighted_at_most(cnf, weights, literals, bound: int, encoding: str, next_var: int) -> int:
+    """
+    Adds "sum weights[i] * literals[i] <= bound" to cnf.
+
+    :param cnf: Solver or ClauseArena receiving the clauses.
+    :param weights: Positive weight of each literal.
+    :param literals: The literals.
+    :param bound: Right-hand side.
+    :param encoding: One of PB_ENCODINGS.
+    :param next_var: First free variable id for auxiliary variables.
+    :return: The next free variable id after the encoding.
+    """
+    service = PbEncodingService.get_pb_service()
+    next_var = _weighted_at_most(service, weights, literals, bound, encoding, next_var)
+    service.flush(cnf)
+    return next_var
+
+
+def encode_weighted_resources(cnf, vr, project, windows, max_time: int, encoding: str):
+    """
+    Resource constraints of a sat.data.project.Project as one weighted PB
+    constraint per (resource, instant) over the run variables of the
+    activities that can run at that instant. Auxiliary ids are taken from
+    and written back to vr.var_count.
+
+    :param vr: The VariableFactory of the encoding.
+    :param windows: {activity_id: TimeWindow} of the encoding.
+    """
+    service = PbEncodingService.get_pb_service()
+    arrays = project.arrays
+    activity_ids = arrays.activity_ids.tolist()
+    for r, capacity in enumerate(arrays.capacities.tolist()):
+        consumers = [(activity_ids[i], demand) for i, demand in enumerate(arrays.demands[:, r].tolist()) if demand > 0]
+        for t in range(max_time):
+            running = [(activity_id, demand) for activity_id, demand in consumers
+                       if t in windows[activity_id].run_times]
+            if not running:
+                continue
+            literals = [vr.run(activity_id, t) for activity_id, _ in running]
+            vr.var_count = _weighted_at_most(service, [demand for _, demand in running], literals, capacity,
+                                             encoding, vr.var_count)
+        # one batch of PBLib clauses per resource
+        service.flush(cnf)
+
+
+def _weighted_at_most(service, weights, literals, bound, encoding, next_var):
+    if encoding not in PB_ENCODINGS:
+        raise ValueError(f"Unknown pseudo-Boolean encoding: {encoding}")
+    weights = list(weights)
+    if sum(weights) <= bound:
+        # every activity fits together, nothing to post
+        return next_var
+    max_var = service.leq(weights, list(literals), bound, next_var, pb_encoder=PB_ENCODINGS[encoding])
+    return max(max_var + 1, next_var)
@@ -0,0 +1,200 @@
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from pypblib.pblib import PB_SORTINGNETWORKS, PBConfig, Pb2cnf
+
+from sat.encoding.clause_arena import ClauseArena
+
+
+class ClauseTemplate(NamedTuple):
+    """
+    PBLib's clauses for one constraint shape, on placeholder variables.
+
+    Attributes:
+    ----------
+    literals : np.ndarray
+        Every clause's literals, concatenated. Placeholder i in 1..size is
+        the i-th smallest input literal, size + j the j-th auxiliary variable.
+    lengths : np.ndarray
+        Number of literals of each clause.
+    size : int
+        Number of input literals.
+    aux : int
+        Number of auxiliary variables.
+    """
+    literals: np.ndarray
+    lengths: np.ndarray
+    size: int
+    aux: int
+
+
+class PbEncodingService:
+    """
+    Shared front end to pypblib for the encoders.
+
+    One Pb2cnf per configuration, built on first use and reused for every
+    later constraint (a Pb2cnf keeps no state between calls). A
+    configuration is the (at-most-k encoder, PB encoder) pair set on its
+    PBConfig, None leaving PBLib's default.
+
+    Constraints are submitted with at_most_k / at_least_k / leq / both; the
+    clauses PBLib produces go straight into one buffer, which flush() hands
+    to a solver or ClauseArena in a single call. Flush before switching
+    constraint family and before the formula is used. The service is shared
+    by every encoder, so SatEncoder.handle() (and SATEncoder.encode in
+    sat_2025) discards the buffer when an encoding starts and when it
+    ends: clauses of an encoding cut short never reach another formula.
+
+    Template cache: PBLib only compares literal ids and numbers its
+    auxiliaries from next_var upwards, so its output depends on the shape of
+    a constraint (call, encoders, weights, the rank of each literal among
+    the inputs, bounds), not on the ids themselves. A shape is encoded once
+    on placeholders 1..n, the ranks (ClauseTemplate); every later constraint
+    of that shape is an array lookup substituting its literals and fresh
+    auxiliary ids, with exactly the clauses PBLib would have produced.
+    Constraints with negative or repeated literals, or literals at or above
+    next_var, go to PBLib directly, as do weighted sorting networks, whose
+    clauses do depend on the ids. The cache outlives projects and encoders,
+    so it keeps the max_templates most recently used shapes only.
+
+    Every pypblib call is timed: pblib_time is the time spent inside PBLib;
+    the rest of an encoding's wall time is Python glue (see statistics()).
+    """
+    _service = None
+    max_templates = 1024
+
+    def __init__(self):
+        self._encoders: Dict[Tuple[Optional[int], Optional[int]], Pb2cnf] = {}
+        self.buffer = []
+        # instantiated templates waiting for flush(): (literals, lengths) arrays
+        self.blocks = []
+        # least recently used first
+        self.templates: "OrderedDict[tuple, ClauseTemplate]" = OrderedDict()
+        self.pblib_time = 0.0
+        self.calls = 0
+        self.template_hits = 0
+
+    @classmethod
+    def get_pb_service(cls):
+        if cls._service is None:
+            cls._service = PbEncodingService()
+        return cls._service
+
+    def encoder(self, amk_encoder: int = None, pb_encoder: int = None) -> Pb2cnf:
+        """The pooled Pb2cnf whose PBConfig has these encoders set."""
+        key = (amk_encoder, pb_encoder)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            config = PBConfig()
+            if amk_encoder is not None:
+                config.set_AMK_Encoder(amk_encoder)
+            if pb_encoder is not None:
+                config.set_PB_Encoder(pb_encoder)
+            encoder = self._encoders[key] = Pb2cnf(config)
+        return encoder
+
+    def at_most_k(self, literals, k: int, next_var: int, amk_encoder: int = None, pb_encoder: int = None) -> int:
+        """Buffers "at most k of literals"; returns PBLib's last used variable id."""
+        return self._encode("encode_at_most_k", (literals, k), next_var, amk_encoder, pb_encoder)
+
+    def at_least_k(self, literals, k: int, next_var: int, amk_encoder: int = None, pb_encoder: int = None) -> int:
+        """Buffers "at least k of literals"; returns PBLib's last used variable id."""
+        return self._encode("encode_at_least_k", (literals, k), next_var, amk_encoder, pb_encoder)
+
+    def leq(self, weights, literals, bound: int, next_var: int, pb_encoder: int = None) -> int:
+        """Buffers "sum weights[i] * literals[i] <= bound"; returns PBLib's last used variable id."""
+        return self._encode("encode_leq", (weights, literals, bound), next_var, None, pb_encoder)
+
+    def both(self, weights, literals, lower: int, upper: int, next_var: int,
+             amk_encoder: int = None, pb_encoder: int = None) -> int:
+        """Buffers "lower <= sum weights[i] * literals[i] <= upper"; returns PBLib's last used variable id."""
+        return self._encode("encode_both", (weights, literals, lower, upper), next_var, amk_encoder, pb_encoder)
+
+    def flush(self, cnf):
+        """Adds every buffered clause to cnf and empties the buffer."""
+        if self.buffer:
+            cnf.append_formula(self.buffer)
+            self.buffer = []
+        if self.blocks:
+            literals = np.concatenate([block[0] for block in self.blocks])
+            lengths = np.concatenate([block[1] for block in self.blocks])
+            self.blocks = []
+            if isinstance(cnf, ClauseArena):
+                cnf.add_flat(literals, lengths)
+            else:
+                cnf.append_formula([clause.tolist() for clause in np.split(literals, np.cumsum(lengths)[:-1])])
+
+    def discard(self):
+        """Drops every buffered clause without adding it anywhere."""
+        self.buffer = []
+        self.blocks = []
+
+    def reset_statistics(self):
+        self.pblib_time = 0.0
+        self.calls = 0
+        self.template_hits = 0
+
+    def statistics(self, total_time: float = None) -> dict:
+        """
+        pypblib calls and time; with the wall time of the whole encoding also
+        the glue time (everything outside PBLib) and PBLib's share.
+        """
+        result = {'pblib_calls': self.calls, 'pblib_time': round(self.pblib_time, 3),
+                  'template_hits': self.template_hits, 'templates': len(self.templates)}
+        if total_time is not None:
+            result['glue_time'] = round(total_time - self.pblib_time, 3)
+            result['pblib_share'] = round(self.pblib_time / total_time, 3) if total_time > 0 else 0.0
+        return result
+
+    def _encode(self, method: str, arguments: tuple, next_var: int, amk_encoder, pb_encoder) -> int:
+        # arguments: ([weights,] literals, bounds...)
+        weighted = method in ("encode_leq", "encode_both")
+        literals = list(arguments[1] if weighted else arguments[0])
+        bounds = arguments[2:] if weighted else arguments[1:]
+        if (not literals or min(literals) <= 0 or max(literals) >= next_var
+                or len(set(literals)) != len(literals) or pb_encoder == PB_SORTINGNETWORKS):
+            return self._call(method, arguments, self.buffer, next_var, amk_encoder, pb_encoder)
+
+        # rank of each literal among the inputs: the placeholder standing for it
+        order = sorted(range(len(literals)), key=literals.__getitem__)
+        ranks = [0] * len(literals)
+        for rank, i in enumerate(order, 1):
+            ranks[i] = rank
+        weights = tuple(arguments[0]) if weighted else None
+        key = (method, amk_encoder, pb_encoder, weights, tuple(ranks)) + tuple(bounds)
+        template = self.templates.get(key)
+        if template is None:
+            placeholders = (list(weights), ranks) if weighted else (ranks,)
+            template = self.templates[key] = self._template(method, placeholders + tuple(bounds),
+                                                            amk_encoder, pb_encoder)
+            if len(self.templates) > self.max_templates:
+                self.templates.popitem(last=False)
+        else:
+            self.templates.move_to_end(key)
+            self.template_hits += 1
+
+        # placeholder -> literal: 1..size the sorted literals, then the auxiliaries from next_var
+        table = np.empty(template.size + template.aux + 1, dtype=np.int64)
+        table[1:template.size + 1] = [literals[i] for i in order]
+        table[template.size + 1:] = np.arange(next_var, next_var + template.aux)
+        if len(template.lengths):
+            self.blocks.append((np.sign(template.literals) * table[np.abs(template.literals)], template.lengths))
+        return next_var + template.aux - 1
+
+    def _template(self, method, arguments, amk_encoder, pb_encoder) -> ClauseTemplate:
+        size = len(arguments[1] if method in ("encode_leq", "encode_both") else arguments[0])
+        formula = []
+        max_var = self._call(method, arguments, formula, size + 1, amk_encoder, pb_encoder)
+        literals = np.fromiter((literal for clause in formula for literal in clause), dtype=np.int64)
+        lengths = np.fromiter((len(clause) for clause in formula), dtype=np.int64, count=len(formula))
+        return ClauseTemplate(literals, lengths, size, max(max_var - size, 0))
+
+    def _call(self, method: str, arguments: tuple, formula: list, next_var: int, amk_encoder, pb_encoder) -> int:
+        encoder = self.encoder(amk_encoder, pb_encoder)
+        begin = time.perf_counter()
+        max_var = getattr(encoder, method)(*arguments, formula, next_var)
+        self.pblib_time += time.perf_counter() - begin
+        self.calls += 1
+        return max_var
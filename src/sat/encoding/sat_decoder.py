@@ -11,23 +11,21 @@ class SatDecoder:
         if cls._decoder is None:
             cls._decoder = SatDecoder()
         return cls._decoder
-    def handle (self,cnf, project:Project):
-        reverse_var_map = {v: k for k, v in self.vr .var_map.items()}
-        model = cnf.get_model()
-        positive_vars = set(abs(var) for var in model if var > 0)
-        activity_start_times = {}
-
+    def handle (self,cnf, project:Project, model=None, max_time:int=None):
+        # model defaults to the solver's last one; the optimizer passes its best model.
+        # Start times are read from the model by id, so decoding never adds variables
+        if model is None:
+            model = cnf.get_model()
+        activity_start_times = self.vr.start_times(model, [activity.id for activity in project.activities],
+                                                   max_time or project.max_time)
         for activity in project.activities:
-            task_start_found = False
-            for time in range(len(reverse_var_map)):
-                start_var = self.vr.start(activity.id, time)
-                if start_var in positive_vars:
-                    activity_start_times[activity.id] = time
-                    task_start_found = True
-                    break
-            if not task_start_found:
+            if activity.id not in activity_start_times:
                  print(f"Warning: No start time found for task {activity.id}")
 
+        return self.schedule(project, activity_start_times)
+
+    def schedule(self, project:Project, activity_start_times:dict):
+        # Builds the schedule rows from {activity_id: start}; also used for heuristic schedules
         sorted_tasks = sorted(project.activities, key=lambda x: activity_start_times.get(x.id, float('inf')))
 
         schedule = []
@@ -36,12 +34,11 @@ class SatDecoder:
             if start_time is not None:
                 end_time = start_time + activity.duration
                 task_resources = []
-                for consumption in project.consumptions:
-                  if consumption.activity_id == activity.id:
-                     task_resources.append({
+                for consumption in project.consumptions_of(activity.id):
+                    task_resources.append({
                         "resource_id": consumption.resource_id,
                         'amount': consumption.amount
-                     })
+                    })
                 
                 schedule.append({
                     'task_id': activity.id,
@@ -53,5 +50,3 @@ class SatDecoder:
                 })
 
         return schedule
-
-
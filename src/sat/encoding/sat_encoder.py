@@ -1,6 +1,11 @@
-
-
 from sat.encoding.variable_factory import VariableFactory
+from sat.algorithm.time_windows import project_time_windows
+from sat.encoding.amo import encode_exactly_one
+from sat.encoding.order_encoding import encode_runtime_from_ladder, encode_started_ladder
+from sat.encoding.encoding_options import EncodingOptions
+from sat.encoding.pb_resources import encode_weighted_resources
+from sat.encoding.pb_service import PbEncodingService
+from sat.encoding.clause_batch import add_clause_matrix, runtime_clauses
 from sat.encoding.bcc_encoder import BCCEncoder
 from sat.data.project import Project
 from sat.data.activity import Activity
@@ -18,42 +23,94 @@ class BccMode(Enum):
 
 
 class SatEncoder:
+    """
+    Encodes a Project into cnf (a solver or ClauseArena).
+
+    The subclasses differ only in the cardinality encodings they pick:
+    start_amk_encoder is the PBLib at-most-k encoder of "exactly one start
+    instant" (None: options.amo, pairwise by default) and
+    resource_pb_encoder the PBLib encoder of the resource bounds over the
+    consume variables (None: BCCEncoder). _encode_resource_bound and
+    _encode_resource_constraints are overridden for other encodings.
+    """
     _sat_encoder = None
+    start_amk_encoder = None
+    resource_pb_encoder = None
     def __init__(self):
         self.vr = VariableFactory.get_variable_factory()
+        self.options = EncodingOptions()
+        self.windows = {}
+        self.project = None
         self.bcc= BCCEncoder.get_bcc_encoder()
+        self.pb_service = PbEncodingService.get_pb_service()
     
     @classmethod 
     def  get_sat_encoder(cls):
         if cls._sat_encoder is None:
-            cls._sat_encoder = SatEncoder()
+            cls._sat_encoder = cls()
         return cls._sat_encoder
 
-    def handle(self,cnf, project:Project,mode:str=None):
+    def handle(self,cnf, project:Project, options:EncodingOptions=None):
+        # drop PB clauses an interrupted encoding left in the shared buffer
+        self.pb_service.discard()
+        try:
+            self._handle(cnf, project, options)
+        finally:
+            self.pb_service.discard()
+
+    def _handle(self,cnf, project:Project, options:EncodingOptions=None):
+        self.options = options or EncodingOptions()
+        max_time = self.options.horizon or project.max_time
+        self.windows = project_time_windows(project, max_time, self.options.time_windows)
+        self.project = project
 
-        max_time =project.max_time
         activities = project.activities
         relations = project.relations
         resources = project.resources
         consumption=project.consumptions
 
+        cnf.set_family("unique_start_instant")
         self._encode_unique_Start_instant(cnf,max_time,activities)
+        cnf.set_family("start_in_time")
         self._encode_start_in_time(cnf,max_time,activities)
+        cnf.set_family("runtime")
         self._encode_runtime(cnf,max_time,activities)
+        cnf.set_family("work_load")
         self._encode_work_load(cnf,max_time,activities)
+        cnf.set_family("relations")
         self._encode_relations(cnf,max_time,activities,relations)
-        self._encode_resources_with_cardinalities(cnf,max_time,activities,resources,consumption)
+        if self.options.lazy_resources is not None:
+            # added during solving where a model overloads a resource (see sat.algorithm.lazy_resources)
+            return
+        cnf.set_family("resources")
+        if self.options.resource_encoding is not None:
+            # weighted PB over run(a, t): no consume variables
+            encode_weighted_resources(cnf, self.vr, project, self.windows, max_time, self.options.resource_encoding)
+        else:
+            self._encode_resource_constraints(cnf,max_time,activities,resources,consumption)
 
     # Ràng buộc 1: Mỗi công việc chỉ bắt đầu một lần
     def _encode_unique_Start_instant(self, cnf, max_time: int, activities: List[Activity]):
+        if self.options.time_encoding == "order":
+            # the started-by ladder already forces exactly one start instant
+            for activity in activities:
+                starts = [self.vr.start(activity.id, t) for t in self.windows[activity.id].start_times]
+                started = [self.vr.started(activity.id, t) for t in self.windows[activity.id].start_times]
+                encode_started_ladder(cnf, starts, started)
+            return
+        if self.options.amo is None and self.start_amk_encoder is not None:
+            for activity in activities:
+                starts = [self.vr.start(activity.id, t) for t in self.windows[activity.id].start_times]
+                max_var = self.pb_service.at_least_k(starts, 1, self.vr.var_count, amk_encoder=self.start_amk_encoder)
+                max_var = self.pb_service.at_most_k(starts, 1, max_var + 1, amk_encoder=self.start_amk_encoder)
+                self.vr.var_count = max_var + 1
+            self.pb_service.flush(cnf)
+            return
+        amo = self.options.amo or "pairwise"
         for activity in activities:
-            # At least one start time is selected
-            cnf.add_clause([self.vr.start(activity.id, t) for t in range(max_time)])
-            # At most one start time is selected
-            for t1 in range(max_time):
-                start_t1 = self.vr.start(activity.id, t1)
-                for t2 in range(t1 + 1, max_time):
-                    cnf.add_clause([-start_t1, -self.vr.start(activity.id, t2)])
+            # Exactly one start time is selected
+            starts = [self.vr.start(activity.id, t) for t in self.windows[activity.id].start_times]
+            self.vr.var_count = encode_exactly_one(cnf, starts, amo, self.vr.var_count)
 
     def _encode_start_in_time(self, cnf, max_time: int, activities: List[Activity]):
         # Each activity must start within the given time frame
@@ -61,26 +118,24 @@ class SatEncoder:
             activity_id = activity.id
             activity_duration = activity.duration
             # Calculate the start time range once
-            start_range = range(max_time - activity_duration + 1, max_time)
+            window = self.windows[activity_id]
+            start_range = range(max(max_time - activity_duration + 1, window.earliest_start), window.latest_start + 1)
             for t in start_range:
                 cnf.add_clause([-self.vr.start(activity_id, t)])
  
     def _encode_runtime(self, cnf, max_time: int, activities: List[Activity]):
         # Mỗi công việc chỉ được thực hiện trong thời gian cho trước
+        # start(t) -> run(j) với t <= j < t + duration, ngược lại -run(j)
         for activity in activities:
             activity_id = activity.id
-            activity_duration = activity.duration
-            for t in range(max_time):
-                literal = self.vr.start(activity_id, t)
-                # trước thời điểm t ko có công viêc nào được thực hiện
-                for before_running_time in range(t):
-                    cnf.add_clause([-literal, -self.vr.run(activity_id, before_running_time)])
-                # công việc hoạt động trong khoảng thời gian cho trước
-                for running_time in range(t, t + activity_duration):
-                    cnf.add_clause([-literal, self.vr.run(activity_id, running_time)])
-                # sau thời điểm t ko có công việc nào được thực hiện
-                for after_running_time in range(t + activity_duration, max_time):
-                    cnf.add_clause([-literal, -self.vr.run(activity_id, after_running_time)])
+            window = self.windows[activity_id]
+            runs = [self.vr.run(activity_id, t) for t in window.run_times]
+            if self.options.time_encoding == "order":
+                started = [self.vr.started(activity_id, t) for t in window.start_times]
+                encode_runtime_from_ladder(cnf, started, runs, activity.duration)
+                continue
+            starts = [self.vr.start(activity_id, t) for t in window.start_times]
+            add_clause_matrix(cnf, runtime_clauses(starts, runs, activity.duration))
                     
     def _encode_work_load(self, cnf, max_time: int, activities: List[Activity]):
         # Introduce new variables for every time t that encode if any activity is running
@@ -90,6 +145,8 @@ class SatEncoder:
             implication_one = [-encVar]
             for activity in activities:
                 activity_id = activity.id
+                if t not in self.windows[activity_id].run_times:
+                    continue
                 run_var = self.vr.run(activity_id, t)
                 implication_one.append(run_var)
                 cnf.add_clause([encVar, -run_var])
@@ -101,65 +158,68 @@ class SatEncoder:
 
 
     def _encode_relations(self,cnf,max_time: int,activities:List[Activity],Relations:List[Relation]):
-        for relation in Relations:
-            activity_id_1 = relation.activity_id_1
-            activity_id_2 = relation.activity_id_2
-            relation_type = relation.relation_type
-            activity_1=self._find_activity_by_id(activities,activity_id_1)
-            activity_2=self._find_activity_by_id(activities,activity_id_2)
-            if activity_1 is None or activity_2 is None:
+        for activity_id_1, activity_id_2, relation_type, activity_1_duration, activity_2_duration \
+                in self.project.arrays.relations():
+            if activity_1_duration is None or activity_2_duration is None:
                 print("Error: Activity not found")
                 continue
-            activity_1_duration=activity_1.duration
-            activity_2_duration=activity_2.duration
+
+            window_1 = self.windows[activity_id_1]
+            window_2 = self.windows[activity_id_2]
 
             if relation_type == RelationType.FS:
                  # B does not start before A finishes
-                for t in range(max_time):
-                    literal = self.vr.start(first.get_id(), t)
-                    for k in range(0, t + activity_1_duration):
+                for t in window_1.start_times:
+                    literal = self.vr.start(activity_id_1, t)
+                    for k in window_2.starts_before(t + activity_1_duration):
                         cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
             elif relation_type == RelationType.SS:
                 # B does not start before A starts
-                for t in range(max_time):
+                for t in window_1.start_times:
                     literal = self.vr.start(activity_id_1, t)
-                    for k in range(t):
+                    for k in window_2.starts_before(t):
                         cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
             elif relation_type == RelationType.FF:
                 # B does not finish before A finishes
-                for t in range(max_time):
+                for t in window_1.start_times:
                     literal = self.vr.start(activity_id_1, t)
-                    if t + activity_1_duration - activity_2_duration >0:
-                        for k in range(0,t + activity_1_duration - activity_2_duration):
-                            cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
+                    for k in window_2.starts_before(t + activity_1_duration - activity_2_duration):
+                        cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
             elif relation_type == RelationType.SF:
                 # B does not start before A finishes
-                for t in range(max_time):
-                    if time - activity_2_duration > 0:
+                if max_time - activity_2_duration > 0:
+                    for t in window_1.start_times:
                         literal = self.vr.start(activity_id_1, t)
-                        for k in range(0,t - activity_2_duration +2):
+                        for k in window_2.starts_before(t - activity_2_duration + 2):
                             cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
                 
-    def _find_activity_by_id(self,activities:List[Activity],activity_id:int):
-        for activity in activities:
-            if activity.id == activity_id:
-                return activity
-        return None
-    def _encode_resources_with_cardinalities(self,cnf,max_time:int,activities:List[Activity],resources:List[Resource],consumptions:List[Consumption]):
+    def _encode_resource_constraints(self,cnf,max_time:int,activities:List[Activity],resources:List[Resource],consumptions:List[Consumption]):
         for t in range(max_time):
             for activity in activities:
                 activity_id=activity.id
-                consumption=self._find_consumption_by_activity_id(activity_id,consumptions)
-                consume_vars=self._get_consume_variables_for_activity_at_instant(activity,consumption,t)
-                for consume_var in consume_vars:
-                    cnf.add_clause([-self.vr.run(activity_id,t),consume_var])
+                if t not in self.windows[activity_id].run_times:
+                    continue
+                for consumption in self.project.consumptions_of(activity_id):
+                    consume_vars=self._get_consume_variables_for_activity_at_instant(activity,consumption,t)
+                    for consume_var in consume_vars:
+                        cnf.add_clause([-self.vr.run(activity_id,t),consume_var])
             
             for resource in resources:
                 resource_id=resource.id
                 bound=resource.capacity
-                consumption_vars_resource=self._get_consume_variables_for_resource_at_instant(resource_id,consumptions,t)
+                consumption_vars_resource=self._get_consume_variables_for_resource_at_instant(resource_id,t)
                 if consumption_vars_resource:
-                    self.bcc.gen_less_than_constraint_pblib_amk_card(cnf,bound,consumption_vars_resource,resource_id,t)
+                    self._encode_resource_bound(cnf,bound,consumption_vars_resource,resource_id,t)
+            # one batch of PBLib clauses per instant
+            self.pb_service.flush(cnf)
+
+    def _encode_resource_bound(self,cnf,bound:int,consumption_vars:List[int],resource_id:int,instant_time:int):
+        # at most bound of the consume variables of a resource at an instant
+        if self.resource_pb_encoder is None:
+            self.bcc.gen_less_than_constraint_pblib_amk_card(cnf,bound,consumption_vars,resource_id,instant_time)
+            return
+        max_var=self.pb_service.at_most_k(consumption_vars,bound,self.vr.var_count,pb_encoder=self.resource_pb_encoder)
+        self.vr.var_count=max_var+1
 
     def _get_consume_variables_for_activity_at_instant(self,activity:Activity,consumption:Consumption,instant_time:int):
         consumption_vars=[]
@@ -167,15 +227,10 @@ class SatEncoder:
             consumption_vars.append(self.vr.consume(consumption.activity_id,consumption.resource_id,instant_time,i))
         return consumption_vars
 
-    def _find_consumption_by_activity_id(self,activity_id:int,consumptions:List[Consumption]):
-        for consumption in consumptions:
-            if consumption.activity_id==activity_id:
-                return consumption
-        return None
-    def _get_consume_variables_for_resource_at_instant(self,resource_id:int,consumptions:List[Consumption],instant_time:int):
+    def _get_consume_variables_for_resource_at_instant(self,resource_id:int,instant_time:int):
         consumption_vars=[]
-        for consumption in consumptions:
-            if consumption.resource_id==resource_id:
+        for consumption in self.project.consumers_of(resource_id):
+            if instant_time in self.windows[consumption.activity_id].run_times:
                 for i in range (-consumption.amount):
                     consumption_vars.append(self.vr.consume(consumption.activity_id,consumption.resource_id,instant_time,i))
         return  consumption_vars      
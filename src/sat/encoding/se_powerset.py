@@ -1,199 +1,18 @@
-from sat.encoding.variable_factory import VariableFactory
-from sat.data.project import Project
+from sat.encoding.sat_encoder import SatEncoder
+from sat.encoding.forbidden_sets import encode_forbidden_sets
 from sat.data.activity import Activity
-from sat.data.relation import Relation
 from sat.data.resource import Resource
-from sat.data.relation_type import RelationType
 from sat.data.consumption import Consumption
 from typing import List
-from pypblib.pblib import PBConfig, Pb2cnf,AMK_BDD,AMK_BDD
-
-class SatEncoderPowerset:
-    _sat_encoder = None
-    def __init__(self):
-        self.vr = VariableFactory.get_variable_factory()
-    
-    @classmethod 
-    def  get_sat_encoder(cls):
-        if cls._sat_encoder is None:
-            cls._sat_encoder = SatEncoderPowerset()
-        return cls._sat_encoder
-
-    def handle(self,cnf, project:Project):
-
-        max_time =project.max_time
-        activities = project.activities
-        relations = project.relations
-        resources = project.resources
-        consumption=project.consumptions
-
-        self._encode_unique_Start_instant(cnf,max_time,activities)
-        self._encode_start_in_time(cnf,max_time,activities)
-        self._encode_runtime(cnf,max_time,activities)
-        self._encode_work_load(cnf,max_time,activities)
-        self._encode_relations(cnf,max_time,activities,relations)
-        self._encode_resources_with_powerset(cnf,max_time,activities,resources,consumption)
-
-
-    
-    def _encode_resources_with_powerset(self,cnf,max_time: int,activities:List[Activity],resources:List[Resource],consumptions:List[Consumption]):
-        powerset = [[]]
-        resource_conflicts = []
-        for activity in activities:
-            new_ps=[]
-            for subset in powerset:
-                new_ps.append(subset)
-                new_subset=subset.copy()
-                new_subset.append(activity)
-                if new_subset not in resource_conflicts:
-                    resource_conflict=self._encode_consumption(cnf, max_time, new_subset, resources,consumptions)
-                else:
-                    resource_conflict = False
-                if not resource_conflict:
-                    new_ps.append(new_subset)
-                else:
-                    resource_conflicts.append(new_subset)
-            powerset=new_ps
-           
-    def _encode_consumption(self, cnf, max_time: int, combination: List[Activity], resources:List[Resource],consumptions:List[Consumption]) -> bool:
-        if not combination:
-            return False
-        for resource in resources:
-            consumption_sum = 0
-            for activity in combination:
-                consumption = self._find_consumption_by_activity_id(activity.id, consumptions)  
-                if consumption is not None and consumption.amount < 0:
-                    consumption_sum += consumption.amount
-            # consumption_sum is assumed negative.
-            if resource.capacity + consumption_sum < 0:
-                self.encode_resource_conflict(cnf, max_time, combination)
-                return True
-        return False
-    
-    def encode_resource_conflict(self, cnf, max_time: int, combination: List[Activity]):
-        for time in range(max_time):
-            clause = [-self.vr.run(activity.id, time)
-                      for activity in combination]
-            cnf.add_clause(clause)
-
-    # Ràng buộc 1: Mỗi công việc chỉ bắt đầu một lần
-    def _encode_unique_Start_instant(self, cnf, max_time: int, activities: List[Activity]):
-        pbConfig = PBConfig()
-        pbConfig.set_AMK_Encoder(AMK_BDD)
-
-        for activity in activities:
-            activity_id = activity.id
-            var=[]
-            formula=[]
-            pb2 = Pb2cnf(pbConfig)
-            for t in range(max_time):
-                var.append(self.vr.start(activity_id, t))
-            max_var=pb2.encode_at_least_k(var,1,formula,self.vr.var_count)
-            max_var = pb2.encode_at_most_k(var, 1, formula, max_var + 1)
-            self.vr.var_count = max_var + 1
-            for clause in formula:
-                cnf.add_clause(clause)
+from pypblib.pblib import AMK_BDD
 
 
-    def _encode_start_in_time(self, cnf, max_time: int, activities: List[Activity]):
-        # Each activity must start within the given time frame
-        for activity in activities:
-            activity_id = activity.id
-            activity_duration = activity.duration
-            # Calculate the start time range once
-            start_range = range(max_time - activity_duration + 1, max_time)
-            for t in start_range:
-                cnf.add_clause([-self.vr.start(activity_id, t)])
- 
-    def _encode_runtime(self, cnf, max_time: int, activities: List[Activity]):
-        # Mỗi công việc chỉ được thực hiện trong thời gian cho trước
-        for activity in activities:
-            activity_id = activity.id
-            activity_duration = activity.duration
-            for t in range(max_time):
-                literal = self.vr.start(activity_id, t)
-                # trước thời điểm t ko có công viêc nào được thực hiện
-                for before_running_time in range(t):
-                    cnf.add_clause([-literal, -self.vr.run(activity_id, before_running_time)])
-                # công việc hoạt động trong khoảng thời gian cho trước
-                for running_time in range(t, t + activity_duration):
-                    cnf.add_clause([-literal, self.vr.run(activity_id, running_time)])
-                # sau thời điểm t ko có công việc nào được thực hiện
-                for after_running_time in range(t + activity_duration, max_time):
-                    cnf.add_clause([-literal, -self.vr.run(activity_id, after_running_time)])
-                    
-    def _encode_work_load(self, cnf, max_time: int, activities: List[Activity]):
-        # Introduce new variables for every time t that encode if any activity is running
-        assumptions = [self.vr.aux(t) for t in range(max_time)]
-        
-        for t, encVar in enumerate(assumptions):
-            implication_one = [-encVar]
-            for activity in activities:
-                activity_id = activity.id
-                run_var = self.vr.run(activity_id, t)
-                implication_one.append(run_var)
-                cnf.add_clause([encVar, -run_var])
-            cnf.add_clause(implication_one)
-
-        # Encode implications: -e(t) -> -e(t+1) == e(t) or -e(t+1)
-        for i in range(max_time - 1):
-            cnf.add_clause([assumptions[i], -assumptions[i + 1]])
-
-
-    def _encode_relations(self,cnf,max_time: int,activities:List[Activity],Relations:List[Relation]):
-        for relation in Relations:
-            activity_id_1 = relation.activity_id_1
-            activity_id_2 = relation.activity_id_2
-            relation_type = relation.relation_type
-            activity_1=self._find_activity_by_id(activities,activity_id_1)
-            activity_2=self._find_activity_by_id(activities,activity_id_2)
-            if activity_1 is None or activity_2 is None:
-                print("Error: Activity not found")
-                continue
-            activity_1_duration=activity_1.duration
-            activity_2_duration=activity_2.duration
-
-            if relation_type == RelationType.FS:
-                 # B does not start before A finishes
-                for t in range(max_time):
-                    literal = self.vr.start(activity_id_1, t)
-                    for k in range(0, t + activity_1_duration):
-                        cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
-            elif relation_type == RelationType.SS:
-                # B does not start before A starts
-                for t in range(max_time):
-                    literal = self.vr.start(activity_id_1, t)
-                    for k in range(t):
-                        cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
-            elif relation_type == RelationType.FF:
-                # B does not finish before A finishes
-                for t in range(max_time):
-                    literal = self.vr.start(activity_id_1, t)
-                    if t + activity_1_duration - activity_2_duration > 0:
-                        for k in range(0,t + activity_1_duration - activity_2_duration):
-                            cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
-            elif relation_type == RelationType.SF:
-                # B does not start before A finishes
-                for t in range(max_time):
-                    if max_time - activity_2_duration > 0:
-                        literal = self.vr.start(activity_id_1, t)
-                        for k in range(0,t - activity_2_duration +2):
-                            cnf.add_clause([-literal, -self.vr.start(activity_id_2, k)])
-                
-    def _find_activity_by_id(self,activities:List[Activity],activity_id:int):
-        for activity in activities:
-            if activity.id == activity_id:
-                return activity
-        return None
-
- 
-
-    def _find_consumption_by_activity_id(self,activity_id:int,consumptions:List[Consumption]):
-        for consumption in consumptions:
-            if consumption.activity_id==activity_id:
-                return consumption
-        return None
-
+class SatEncoderPowerset(SatEncoder):
+    _sat_encoder = None
+    start_amk_encoder = AMK_BDD
 
-     
-        
+    def _encode_resource_constraints(self,cnf,max_time: int,activities:List[Activity],resources:List[Resource],consumptions:List[Consumption]):
+        # only the minimal forbidden sets instead of the whole powerset walk (see sat.encoding.forbidden_sets)
+        arrays = self.project.arrays
+        encode_forbidden_sets(cnf, self.vr.run, self.windows, arrays.durations_by_id(), arrays.precedences(),
+                              arrays.demands_by_id(), arrays.capacities_by_id())
@@ -1,8 +1,144 @@
+from bisect import bisect_right
+from itertools import islice
+
+from sat.algorithm.time_windows import TimeWindow
+
+
+class DenseLayout:
+    """
+    Closed-form id blocks for the START, RUN, STARTED, AUX and CONSUMPTION families.
+
+    Every family gets contiguous blocks sized from the project, so an id is
+    computed with a couple of additions instead of formatting and hashing a key:
+
+        start(a, t)          = start_base[a] + t
+        run(a, t)            = run_base[a] + t
+        started(a, t)        = started_base[a] + t   (order encoding only)
+        aux(t)               = aux_begin + t
+        consume(a, r, t, i)  = consume_base[a, r] + (t - first run instant) * demand(a, r) + i
+
+    Start and started blocks cover the activity's start window, run and consume
+    blocks its run window (see sat.algorithm.time_windows); without windows
+    every block covers times 0..T-1.
+
+    Requests outside the blocks (unknown activity, time outside the window,
+    consume index outside the demand) return None so the factory can fall back
+    to its keyed map.
+    """
+
+    def __init__(self, activity_ids, max_time: int, demands: dict, first_id: int = 1, started: bool = False,
+                 windows: dict = None):
+        """
+        :param activity_ids: Activity ids in encoding order.
+        :param max_time: Horizon T.
+        :param demands: {(activity_id, resource_id): units} for every consume family.
+        :param first_id: First variable id handed out by the layout.
+        :param started: Reserve a STARTED block for the order encoding.
+        :param windows: Optional {activity_id: TimeWindow}; activities missing
+                        from it use the whole horizon.
+        """
+        self.max_time = max_time
+        self.activity_ids = list(activity_ids)
+        self.windows = {}
+        for activity_id in self.activity_ids:
+            window = (windows or {}).get(activity_id)
+            if window is None:
+                self.windows[activity_id] = (0, max_time - 1, max_time)
+            else:
+                self.windows[activity_id] = (window.earliest_start, window.latest_start, window.run_end)
+
+        # blocks are laid out back to back; (begin, key prefix, first time, units)
+        # sorted by begin double as the reverse map used by describe()
+        self.blocks = []
+        self.block_begins = []
+        self.start_base = {}
+        self.run_base = {}
+        self.started_base = {}
+        self.start_begin = first_id
+        offset = first_id
+        for family, base in ((VariableFactory.VARIABLE_START, self.start_base),
+                             (VariableFactory.VARIABLE_RUN, self.run_base),
+                             (VariableFactory.VARIABLE_STARTED, self.started_base)):
+            if family == VariableFactory.VARIABLE_STARTED and not started:
+                continue
+            for activity_id in self.activity_ids:
+                first_time, last_start, run_end = self.windows[activity_id]
+                last_time = run_end if family == VariableFactory.VARIABLE_RUN else last_start + 1
+                if last_time <= first_time:
+                    continue
+                base[activity_id] = (offset - first_time, first_time, last_time)
+                offset = self._add_block(offset, f"{family}_{activity_id}", first_time, 1, last_time - first_time)
+
+        self.aux_begin = offset
+        offset = self._add_block(offset, VariableFactory.VARIABLE_AUX, 0, 1, max_time)
+
+        self.consume_base = {}
+        self.consume_blocks = []
+        for (activity_id, resource_id), units in demands.items():
+            if units <= 0 or activity_id not in self.run_base:
+                continue
+            _, first_time, last_time = self.run_base[activity_id]
+            self.consume_base[(activity_id, resource_id)] = (offset, first_time, last_time, units)
+            self.consume_blocks.append((activity_id, resource_id, units))
+            offset = self._add_block(offset, f"{VariableFactory.VARIABLE_CONSUMPTION}_{activity_id}_{resource_id}",
+                                     first_time, units, (last_time - first_time) * units)
+        self.end = offset
+
+    def _add_block(self, offset, prefix, first_time, units, size):
+        self.blocks.append((offset, prefix, first_time, units))
+        self.block_begins.append(offset)
+        return offset + size
+
+    @staticmethod
+    def _lookup(base, activity_id, time):
+        block = base.get(activity_id)
+        if block is None or not block[1] <= time < block[2]:
+            return None
+        return block[0] + time
+
+    def start(self, activity_id, time):
+        return self._lookup(self.start_base, activity_id, time)
+
+    def run(self, activity_id, time):
+        return self._lookup(self.run_base, activity_id, time)
+
+    def started(self, activity_id, time):
+        return self._lookup(self.started_base, activity_id, time)
+
+    def aux(self, time):
+        if not 0 <= time < self.max_time:
+            return None
+        return self.aux_begin + time
+
+    def consume(self, activity_id, resource_id, time, consume_id):
+        block = self.consume_base.get((activity_id, resource_id))
+        if block is None:
+            return None
+        base, first_time, last_time, units = block
+        if not first_time <= time < last_time or not 0 <= consume_id < units:
+            return None
+        return base + (time - first_time) * units + consume_id
+
+    def describe(self, var):
+        """Returns the factory key of a layout variable, or None outside the blocks."""
+        if not self.start_begin <= var < self.end:
+            return None
+        begin, prefix, first_time, units = self.blocks[bisect_right(self.block_begins, var) - 1]
+        time, index = divmod(var - begin, units)
+        if prefix.startswith(VariableFactory.VARIABLE_CONSUMPTION):
+            return f"{prefix}_{first_time + time}_{index}"
+        return f"{prefix}_{first_time + time}"
+
+    def keys(self):
+        """Yields (key, id) for every variable of the layout."""
+        for var in range(self.start_begin, self.end):
+            yield self.describe(var), var
 
 
 class VariableFactory:
     VARIABLE_START = "START"
     VARIABLE_RUN = "RUN"
+    VARIABLE_STARTED = "STARTED"
     VARIABLE_SUM="SUM"
     VARIABLE_AUX="AUX"
     VARIABLE_CONSUMPTION="CONSUMPTION"
@@ -17,27 +153,145 @@ class VariableFactory:
             cls._factory = cls()
         return cls._factory
 
+    def use_dense_layout(self, activity_ids, max_time: int, demands: dict, started: bool = False,
+                         windows: dict = None):
+        """
+        Switches start/run/started/aux/consume to closed-form ids (see DenseLayout),
+        restricted to the activities' time windows when given.
+        Must be called on a fresh factory, before any variable is created.
+        Variables that fall outside the blocks, the SUM family and the
+        auxiliaries allocated through var_count keep using the keyed map.
+        """
+        if self._named:
+            raise ValueError("Dense layout must be set before variables are created")
+        self.layout = DenseLayout(activity_ids, max_time, demands, self.var_count, started, windows)
+        self.var_count = self.layout.end
+        self._var_map = None
+
     def _get_variable (self, key_name):
-         if key_name not in self.var_map:
-            self.var_map[key_name] = self.var_count
+         if key_name not in self._named:
+            self._named[key_name] = self.var_count
+            self._keys[self.var_count] = key_name
             self.var_count += 1
-         return self.var_map[key_name]
+         return self._named[key_name]
     def start(self,activity_id,time):
+        if self.layout is not None:
+            var = self.layout.start(activity_id, time)
+            if var is not None:
+                return var
         return self._get_variable(f"{self.VARIABLE_START}_{activity_id}_{time}")
     def run(self,activity_id,time):
+        if self.layout is not None:
+            var = self.layout.run(activity_id, time)
+            if var is not None:
+                return var
         return self._get_variable(f"{self.VARIABLE_RUN}_{activity_id}_{time}")
 
+    def started(self,activity_id,time):
+        if self.layout is not None:
+            var = self.layout.started(activity_id, time)
+            if var is not None:
+                return var
+        return self._get_variable(f"{self.VARIABLE_STARTED}_{activity_id}_{time}")
+
     def aux(self,time):
+        if self.layout is not None:
+            var = self.layout.aux(time)
+            if var is not None:
+                return var
         return self._get_variable(f"{self.VARIABLE_AUX}_{time}")
 
     def sum(self,resource_id,time,id):
         return self._get_variable(f"{self.VARIABLE_SUM}_{resource_id}_{time}_{id}")
-    
+
     def consume(self,activity_id,resource_id,time,consume_id):
+        if self.layout is not None:
+            var = self.layout.consume(activity_id, resource_id, time, consume_id)
+            if var is not None:
+                return var
         return self._get_variable(f"{self.VARIABLE_CONSUMPTION}_{activity_id}_{resource_id}_{time}_{consume_id}")
 
-    def reset(self):
-        self.var_count = 1
-        self.var_map = {}
+    def find_start(self, activity_id, time):
+        """Id of start(activity_id, time) if that variable exists, None otherwise; never creates one."""
+        if self.layout is not None:
+            var = self.layout.start(activity_id, time)
+            if var is not None:
+                return var
+        return self._named.get(f"{self.VARIABLE_START}_{activity_id}_{time}")
+
+    def start_times(self, model, activity_ids, max_time: int) -> dict:
+        """
+        {activity_id: first instant below max_time whose start variable is true},
+        read straight from a solver model (model[v - 1] is the literal of v)
+        without creating variables. Activities without a true start are left out.
+        """
+        start_times = {}
+        for activity_id in activity_ids:
+            for time in range(max_time):
+                var = self.find_start(activity_id, time)
+                if var is not None and var <= len(model) and model[var - 1] > 0:
+                    start_times[activity_id] = time
+                    break
+        return start_times
+
+    @property
+    def var_map(self):
+        """
+        Key -> id for every variable, including the whole dense layout. The
+        layout part is listed once per layout and kept; keyed variables created
+        since the last access are added to it.
+        """
+        if self.layout is None:
+            return self._named
+        if self._var_map is None:
+            self._var_map = dict(self.layout.keys())
+            self._var_map_named = 0
+        if self._var_map_named < len(self._named):
+            # _named only grows between resets, new keys come last
+            self._var_map.update(islice(self._named.items(), self._var_map_named, None))
+            self._var_map_named = len(self._named)
+        return self._var_map
+
+    def describe(self, var):
+        """Reverse lookup of a variable id; dense ids are resolved without building var_map."""
+        var = abs(var)
+        if self.layout is not None:
+            key = self.layout.describe(var)
+            if key is not None:
+                return key
+        return self._keys.get(var)
 
+    def state(self) -> dict:
+        """JSON-serialisable snapshot of the factory, restored with load_state()."""
+        layout = None
+        if self.layout is not None:
+            layout = {
+                "activity_ids": self.layout.activity_ids,
+                "max_time": self.layout.max_time,
+                "demands": [[a, r, units] for a, r, units in self.layout.consume_blocks],
+                "first_id": self.layout.start_begin,
+                "started": bool(self.layout.started_base),
+                "windows": [[a, *window] for a, window in self.layout.windows.items()],
+            }
+        return {"var_count": self.var_count, "var_map": self._named, "layout": layout}
 
+    def load_state(self, state: dict):
+        """Restores a snapshot taken with state(), e.g. from a DIMACS sidecar file."""
+        self.reset()
+        layout = state.get("layout")
+        if layout is not None:
+            demands = {(a, r): units for a, r, units in layout["demands"]}
+            windows = {a: TimeWindow(*window) for a, *window in layout.get("windows", [])}
+            self.layout = DenseLayout(layout["activity_ids"], layout["max_time"], demands, layout["first_id"],
+                                      layout.get("started", False), windows)
+        self._named = dict(state["var_map"])
+        self._keys = {value: key for key, value in self._named.items()}
+        self.var_count = state["var_count"]
+
+    def reset(self):
+        self.var_count = 1
+        self._named = {}
+        self._keys = {}  # id -> key of _named, for describe()
+        self.layout = None
+        self._var_map = None  # var_map of the dense layout, built on first access
+        self._var_map_named = 0
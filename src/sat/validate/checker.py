@@ -0,0 +1,222 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+SECTIONS = ("task_coverage", "time_windows", "precedence", "resources")
+
+# section of the validation report each violation kind belongs to
+KIND_SECTIONS = {
+    "missing": "task_coverage",
+    "extra": "task_coverage",
+    "start": "time_windows",
+    "horizon": "time_windows",
+    "duration": "time_windows",
+    "precedence": "precedence",
+    "resource": "resources",
+}
+
+
+class Violation(NamedTuple):
+    """
+    One broken constraint of a schedule.
+
+    Attributes:
+    ----------
+    kind : str
+        "missing"/"extra" (activity not scheduled / unknown), "start" (before 0),
+        "horizon" (ends after max_time), "duration", "precedence" or "resource".
+    subject : int
+        Activity id, or the resource id for "resource".
+    other : Optional[int]
+        Successor activity of a "precedence" violation.
+    time : Optional[int]
+        Instant of a "resource" violation.
+    value : Optional[int]
+        What the schedule has: start, end, duration, start distance or usage.
+    limit : Optional[int]
+        What the constraint allows: 0, max_time, duration, lag or capacity.
+    """
+    kind: str
+    subject: int
+    other: Optional[int] = None
+    time: Optional[int] = None
+    value: Optional[int] = None
+    limit: Optional[int] = None
+
+    @property
+    def section(self) -> str:
+        return KIND_SECTIONS[self.kind]
+
+    @property
+    def message(self) -> str:
+        if self.kind == "missing":
+            return f"Missing task in schedule: {self.subject}"
+        if self.kind == "extra":
+            return f"Extra task in schedule: {self.subject}"
+        if self.kind == "start":
+            return f"Task {self.subject} starts before time 0"
+        if self.kind == "horizon":
+            return f"Task {self.subject} ends after max time {self.limit}"
+        if self.kind == "duration":
+            return f"Task {self.subject} duration mismatch: scheduled {self.value}, required {self.limit}"
+        if self.kind == "precedence":
+            return (f"Precedence violation: Task {self.other} must start at least {self.limit} "
+                    f"after Task {self.subject} starts (distance {self.value})")
+        return f"Resource {self.subject} overused at time {self.time}: usage {self.value} > capacity {self.limit}"
+
+
+class ScheduleChecker:
+    """
+    Validates schedules of one project with NumPy arrays built once.
+
+    Relations are arcs (activity_id_1, activity_id_2, lag) meaning
+    start(2) - start(1) >= lag, so the four relation types are one vectorised
+    comparison (see sat.data.relation_type.relation_lag). Resource
+    profiles come from difference arrays: +demand at every start, -demand at
+    every end, one bincount per sign and a cumulative sum over time.
+
+    is_valid(starts) is the fast path for search loops (starts aligned with
+    activity_ids); check() and check_rows() return Violation records.
+    """
+
+    def __init__(self, activity_ids: Sequence[int], durations: Sequence[int],
+                 precedences: Iterable[Tuple[int, int, int]], demands: Dict[Tuple[int, int], int],
+                 capacities: Dict[int, int], max_time: int):
+        """
+        :param activity_ids: Activity ids; position i of a starts array belongs to activity_ids[i].
+        :param durations: Duration of each activity, aligned with activity_ids.
+        :param precedences: (activity_id_1, activity_id_2, lag) arcs; arcs to unknown ids are ignored.
+        :param demands: {(activity_id, resource_id): units}; units <= 0 are ignored.
+        :param capacities: {resource_id: capacity}.
+        :param max_time: Every activity must finish by this instant.
+        """
+        self.activity_ids = list(activity_ids)
+        self.index = {activity_id: i for i, activity_id in enumerate(self.activity_ids)}
+        self.durations = np.asarray(durations, dtype=np.int64)
+        self.max_time = max_time
+
+        arcs = [(self.index[first], self.index[second], lag) for first, second, lag in precedences
+                if first in self.index and second in self.index]
+        arcs = np.asarray(arcs, dtype=np.int64).reshape(-1, 3)
+        self.sources, self.targets, self.lags = arcs[:, 0], arcs[:, 1], arcs[:, 2]
+
+        self.resource_ids = list(capacities)
+        resource_index = {resource_id: r for r, resource_id in enumerate(self.resource_ids)}
+        self.capacities = np.asarray([capacities[resource_id] for resource_id in self.resource_ids], dtype=np.int64)
+        pairs = [(self.index[activity_id], resource_index[resource_id], units)
+                 for (activity_id, resource_id), units in demands.items()
+                 if units > 0 and activity_id in self.index and resource_id in resource_index]
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 3)
+        self.demand_activities, self.demand_resources, self.demand_units = pairs[:, 0], pairs[:, 1], pairs[:, 2]
+
+    def profiles(self, starts: np.ndarray, ends: np.ndarray = None, scheduled: np.ndarray = None) -> np.ndarray:
+        """
+        Resource usage, shape (resources, T) with T covering max_time and every end.
+
+        :param scheduled: Boolean mask of the activities to count (default all).
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = starts + self.durations if ends is None else np.asarray(ends, dtype=np.int64)
+        keep = np.ones(len(self.demand_units), dtype=bool) if scheduled is None else scheduled[self.demand_activities]
+        activities, resources, units = (self.demand_activities[keep], self.demand_resources[keep],
+                                        self.demand_units[keep])
+        width = max(self.max_time, int(ends.max(initial=0))) + 1
+        size = len(self.resource_ids) * width
+        # an activity starting before 0 is counted from 0
+        first = resources * width + np.clip(starts[activities], 0, None)
+        last = resources * width + np.clip(ends[activities], 0, None)
+        delta = (np.bincount(first, weights=units, minlength=size)
+                 - np.bincount(last, weights=units, minlength=size))
+        return np.cumsum(delta.reshape(len(self.resource_ids), width), axis=1)[:, :-1].astype(np.int64)
+
+    def is_valid(self, starts: np.ndarray) -> bool:
+        """Whether starts (aligned with activity_ids) satisfies every constraint."""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = starts + self.durations
+        if starts.min(initial=0) < 0 or ends.max(initial=0) > self.max_time:
+            return False
+        if np.any(starts[self.targets] - starts[self.sources] < self.lags):
+            return False
+        return not np.any(self.profiles(starts, ends) > self.capacities[:, None])
+
+    def check(self, starts: np.ndarray, ends: np.ndarray = None,
+              scheduled: np.ndarray = None) -> Tuple[List[Violation], np.ndarray]:
+        """
+        Every violation of a schedule, plus its resource profiles.
+
+        :param starts: Start of each activity, aligned with activity_ids.
+        :param ends: End of each activity; default starts + durations.
+        :param scheduled: Boolean mask of the activities present in the schedule;
+                          absent ones are reported as "missing" and otherwise ignored.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = starts + self.durations if ends is None else np.asarray(ends, dtype=np.int64)
+        if scheduled is None:
+            scheduled = np.ones(len(self.activity_ids), dtype=bool)
+        ids = self.activity_ids
+        violations = [Violation("missing", ids[i]) for i in np.flatnonzero(~scheduled)]
+
+        for i in np.flatnonzero(scheduled & (starts < 0)):
+            violations.append(Violation("start", ids[i], value=int(starts[i]), limit=0))
+        for i in np.flatnonzero(scheduled & (ends > self.max_time)):
+            violations.append(Violation("horizon", ids[i], value=int(ends[i]), limit=self.max_time))
+        lengths = ends - starts
+        for i in np.flatnonzero(scheduled & (lengths != self.durations)):
+            violations.append(Violation("duration", ids[i], value=int(lengths[i]), limit=int(self.durations[i])))
+
+        distances = starts[self.targets] - starts[self.sources]
+        broken = (distances < self.lags) & scheduled[self.sources] & scheduled[self.targets]
+        for k in np.flatnonzero(broken):
+            violations.append(Violation("precedence", ids[self.sources[k]], other=ids[self.targets[k]],
+                                        value=int(distances[k]), limit=int(self.lags[k])))
+
+        usage = self.profiles(starts, ends, scheduled)
+        for r, t in zip(*np.nonzero(usage > self.capacities[:, None])):
+            violations.append(Violation("resource", self.resource_ids[r], time=int(t),
+                                        value=int(usage[r, t]), limit=int(self.capacities[r])))
+        return violations, usage
+
+    def check_rows(self, schedule: List[dict]) -> Tuple[List[Violation], np.ndarray]:
+        """check() for decoded rows with 'task_id', 'start_time' and 'end_time'."""
+        starts = np.zeros(len(self.activity_ids), dtype=np.int64)
+        ends = self.durations.copy()
+        scheduled = np.zeros(len(self.activity_ids), dtype=bool)
+        extra = []
+        for row in schedule:
+            i = self.index.get(row['task_id'])
+            if i is None:
+                extra.append(Violation("extra", row['task_id']))
+                continue
+            starts[i], ends[i], scheduled[i] = row['start_time'], row['end_time'], True
+        violations, usage = self.check(starts, ends, scheduled)
+        return extra + violations, usage
+
+    def report(self, schedule: List[dict]) -> Tuple[bool, dict]:
+        """
+        (is_valid, validation_results) in the format of validate_project: per
+        section 'passed', readable 'details' and the Violation records.
+        """
+        violations, usage = self.check_rows(schedule)
+        results = {section: {'passed': True, 'details': [], 'violations': []} for section in SECTIONS}
+        for violation in violations:
+            section = results[violation.section]
+            section['passed'] = False
+            section['details'].append(violation.message)
+            section['violations'].append(violation)
+
+        if results['task_coverage']['passed']:
+            results['task_coverage']['details'].append("All tasks are scheduled exactly once")
+        if results['time_windows']['passed']:
+            results['time_windows']['details'].append(
+                "All tasks are within their allowed time windows and have correct durations")
+        if results['precedence']['passed']:
+            results['precedence']['details'].append(
+                f"All {len(self.lags)} precedence relations are satisfied")
+        if results['resources']['passed']:
+            peaks = usage.max(axis=1, initial=0)
+            results['resources']['details'].append(
+                f"All {len(self.resource_ids)} resources are within their capacity limits")
+            for resource_id, peak, capacity in zip(self.resource_ids, peaks, self.capacities):
+                results['resources']['details'].append(
+                    f"Resource {resource_id} usage is within capacity (max usage: {peak}/{capacity})")
+        return all(section['passed'] for section in results.values()), results
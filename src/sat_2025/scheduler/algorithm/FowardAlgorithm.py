@@ -1,6 +1,7 @@
 # Assuming the following imports reflect your project structure:
 from sat_based_2014.scheduler.data import Activity,Relation,RelationType
 from sat_based_2014.scheduler.algorithm import Algorithm
+from sat.algorithm.cpm import CriticalPath
 
 class FowardAlgorithm(Algorithm):
     VIRTUAL_MILESTONE_START = "project_start_virtual"
@@ -15,6 +16,7 @@ class FowardAlgorithm(Algorithm):
         self.virtual_end_id = -1
         self.first = None  # Virtual start milestone (Activity)
         self.last = None   # Virtual end milestone (Activity)
+        self.engine = None  # CriticalPath of the project, see critical_path
 
     def calculate(self):
         """
@@ -27,9 +29,46 @@ class FowardAlgorithm(Algorithm):
         # Assuming project.get_wat() returns the project's work arrival time (start time)
         print(self.project.get_wat())
         self.first.set_early_start_date(self.project.get_wat())
-        self.project.embed_forwards(self.first)
+        self.embed_forwards()
         self.remove_virtual_milestones(self.first, self.last)
 
+    def critical_path(self):
+        """
+        The array-based CPM engine (sat.algorithm.cpm.CriticalPath) over the
+        activities of the project and every relation registered on them.
+        Built on first use and kept until the milestones are added or removed.
+        """
+        if self.engine is None:
+            activities = self.project.get_activities()
+            self.engine = CriticalPath([activity.get_id() for activity in activities],
+                                       [int(activity.get_duration()) for activity in activities],
+                                       self.project.precedences())
+        return self.engine
+
+    def embed_forwards(self):
+        """
+        Performs the forward embedding: one topological pass over all relations
+        pushes the early dates of every activity (the virtual start included)
+        to their successors.
+        """
+        activities = self.project.get_activities()
+        release = [activity.get_early_start_date() for activity in activities]
+        earliest = self.critical_path().forward(release)
+        for activity, time in zip(activities, earliest.tolist()):
+            activity.set_early_start_date(time)
+
+    def embed_backwards(self, horizon: int):
+        """
+        Performs the backward pass: sets the late dates of every activity so that
+        all of them finish by horizon.
+
+        :param horizon: The project end time.
+        """
+        activities = self.project.get_activities()
+        latest = self.critical_path().backward(horizon)
+        for activity, time in zip(activities, latest.tolist()):
+            activity.set_late_start_date(time)
+
     def add_virtual_milestones(self):
         """
         Adds virtual start and end milestones to the project.
@@ -56,6 +95,7 @@ class FowardAlgorithm(Algorithm):
         self.project.add_activity(self.first)
         self.last = Activity(self.virtual_end_id, 0, FowardAlgorithm.VIRTUAL_MILESTONE_END)
         self.project.add_activity(self.last)
+        self.engine = None
 
         # Connect the virtual start to all activities that have no predecessors.
         for activity in starts:
@@ -69,10 +109,8 @@ class FowardAlgorithm(Algorithm):
 
     def remove_virtual_milestones(self, first, last):
         """
-        Removes the virtual milestones from the project's list of activities.
+        Removes the virtual milestones and their relations from the project.
         """
-        activities = self.project.get_activities()
-        if first in activities:
-            activities.remove(first)
-        if last in activities:
-            activities.remove(last)
+        self.project.remove_activity(first)
+        self.project.remove_activity(last)
+        self.engine = None
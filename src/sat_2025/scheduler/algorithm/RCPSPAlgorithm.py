@@ -6,12 +6,24 @@ from pysat.solvers import Glucose3  # Using Glucose3 instead of Minisat22
 # Import the project’s modules.
 from ..encoding.SATEncoder import SATEncoder
 from ..encoding.SATDecoder import SATDecoder
+from sat.encoding.clause_arena import ClauseArena
+from sat.encoding.dimacs import read_dimacs, read_encoding_horizon, read_variable_state, write_dimacs
+from sat.algorithm.bounds import lower_bounds
+from sat.algorithm.lazy_resources import LazyResources
+from sat.algorithm.optimizer import MakespanOptimizer
+from sat.algorithm.sgs import ScheduleGenerator
+from sat.algorithm.solve_control import SolveBudget, SolveController
 from .Algorithm import Algorithm
 
 # Define a simple TimeoutException in case one is needed.
 class TimeoutException(Exception):
     pass
 
+# Raised when the formula contradicts a known schedule: a horizon a heuristic schedule fits in
+# is unsat, or a decoded schedule does not end at the makespan found.
+class EncodingError(Exception):
+    pass
+
 class  RCPSPAlgorithm(Algorithm):
     def __init__(self, project, bcc_mode):
         """
@@ -25,6 +37,21 @@ class  RCPSPAlgorithm(Algorithm):
         self.encoder = None
         self.decoder = None
         self.solver = None
+        self.arena = None
+        self.dimacs_path = None
+        self.horizon = None
+        self.amo_encoding = "pairwise"
+        self.time_encoding = "direct"
+        self.resource_encoding = None
+        self.lazy_resources = None
+        self.lazy = None
+        self.time_windows = True
+        self.heuristic_horizon = False
+        self.heuristic = None
+        self.lower_bounds = None
+        self.strategy = "bisection"
+        self.budget = SolveBudget(time_limit=3600)
+        self.steps = []
         self.encode_time_start = 0
         self.encode_time_end = 0
 
@@ -32,20 +59,29 @@ class  RCPSPAlgorithm(Algorithm):
         """
         Main method to run the RCPSP algorithm.
         It initializes the solver, encodes the project constraints,
-        and then uses a bisection method to find the minimal project duration.
+        and then searches the minimal project duration with the selected strategy.
         """
         self.solver = self.init_solver()
-        patch_solver_count_clauses(self.solver)
+        self.arena = ClauseArena()
 
         min_time = self.get_min_time(self.project.get_activities()) - 1
         max_time = self.get_max_time(self.project.get_activities())
+        self.horizon = max_time
         print("max_time",max_time)
         if max_time > 0:
             print("Encoding starts...")
             self.encoder = SATEncoder.get_encoder()
+            self.encoder.set_amo_encoding(self.amo_encoding)
+            self.encoder.set_time_encoding(self.time_encoding)
+            self.encoder.set_resource_encoding(self.resource_encoding)
+            self.encoder.set_lazy_resources(self.lazy_resources is not None)
+            self.encoder.set_time_windows(self.time_windows)
             encodeTimeStart=time.time()
 
-            self.encoder.encode(self.solver, self.project, max_time, self.bcc_mode)
+            self.encoder.encode(self.arena, self.project, max_time, self.bcc_mode)
+            if self.dimacs_path is not None:
+                self.export_dimacs(self.dimacs_path)
+            self.arena.load_into(self.solver)
             encodeTimeEnd=time.time()
             time_solve=encodeTimeEnd- encodeTimeStart
 
@@ -58,8 +94,15 @@ class  RCPSPAlgorithm(Algorithm):
 
             except TimeoutException:
                 self.reset_algorithm("TimeoutException")
+                if self.heuristic is not None:
+                    # the heuristic schedule is the fallback answer
+                    self.decoder.decode_starts(self.project, self.heuristic.starts)
+                    return "HEURISTIC",time_solve,self.arena.nof_vars(),self.arena.nof_clauses()
             except MemoryError:
                 self.reset_algorithm("OutOfMemoryError")
+            except EncodingError:
+                self.reset_algorithm("EncodingError")
+                raise
         else:
             print("No encoding necessary! Project duration: " + str(max_time))
         
@@ -68,54 +111,195 @@ class  RCPSPAlgorithm(Algorithm):
         """Sets the resource encoding mode."""
         self.bcc_mode = bcc_mode
 
+    def set_amo_encoding(self, amo_encoding):
+        """Selects the at-most-one encoding of start instants (pairwise, ladder, commander, product, bimander)."""
+        self.amo_encoding = amo_encoding
+
+    def set_time_encoding(self, time_encoding):
+        """Selects the start/run encoding: "direct" (quadratic runtime clauses) or "order" (started-by ladder)."""
+        self.time_encoding = time_encoding
+
+    def set_resource_encoding(self, resource_encoding):
+        """Selects a weighted PB resource encoding (bdd, swc, sorting_networks, adder, binary_merge, best); None keeps the consume variables."""
+        self.resource_encoding = resource_encoding
+
+    def set_lazy_resources(self, lazy_resources):
+        """Adds the resource constraints while solving, only where a model overloads a resource ("constraint" or "conflict"); None encodes them upfront."""
+        self.lazy_resources = lazy_resources
+
+    def set_time_windows(self, time_windows):
+        """Restricts start/run/consume variables to the critical-path time windows (on by default)."""
+        self.time_windows = time_windows
+
+    def set_strategy(self, strategy):
+        """Selects the makespan search: bisection, linear_ub, linear_lb or hybrid."""
+        self.strategy = strategy
+
+    def set_budget(self, budget):
+        """Limits the solver calls (a SolveBudget of seconds, conflicts and propagations); one hour by default."""
+        self.budget = budget
+
+    def set_heuristic_horizon(self, heuristic_horizon):
+        """Bounds the horizon by the makespan of a priority-rule schedule (off by default)."""
+        self.heuristic_horizon = heuristic_horizon
+
+    def set_dimacs_path(self, dimacs_path):
+        """Writes every encoded formula to this DIMACS file (.gz compresses)."""
+        self.dimacs_path = dimacs_path
+
+    def export_dimacs(self, path):
+        """
+        Streams the encoded formula to a DIMACS file, with the variable
+        factory state and the encoding horizon in a sidecar file so it can be
+        solved and decoded later.
+        """
+        write_dimacs(self.arena, path, self.encoder.variable_factory.to_state(), self.horizon)
+
+    def solve_dimacs(self, path):
+        """
+        Runs the makespan search on a formula written by export_dimacs, without
+        encoding the project again.
+
+        :param path: The DIMACS file.
+        :return: status, variables, clauses
+        """
+        self.solver = self.init_solver()
+        self.encoder = SATEncoder.get_encoder()
+        self.decoder = SATDecoder.get_decoder()
+        self.arena = read_dimacs(path)
+        self.encoder.variable_factory.load_state(read_variable_state(path))
+        self.arena.load_into(self.solver)
+
+        min_time = self.get_min_time(self.project.get_activities()) - 1
+        # aux(t) only exists below the horizon the formula was encoded with
+        max_time = read_encoding_horizon(path)
+        if max_time is None:
+            max_time = self.get_max_time(self.project.get_activities())
+        else:
+            self.heuristic = None
+        self.horizon = max_time
+        result = self.solve_problem(min_time, max_time)
+        self.reset_algorithm()
+        return result
+
     def solve_problem(self, min_time, max_time):
         """
-        Uses a bisection method on the time horizon to find a minimal
-        satisfiable project duration.
-        
-        :param min_time: The lower bound on the project duration.
-        :param max_time: The upper bound on the project duration.
-        :raises TimeoutException: if the solver times out.
-        """
-        initial_max_time = max_time
-        solver = self.solver  # the PySAT solver instance
-        sat = False
-        status=None
-        sat = self.solver.solve(assumptions=assumptions)
-        while max_time - min_time > 1:
-            mid_time = self.get_mid_time(min_time, max_time)
-            assumptions = self.encoder.get_assumptions(mid_time, initial_max_time)
-            sat = self.solver.solve(assumptions=assumptions)
-            if sat:
-                max_time = mid_time
-            else:
-                min_time = mid_time
-        variables, clauses = self.solver.nof_vars(), self.solver.nof_clauses()
+        Minimises the project duration on the loaded solver (see
+        sat.algorithm.optimizer.MakespanOptimizer). Every candidate duration is
+        tried by assuming -aux(t) for the later instants, so one solver and its
+        learned clauses serve all steps; self.steps records each call.
+        With lazy_resources the calls go through sat.algorithm.lazy_resources.LazyResources,
+        whose statistics are kept in self.lazy.
         
-        if sat:
-            model = solver.get_model()
-            self.decoder.decode(self.project, model)
+        :param min_time: The largest duration known to be infeasible.
+        :param max_time: The encoding horizon.
+        :raises TimeoutException: if the budget runs out before any schedule is found.
+        :raises EncodingError: if max_time is unsat although the heuristic schedule fits in it,
+            or the decoded schedule does not end at the makespan found.
+        """
+        optimizer = MakespanOptimizer(self.solver,
+                                      lambda current: self.get_assumptions(current, max_time),
+                                      lambda model: self.get_makespan(model, max_time),
+                                      self.strategy,
+                                      controller=self.get_controller(max_time))
+        outcome = optimizer.minimize(min_time + 1, max_time)
+        if self.lazy is not None:
+            self.encoder.variable_factory.set_count(self.lazy.next_var)
+        self.steps = outcome.steps
+        if outcome.makespan is None and outcome.interrupted:
+            raise TimeoutException()
+        if outcome.makespan is None and self.heuristic is not None and self.heuristic.makespan <= max_time:
+            raise EncodingError(f"{self.project.get_name()}: horizon {max_time} is unsat, "
+                                f"but a heuristic schedule of makespan {self.heuristic.makespan} exists")
+        variables, clauses = self.arena.nof_vars(), self.arena.nof_clauses()
+
+        if outcome.makespan is not None:
+            self.decoder.decode(self.project, outcome.model, max_time)
+            self.check_makespan(outcome.model, outcome.makespan, max_time)
             status="SAT"
         else:
             status="UNSAT"
-            last_sat_solution = self.solve_problem_for_initial_max_time(initial_max_time, solver)
-            if last_sat_solution is not None:
-                status="SAT"
-                self.decoder.decode(self.project, last_sat_solution)
-
 
         return status,variables, clauses
 
-        
+    def get_controller(self, max_time):
+        """
+        The SolveController of the budget, wrapped in a LazyResources loop when
+        lazy_resources is set.
+
+        :param max_time: The encoding horizon.
+        """
+        controller = SolveController(self.budget)
+        self.lazy = None
+        if self.lazy_resources is None:
+            return controller
+        durations, _, demands, capacities = self.project.scheduling_data()
+        windows = self.encoder.windows or self.encoder.compute_time_windows(self.project, max_time)
+        self.lazy = LazyResources(durations, demands, capacities, windows, max_time, self.encoder.variable_factory,
+                                  self.encoder.variable_factory.get_count(), self.lazy_resources,
+                                  self.resource_encoding, controller, self.arena)
+        return self.lazy
+
+    def get_assumptions(self, current, max_time):
+        """
+        Literals forcing every activity to finish by current: -aux(t) for the
+        later instants (see SATEncoder.get_assumptions) and, as zero-duration
+        activities never run, -start(a, t) for their later start instants.
+
+        :param current: The project duration asked for.
+        :param max_time: The encoding horizon.
+        """
+        assumptions = self.encoder.get_assumptions(current, max_time)
+        variable_factory = self.encoder.variable_factory
+        for activity_id in self.get_zero_duration_ids():
+            for time in range(current + 1, max_time):
+                start = variable_factory.find(variable_factory.VARIABLE_START, activity_id, time)
+                if start is not None:
+                    assumptions.append(self.encoder.neg(start))
+        return assumptions
+
+    def get_makespan(self, model, max_time):
+        """
+        Reads the project duration of a model from the aux(t) workload variables
+        and the starts of the zero-duration activities.
+
+        :param model: A solver model (list of literals).
+        :param max_time: The encoding horizon.
+        :return: The number of instants some activity runs at, or the latest
+            start of a zero-duration activity if that is later.
+        """
+        positive = set(literal for literal in model if literal > 0)
+        makespan = sum(1 for time in range(max_time) if self.encoder.variable_factory.aux(time) in positive)
+        starts = self.encoder.variable_factory.start_times(model, self.get_zero_duration_ids(), max_time)
+        return max([makespan, *starts.values()])
+
+    def get_zero_duration_ids(self):
+        return [activity.get_id() for activity in self.project.get_activities() if activity.get_duration() == 0]
+
+    def check_makespan(self, model, makespan, max_time):
+        """
+        Checks that the schedule decoded from model ends at makespan.
+
+        :raises EncodingError: if its latest end differs from makespan.
+        """
+        activities = self.project.get_activities()
+        starts = self.encoder.variable_factory.start_times(model, [activity.get_id() for activity in activities],
+                                                            max_time)
+        end = max((starts[activity.get_id()] + activity.get_duration()
+                   for activity in activities if activity.get_id() in starts), default=0)
+        if end != makespan:
+            raise EncodingError(f"{self.project.get_name()}: the decoded schedule ends at {end}, "
+                                f"not at the makespan {makespan}")
 
     def init_solver(self):
-        solver = Glucose3()
-        solver.conf_budget(3600 * 1000)  # Giới hạn thời gian 1 giờ (milliseconds)
+        solver = Glucose3()  # budget của từng lần gọi do SolveController đặt
         return solver
 
     def get_min_time(self, activities):
         """
-        Computes a lower bound for the project duration based on the activities.
+        Computes a lower bound for the project duration based on the activities:
+        the longest duration, the latest early end date and the critical-path,
+        resource-energy, disjunctive and energetic bounds (sat.algorithm.bounds).
         
         :param activities: A list of Activity objects.
         :return: An integer lower bound on project duration.
@@ -127,20 +311,26 @@ class  RCPSPAlgorithm(Algorithm):
             early_end = int(activity.get_early_end_date())
             if duration > min_time_over_duration:
                 min_time_over_duration = duration
-            elif early_end > min_time_over_early_end:
+            if early_end > min_time_over_early_end:
                 min_time_over_early_end = early_end
-        return max(min_time_over_duration, min_time_over_early_end)
+        self.lower_bounds = lower_bounds(*self.project.scheduling_data())
+        return max(min_time_over_duration, min_time_over_early_end, self.lower_bounds.best)
 
     def get_max_time(self, activities):
         """
-        Computes an upper bound for the project duration by summing activity durations.
+        Computes an upper bound for the project duration by summing activity durations,
+        tightened to the makespan of the best priority-rule schedule (serial/parallel
+        SGS with forward-backward improvement) when heuristic_horizon is set.
         
         :param activities: A list of Activity objects.
-        :return: The total duration as an integer.
+        :return: The upper bound as an integer.
         """
         max_time = 0
         for activity in activities:
             max_time += activity.get_duration()
+        if self.heuristic_horizon and max_time > 0:
+            self.heuristic = ScheduleGenerator(*self.project.scheduling_data()).best()
+            max_time = min(max_time, self.heuristic.makespan)
         return max_time
 
     def get_mid_time(self, min_time, max_time):
@@ -153,21 +343,6 @@ class  RCPSPAlgorithm(Algorithm):
         """
         return (min_time + max_time) // 2
 
-    def solve_problem_for_initial_max_time(self, max_time, solver):
-        """
-        If the bisection search did not succeed, this method checks for a solution
-        at the initial maximum time.
-        
-        :param max_time: The initial maximum time.
-        :param solver: The solver instance.
-        :return: A solution model (list of integers) or None.
-        :raises TimeoutException: if the solver times out.
-        """
-        sat = solver.solve()
-        if sat:
-            return solver.get_model()
-        return None
-
     def reset_algorithm(self, cause=None):
         """
         Resets the algorithm's solver and encoder. If a cause is provided,
@@ -181,14 +356,3 @@ class  RCPSPAlgorithm(Algorithm):
             self.solver.delete()  # Free resources held by the PySAT solver.
         if self.encoder is not None:
             self.encoder.reset()
-    
-def patch_solver_count_clauses(solver):
-    # Initialize a counter attribute on the solver.
-    solver._clause_count = 0
-    original_add_clause = solver.add_clause
-
-    def new_add_clause(clause):
-        solver._clause_count += 1
-        return original_add_clause(clause)
-    
-    solver.add_clause = new_add_clause
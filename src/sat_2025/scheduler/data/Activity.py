@@ -20,6 +20,8 @@ class Activity:
         self.name = name
         self.early_start_date = 0
         self.early_end_date = 0
+        self.late_start_date = 0
+        self.late_end_date = 0
         self.resource_consumption = resource_consumption if resource_consumption is not None else {}
         self.successors = []      # List of Relation objects
         self.predecessors = []    # List of Relation objects
@@ -114,3 +116,20 @@ class Activity:
     def get_early_end_date(self) -> int:
         """Returns the early end date."""
         return self.early_end_date
+
+    def set_late_start_date(self, time: int):
+        """
+        Sets the late start date and computes the late end date based on duration.
+
+        :param time: The start time.
+        """
+        self.late_start_date = time
+        self.late_end_date = time + self.get_duration()
+
+    def get_late_start_date(self) -> int:
+        """Returns the late start date."""
+        return self.late_start_date
+
+    def get_late_end_date(self) -> int:
+        """Returns the late end date."""
+        return self.late_end_date
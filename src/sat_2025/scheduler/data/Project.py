@@ -1,5 +1,7 @@
 # scheduler/data/project.py
 
+from sat.data.relation_type import RelationType as SatRelationType, relation_lag
+
 class Project:
     """
     Represents a project that contains activities, relations, and resources.
@@ -19,6 +21,8 @@ class Project:
         self.activities = []  # List to store Activity objects.
         self.relations = []   # List to store Relation objects.
         self.resources = []   # List to store Resource objects.
+        self.activities_by_id = {}  # id -> Activity, kept in step with add_activity.
+        self.resources_by_id = {}   # id -> Resource, kept in step with add_resource.
 
     def get_activities(self):
         """
@@ -42,19 +46,13 @@ class Project:
         """
         Returns the activity with the given id, or None if not found.
         """
-        for activity in self.activities:
-            if activity.get_id() == id:
-                return activity
-        return None
+        return self.activities_by_id.get(id)
 
     def get_resource_by_id(self, id: int):
         """
         Returns the resource with the given id, or None if not found.
         """
-        for resource in self.resources:
-            if resource.get_id() == id:
-                return resource
-        return None
+        return self.resources_by_id.get(id)
 
     def get_name(self) -> str:
         """
@@ -69,6 +67,31 @@ class Project:
         :param activity: An Activity object.
         """
         self.activities.append(activity)
+        self.activities_by_id.setdefault(activity.get_id(), activity)
+
+    def remove_activity(self, activity):
+        """
+        Removes an activity from the project, together with its relations
+        to the other activities.
+
+        :param activity: An Activity object, part of the project.
+        """
+        if activity not in self.activities:
+            return
+        self.activities.remove(activity)
+        if self.activities_by_id.get(activity.get_id()) is activity:
+            del self.activities_by_id[activity.get_id()]
+            # another activity with the same id takes its place in the index
+            for other in self.activities:
+                if other.get_id() == activity.get_id():
+                    self.activities_by_id[other.get_id()] = other
+                    break
+        for relation in activity.get_successors():
+            if relation in relation.get_second().get_predecessors():
+                relation.get_second().get_predecessors().remove(relation)
+        for relation in activity.get_predecessors():
+            if relation in relation.get_first().get_successors():
+                relation.get_first().get_successors().remove(relation)
 
     def add_resource(self, resource):
         """
@@ -77,6 +100,7 @@ class Project:
         :param resource: A Resource object.
         """
         self.resources.append(resource)
+        self.resources_by_id.setdefault(resource.get_id(), resource)
 
     def add_relation(self, relation):
         """
@@ -98,15 +122,35 @@ class Project:
         """
         return self.wet
 
-    def embed_forwards(self, first):
+    def precedences(self):
         """
-        Performs a forward embedding starting from the given activity.
-        It calls embed_forwards() on every relation that starts from the given activity.
-
-        :param first: An Activity object.
+        (first_id, second_id, lag) arcs of every relation registered on the
+        activities, with start(second) >= start(first) + lag.
         """
-        for relation in first.get_successors():
-            relation.embed_forwards()
+        arcs = []
+        for activity in self.activities:
+            for relation in activity.get_successors():
+                second = relation.get_second()
+                lag = relation_lag(SatRelationType(relation.get_type().value),
+                                   int(activity.get_duration()), int(second.get_duration()))
+                arcs.append((activity.get_id(), second.get_id(), lag))
+        return arcs
+
+    def scheduling_data(self):
+        """
+        The project as plain data for the sat.algorithm engines (CPM, schedule
+        generator, bounds, forbidden sets):
+        ({activity_id: duration}, precedences(), {(activity_id, resource_id): demand},
+        {resource_id: capacity}).
+        """
+        durations = {activity.get_id(): int(activity.get_duration()) for activity in self.activities}
+        demands = {}
+        for activity in self.activities:
+            for resource, consumption in activity.get_all_consumption().items():
+                if consumption is not None and consumption < 0:
+                    demands[(activity.get_id(), resource.get_id())] = -consumption
+        capacities = {resource.get_id(): resource.get_capacity() for resource in self.resources}
+        return durations, self.precedences(), demands, capacities
 
     def __str__(self):
         return f"RCPSPProject [activities={self.activities}, relations={self.relations}, resources={self.resources}]"
@@ -39,8 +39,12 @@ class Relation:
     def embed_forwards(self):
         """
         Adjusts the schedule of the second activity based on the relation type.
-        Then, recursively propagates the adjustments to all successors of the second activity.
+        Only this relation is relaxed; propagation through the whole graph is done
+        in one topological pass by FowardAlgorithm.embed_forwards.
+
+        :return: True if the early dates of the second activity changed.
         """
+        before = self.second.get_early_start_date()
         if self.type == RelationType.FS:
             if self.second.get_early_start_date() <= self.first.get_early_end_date():
                 self.second.set_early_start_date(self.first.get_early_end_date())
@@ -53,10 +57,7 @@ class Relation:
         elif self.type == RelationType.SF:
             if self.second.get_early_end_date() <= self.first.get_early_start_date():
                 self.second.set_early_end_date(self.first.get_early_start_date())
-
-        # Recursively propagate the forward embedding to all successors of the second activity.
-        for rel in self.second.get_successors():
-            rel.embed_forwards()
+        return self.second.get_early_start_date() != before
 
     def __str__(self):
         return f"RelationActivity [first={self.first}, second={self.second}, type={self.type}]"
@@ -15,15 +15,25 @@ class SATDecoder:
             cls._decoder = SATDecoder()
         return cls._decoder
 
-    def decode(self, project, model):
-
+    def decode(self, project, model, max_time=None):
+        """
+        Prints the start instant of every activity in a model. The start
+        variables are looked up by key (see VariableFactory.start_times), so
+        decoding neither scans the whole factory per literal nor creates variables.
+
+        :param max_time: The encoding horizon; None reads every START variable.
+        """
         if model is None:
             return
 
-        for value in model:
-            if value > 0:
-                variable = self.variable_factory.get_key_by_value(value)
-                if variable and variable[0] == VariableFactory.VARIABLE_START:
-                    activity = project.get_activity_by_id(variable[1])
-                    print(f"{activity} Startpunkt: {variable[2]}")
-                    
+        activity_ids = [activity.get_id() for activity in project.get_activities()]
+        self.decode_starts(project, self.variable_factory.start_times(model, activity_ids, max_time))
+
+    def decode_starts(self, project, starts):
+        """
+        Prints a schedule given as {activity_id: start}, e.g. a heuristic one,
+        the same way decode prints a model.
+        """
+        for activity_id, start in sorted(starts.items(), key=lambda item: item[1]):
+            activity = project.get_activity_by_id(activity_id)
+            print(f"{activity} Startpunkt: {start}")
@@ -5,6 +5,14 @@ from ..encoding.VariableFactory import VariableFactory
 from .bcc_encoder_pblib import BCCEncoderPblib
 from .bcc_encoder_sequential_counter import BCCEncoderSequentialCounter
 from .bcc_encoder_cnf_core import BCCEncoderCNF
+from sat.encoding.amo import encode_exactly_one
+from sat.encoding.forbidden_sets import encode_forbidden_sets
+from sat.encoding.pb_resources import encode_weighted_at_most
+from sat.encoding.pb_service import PbEncodingService
+from sat.encoding.clause_batch import add_clause_matrix, runtime_clauses
+from sat.encoding.order_encoding import encode_runtime_from_ladder, encode_started_ladder
+from sat.algorithm.time_windows import compute_time_windows, full_time_windows
+from sat.data.relation_type import RelationType, relation_lag
 
 bcc_pblib=BCCEncoderPblib()
 bcc_sc=BCCEncoderSequentialCounter()
@@ -15,6 +23,12 @@ class SATEncoder:
     def __init__(self):
         self.variable_factory = VariableFactory.get_variable_factory()
         self.counter_encoder = BCCEncoder.get_bcc_encoder()
+        self.amo_encoding = "pairwise"
+        self.time_encoding = "direct"
+        self.resource_encoding = None
+        self.lazy_resources = False
+        self.time_windows = True
+        self.windows = {}
 
     @classmethod
     def get_encoder(cls):
@@ -24,14 +38,24 @@ class SATEncoder:
         return cls._encoder
 
     def encode(self, solver, project, maxTime: int, bccMode: bool):
+        self.windows = self.compute_time_windows(project, maxTime)
+        PbEncodingService.get_pb_service().discard()
         try:
+            solver.set_family("unique_start_instant")
             self.encode_unique_start_instant(solver, maxTime, project.get_activities())
+            solver.set_family("start_in_time")
             self.encode_start_in_time(solver, maxTime, project.get_activities())
+            solver.set_family("runtime")
             self.encode_runtime(solver, maxTime, project.get_activities())
+            solver.set_family("work_load")
             self.encode_work_load(solver, maxTime, project.get_activities())
+            solver.set_family("relations")
             self.encode_relations(solver, maxTime, project.get_relations())
 
-
+            if self.lazy_resources:
+                # added during solving where a model overloads a resource (see sat.algorithm.lazy_resources)
+                return
+            solver.set_family("resources")
             if bccMode:
                 # bcc_sc.encode_resources_with_cardinalities(solver, maxTime,
                 #                                          project.get_activities(),
@@ -43,29 +67,63 @@ class SATEncoder:
                                             project.get_activities(),
                                             project.get_resources())
             else:
-                self.encode_resources_with_powerset(solver, maxTime,
-                                                    project.get_activities(),
-                                                    project.get_resources())
+                self.encode_resources_with_powerset(solver, maxTime, project)
         except Exception as e:
             # In Java, ContradictionException was caught.
             # Here we print the traceback.
             import traceback
             traceback.print_exc()
+        finally:
+            PbEncodingService.get_pb_service().discard()
+
+    def set_time_windows(self, time_windows: bool):
+        """Only creates start/run/consume variables inside the critical-path windows when enabled."""
+        self.time_windows = time_windows
+
+    def compute_time_windows(self, project, maxTime: int) -> dict:
+        # ES/LS of every activity for this horizon (sat.algorithm.time_windows)
+        durations = {activity.get_id(): int(activity.get_duration()) for activity in project.get_activities()}
+        if not self.time_windows:
+            return full_time_windows(durations, maxTime)
+        precedences = []
+        for relation in project.get_relations():
+            first, second = relation.get_first(), relation.get_second()
+            lag = relation_lag(RelationType(relation.get_type().value),
+                               int(first.get_duration()), int(second.get_duration()))
+            precedences.append((first.get_id(), second.get_id(), lag))
+        return compute_time_windows(durations, precedences, maxTime)
 
     def encode_unique_start_instant(self, solver, maxTime: int, activities: list):
         for activity in activities:
             self.encode_unique_start_instant_for_activity(solver, maxTime, activity)
 
+    def set_amo_encoding(self, amo_encoding: str):
+        """Selects the at-most-one encoding of start instants (sat.encoding.amo.AMO_ENCODINGS)."""
+        self.amo_encoding = amo_encoding
+
+    def set_resource_encoding(self, resource_encoding: str):
+        """Selects a weighted PB resource encoding (sat.encoding.pb_resources.PB_ENCODINGS); None keeps consume variables."""
+        self.resource_encoding = resource_encoding
+
+    def set_lazy_resources(self, lazy_resources: bool):
+        """Leaves the resource constraints out of the encoding when enabled (see sat.algorithm.lazy_resources)."""
+        self.lazy_resources = lazy_resources
+
+    def set_time_encoding(self, time_encoding: str):
+        """Selects "direct" start/run clauses or the "order" started-by ladder (sat.encoding.order_encoding)."""
+        self.time_encoding = time_encoding
+
     def encode_unique_start_instant_for_activity(self, solver, maxTime: int, activity):
-        # Encode "at least one start"
-        clause = [self.variable_factory.start(activity.get_id(), t) for t in range(maxTime)]
-        solver.add_clause(clause)
-        # Encode "at most one start"
-        for time1 in range(maxTime):
-            for time2 in range(time1 + 1, maxTime):
-                binary_clause = [self.neg(self.variable_factory.start(activity.get_id(), time1)),
-                                 self.neg(self.variable_factory.start(activity.get_id(), time2))]
-                solver.add_clause(binary_clause)
+        # Encode "at least one start" and "at most one start"
+        window = self.windows[activity.get_id()]
+        clause = [self.variable_factory.start(activity.get_id(), t) for t in window.start_times]
+        if self.time_encoding == "order":
+            # the started-by ladder already forces exactly one start instant
+            started = [self.variable_factory.started(activity.get_id(), t) for t in window.start_times]
+            encode_started_ladder(solver, clause, started)
+            return
+        next_var = encode_exactly_one(solver, clause, self.amo_encoding, self.variable_factory.get_count())
+        self.variable_factory.set_count(next_var)
 
     def encode_start_in_time(self, solver, maxTime: int, activities: list):
         for activity in activities:
@@ -73,7 +131,9 @@ class SATEncoder:
 
     def encode_start_in_time_for_activity(self, solver, maxTime: int, activity):
         # Forbid start times too late to finish within project span.
-        for time in range(maxTime - int(activity.get_duration()) + 1, maxTime):
+        window = self.windows[activity.get_id()]
+        for time in range(max(maxTime - int(activity.get_duration()) + 1, window.earliest_start),
+                          window.latest_start + 1):
             fact = [self.neg(self.variable_factory.start(activity.get_id(), time))]
             solver.add_clause(fact)
 
@@ -82,20 +142,15 @@ class SATEncoder:
             self.encode_runtime_for_activity(solver, maxTime, activity)
 
     def encode_runtime_for_activity(self, solver, maxTime: int, activity):
-        for time in range(maxTime):
-            literal = self.variable_factory.start(activity.get_id(), time)
-            # Before start: not running
-            for j in range(time):
-                binary_clause = [self.neg(literal), self.neg(self.variable_factory.run(activity.get_id(), j))]
-                solver.add_clause(binary_clause)
-            # During run: running
-            for j in range(time, time + int(activity.get_duration())):
-                binary_clause = [self.neg(literal), self.variable_factory.run(activity.get_id(), j)]
-                solver.add_clause(binary_clause)
-            # After run: not running
-            for j in range(time + int(activity.get_duration()), maxTime):
-                binary_clause = [self.neg(literal), self.neg(self.variable_factory.run(activity.get_id(), j))]
-                solver.add_clause(binary_clause)
+        # start(t) -> run(j) for t <= j < t + duration, -run(j) before and after
+        window = self.windows[activity.get_id()]
+        runs = [self.variable_factory.run(activity.get_id(), time) for time in window.run_times]
+        if self.time_encoding == "order":
+            started = [self.variable_factory.started(activity.get_id(), time) for time in window.start_times]
+            encode_runtime_from_ladder(solver, started, runs, int(activity.get_duration()))
+            return
+        starts = [self.variable_factory.start(activity.get_id(), time) for time in window.start_times]
+        add_clause_matrix(solver, runtime_clauses(starts, runs, int(activity.get_duration())))
 
     def encode_work_load(self, solver, maxTime: int, activities: list):
         assumptions = []
@@ -103,7 +158,7 @@ class SATEncoder:
             encVar = self.variable_factory.aux(time)
             assumptions.append(encVar)
             implication_one = [self.neg(encVar)]
-            for activity in activities:
+            for activity in self.running_at(activities, time):
                 implication_one.append(self.variable_factory.run(activity.get_id(), time))
                 implication_two = [encVar, self.neg(self.variable_factory.run(activity.get_id(), time))]
                 solver.add_clause(implication_two)
@@ -132,35 +187,36 @@ class SATEncoder:
 
     def encode_relation_type_fs(self, solver, maxTime: int, first, second):
         # B does not start before A finishes
-        for time in range(maxTime):
+        for time in self.windows[first.get_id()].start_times:
             literal = self.variable_factory.start(first.get_id(), time)
-            for k in range(0, time + int(first.get_duration())):
+            for k in self.windows[second.get_id()].starts_before(time + int(first.get_duration())):
                 binary_clause = [self.neg(literal), self.neg(self.variable_factory.start(second.get_id(), k))]
                 solver.add_clause(binary_clause)
 
     def encode_relation_type_ss(self, solver, maxTime: int, first, second):
         # B does not start before A starts
-        for time in range(maxTime):
+        for time in self.windows[first.get_id()].start_times:
             literal = self.variable_factory.start(first.get_id(), time)
-            for k in range(time):
+            for k in self.windows[second.get_id()].starts_before(time):
                 binary_clause = [self.neg(literal), self.neg(self.variable_factory.start(second.get_id(), k))]
                 solver.add_clause(binary_clause)
 
     def encode_relation_type_ff(self, solver, maxTime: int, first, second):
         # B does not finish before A finishes
-        for time in range(maxTime):
+        for time in self.windows[first.get_id()].start_times:
             if time + int(first.get_duration()) - int(second.get_duration()) > 0:
                 literal = self.variable_factory.start(first.get_id(), time)
-                for k in range(0, time + int(first.get_duration()) - int(second.get_duration())):
+                for k in self.windows[second.get_id()].starts_before(
+                        time + int(first.get_duration()) - int(second.get_duration())):
                     binary_clause = [self.neg(literal), self.neg(self.variable_factory.start(second.get_id(), k))]
                     solver.add_clause(binary_clause)
 
     def encode_relation_type_sf(self, solver, maxTime: int, first, second):
         # B does not finish before A starts
-        for time in range(maxTime):
+        for time in self.windows[first.get_id()].start_times:
             if time - int(second.get_duration()) > 0:
                 literal = self.variable_factory.start(first.get_id(), time)
-                for k in range(0, time - int(second.get_duration()) + 2):
+                for k in self.windows[second.get_id()].starts_before(time - int(second.get_duration()) + 2):
                     binary_clause = [self.neg(literal), self.neg(self.variable_factory.start(second.get_id(), k))]
                     solver.add_clause(binary_clause)
 
@@ -175,56 +231,27 @@ class SATEncoder:
                 return True
         return False
 
-    def encode_resources_with_powerset(self, solver, maxTime: int, activities: list, resources: list):
-        powerset = [[]]
-        resource_conflicts = []
-        for activity in activities:
-            new_ps = []
-            for subset in powerset:
-                new_ps.append(subset)
-                new_subset = subset.copy()
-                new_subset.append(activity)
-                # If new_subset is not already in resource_conflicts, try to encode consumption.
-                if new_subset not in resource_conflicts:
-                    resource_conflict = self.encode_consumption(solver, maxTime, new_subset, resources)
-                else:
-                    resource_conflict = False
-                if not resource_conflict:
-                    new_ps.append(new_subset)
-                else:
-                    resource_conflicts.append(new_subset)
-            powerset = new_ps
-
-    def encode_consumption(self, solver, maxTime: int, combination: list, resources: list) -> bool:
-        if not combination:
-            return False
-        for resource in resources:
-            consumption_sum = 0
-            for activity in combination:
-                consumption = activity.get_consumption(resource)
-                if consumption is not None and consumption < 0:
-                    consumption_sum += consumption
-            # consumption_sum is assumed negative.
-            if resource.get_capacity() + consumption_sum < 0:
-                self.encode_resource_conflict(solver, maxTime, combination)
-                return True
-        return False
-
-    def encode_resource_conflict(self, solver, maxTime: int, combination: list):
-        for time in range(maxTime):
-            clause = [self.neg(self.variable_factory.run(activity.get_id(), time))
-                      for activity in combination]
-            solver.add_clause(clause)
+    def encode_resources_with_powerset(self, solver, maxTime: int, project):
+        # only the minimal forbidden sets instead of the whole powerset walk (sat.encoding.forbidden_sets)
+        encode_forbidden_sets(solver, self.variable_factory.run, self.windows, *project.scheduling_data())
 
     def encode_resources_with_cardinalities(self, solver, maxTime: int, activities: list, resources: list):
+        if self.resource_encoding is not None:
+            self.encode_resources_weighted(solver, maxTime, activities, resources)
+            return
+        # consumers of each resource, looked up once instead of scanning every activity at every instant
+        consumers = {resource: [activity for activity in activities if activity.get_consumption(resource) is not None]
+                     for resource in resources}
         for time in range(maxTime):
-            for activity in activities:
+            running = self.running_at(activities, time)
+            for activity in running:
                 consum_vars = self.get_consume_variables_for_activity_at_instant(activity, time)
                 for consum_var in consum_vars:
                     binary_clause = [self.neg(self.variable_factory.run(activity.get_id(), time)), consum_var]
                     solver.add_clause(binary_clause)
             for resource in resources:
-                consum_vars_resource = self.get_consume_variables_for_resource_at_instant(resource, activities, time)
+                consum_vars_resource = self.get_consume_variables_for_resource_at_instant(
+                    resource, self.running_at(consumers[resource], time), time)
                 self.consum_to_string(consum_vars_resource)
                 if consum_vars_resource:
                     bound = resource.get_capacity()
@@ -234,6 +261,25 @@ class SATEncoder:
                     bcc_pblib.gen_less_than_constraint(solver, bound, consum_vars_resource,
                                                                     resource.get_id(), time)
 
+    def encode_resources_weighted(self, solver, maxTime: int, activities: list, resources: list):
+        # sum demand(a) * run(a, t) <= capacity, one weighted PB constraint per resource and instant
+        for resource in resources:
+            consumers = [activity for activity in activities
+                         if activity.get_consumption(resource) is not None and activity.get_consumption(resource) < 0]
+            for time in range(maxTime):
+                running = self.running_at(consumers, time)
+                if not running:
+                    continue
+                literals = [self.variable_factory.run(activity.get_id(), time) for activity in running]
+                weights = [-activity.get_consumption(resource) for activity in running]
+                next_var = encode_weighted_at_most(solver, weights, literals, resource.get_capacity(),
+                                                   self.resource_encoding, self.variable_factory.get_count())
+                self.variable_factory.set_count(next_var)
+
+    def running_at(self, activities: list, instant: int) -> list:
+        """Activities whose time window allows them to run at instant."""
+        return [activity for activity in activities if instant in self.windows[activity.get_id()].run_times]
+
     @staticmethod
     def get_consume_variables_for_activity_at_instant(activity, instant: int) -> list:
         consum_variables = []
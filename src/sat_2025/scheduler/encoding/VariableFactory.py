@@ -8,6 +8,7 @@ class VariableFactory:
     VARIABLE_SUM = 4
     VARIABLE_CARRY = 5
     VARIABLE_CONSUMPTION = 6
+    VARIABLE_STARTED = 7
 
     _factory = None
     _variables = {}
@@ -43,6 +44,10 @@ class VariableFactory:
         """Tạo biến RUN."""
         return self._get_variable(self.VARIABLE_RUN, activity_id, time)
 
+    def started(self, activity_id, time):
+        """Tạo biến STARTED (công việc đã bắt đầu tại hoặc trước time)."""
+        return self._get_variable(self.VARIABLE_STARTED, activity_id, time)
+
     def aux(self, id):
         """Tạo biến AUX."""
         return self._get_variable(self.VARIABLE_AUX, id, id)
@@ -59,6 +64,33 @@ class VariableFactory:
         """Tạo biến CONSUME."""
         return self._get_variable(self.VARIABLE_CONSUMPTION, activity_id, resource_id, time, consume_id)
 
+    def find(self, *args):
+        """Trả về id của biến nếu đã được tạo, None nếu chưa (không tạo biến mới)."""
+        return self._variables.get(tuple(args))
+
+    def start_times(self, model, activity_ids, max_time=None):
+        """
+        Đọc thời điểm bắt đầu {activity_id: t} trực tiếp từ model (model[v - 1] là
+        literal của biến v) mà không tạo biến mới. Không có max_time thì duyệt
+        các biến START đã tạo.
+        """
+        def is_true(var):
+            return var is not None and var <= len(model) and model[var - 1] > 0
+
+        start_times = {}
+        if max_time is None:
+            wanted = set(activity_ids)
+            for key, var in self._variables.items():
+                if key[0] == self.VARIABLE_START and key[1] in wanted and is_true(var):
+                    start_times[key[1]] = min(key[2], start_times.get(key[1], key[2]))
+            return start_times
+        for activity_id in activity_ids:
+            for time in range(max_time):
+                if is_true(self.find(self.VARIABLE_START, activity_id, time)):
+                    start_times[activity_id] = time
+                    break
+        return start_times
+
     def clear_variables(self):
         """Xóa tất cả các biến."""
         self._variables.clear()
@@ -86,6 +118,8 @@ class VariableFactory:
             result += f"s({entry[1]}, {entry[2]})"
         elif entry[0] == self.VARIABLE_RUN:
             result += f"x({entry[1]}, {entry[2]})"
+        elif entry[0] == self.VARIABLE_STARTED:
+            result += f"y({entry[1]}, {entry[2]})"
         elif entry[0] == self.VARIABLE_AUX:
             result += f"e({entry[1]})"
         elif entry[0] == self.VARIABLE_CARRY:
@@ -99,6 +133,24 @@ class VariableFactory:
 
         return result
 
+    def get_count(self) -> int:
+        """Trả về id tự do tiếp theo."""
+        return self._count
+
+    def set_count(self, count: int):
+        """Đánh dấu các id < count đã được dùng (biến phụ của bộ mã hóa ngoài)."""
+        self._count = count
+
+    def to_state(self) -> dict:
+        """Trả về trạng thái có thể ghi ra JSON (dùng cho file DIMACS đi kèm)."""
+        return {"count": self._count,
+                "variables": [[list(key), value] for key, value in self._variables.items()]}
+
+    def load_state(self, state: dict):
+        """Khôi phục trạng thái đã lưu bằng to_state()."""
+        self._variables = {tuple(key): value for key, value in state["variables"]}
+        self._count = state["count"]
+
     def size(self):
         return len(self._variables)
     
@@ -22,8 +22,11 @@ class BCCEncoderPblib:
 
         if inputs:
             cnf_formula=[]
-            max_var=self.pb2cnf.encode_at_most_k(inputs,bound,cnf_formula,inputs[0]+1)
-          
+            # biến phụ của PBLib lấy từ VariableFactory để không trùng id với biến đã có
+            first_free=self.variable_factory.get_count()
+            max_var=self.pb2cnf.encode_at_most_k(inputs,bound,cnf_formula,first_free)
+            self.variable_factory.set_count(max(first_free, max_var + 1))
+
             for clause in cnf_formula:
                 solver.add_clause(clause)
         
@@ -35,6 +35,8 @@ def parse_input(directory: str) -> Optional[List[Tuple[List[Dict], List[Dict], L
     return all_datasets if all_datasets else None
 
 
+# Reopens and saves the whole workbook for every row; for more than a handful of
+# rows stream them into utils.result_store and export the XLSX once at the end
 def export_schedule_to_xlsx(
         id,
         file_name=None,
@@ -0,0 +1,153 @@
+import csv
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+
+from openpyxl import Workbook
+
+# Same columns as export_schedule_to_xlsx, with the keyword names it takes
+HEADERS = ['Id', 'File Name', 'Problem', 'Type', 'Status', 'Time', 'Variables', 'Clauses']
+FIELDS = ('id', 'file_name', 'problem_field', 'ago_type', 'status', 'time_solve', 'variables', 'clauses')
+
+
+# Example usage:
+# with open_result_store("results/bcc.csv") as store:
+#     for ...:
+#         store.append(id=..., file_name=..., status=..., ...)
+#     store.export_xlsx("bcc.xlsx")
+class ResultStore(ABC):
+    """
+    Append-only sink of benchmark results, one row per job, each written
+    (and flushed) as soon as it arrives; nothing already written is read
+    back or rewritten. Reopening an existing store appends to it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, id, file_name=None, problem_field=None, ago_type=None, status=None,
+               time_solve=0, variables=None, clauses=None):
+        row = dict(zip(FIELDS, (id, file_name, problem_field, ago_type, status, time_solve, variables, clauses)))
+        self._write(row)
+
+    @abstractmethod
+    def rows(self) -> Iterator[Dict]:
+        """Every stored row, oldest first, as a dict keyed by FIELDS."""
+
+    def export_xlsx(self, output_file):
+        """Writes every stored row to an XLSX workbook in one pass."""
+        write_xlsx(self.rows(), output_file)
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def _write(self, row: Dict):
+        """Stores one row and makes it durable before returning."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CsvResultStore(ResultStore):
+    def __init__(self, path):
+        super().__init__(path)
+        is_new = not self.path.is_file() or self.path.stat().st_size == 0
+        self.file = self.path.open("a", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        if is_new:
+            self.writer.writeheader()
+
+    def _write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def rows(self):
+        self.file.flush()
+        with self.path.open(newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                # CSV keeps only text; numbers go back to numbers for the XLSX export
+                yield {field: _number(value) for field, value in row.items()}
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlResultStore(ResultStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = self.path.open("a", encoding="utf-8")
+
+    def _write(self, row):
+        self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def rows(self):
+        self.file.flush()
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteResultStore(ResultStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS results ({', '.join(FIELDS)})")
+        self.connection.commit()
+
+    def _write(self, row):
+        self.connection.execute(f"INSERT INTO results VALUES ({', '.join('?' * len(FIELDS))})",
+                                [row[field] for field in FIELDS])
+        self.connection.commit()
+
+    def rows(self):
+        cursor = self.connection.execute(f"SELECT {', '.join(FIELDS)} FROM results ORDER BY rowid")
+        for values in cursor:
+            yield dict(zip(FIELDS, values))
+
+    def close(self):
+        self.connection.close()
+
+
+def _number(value: str):
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    return None if value == "" else value
+
+
+STORES = {".csv": CsvResultStore, ".jsonl": JsonlResultStore, ".sqlite": SqliteResultStore, ".db": SqliteResultStore}
+
+
+def open_result_store(path) -> ResultStore:
+    """Opens the store matching the file suffix (.csv, .jsonl, .sqlite or .db)."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in STORES:
+        raise ValueError(f"Unknown result store format: {suffix} (expected one of {', '.join(STORES)})")
+    return STORES[suffix](path)
+
+
+def write_xlsx(rows: Iterable[Dict], output_file):
+    """Writes rows (dicts keyed by FIELDS) to a new workbook with the HEADERS columns."""
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append([row.get(field) for field in FIELDS])
+    workbook.save(output_path)